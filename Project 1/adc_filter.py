@@ -0,0 +1,263 @@
+"""
+--------------------------------------------------------------------------
+Filtered ADC Setpoint Reader
+--------------------------------------------------------------------------
+License:
+Copyright 2025 - Emma Berdou
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+2. Redistributions   in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors
+may be used to endorse or promote products derived from this software without
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Filtered ADC Reader
+
+  Reads the potentiometer straight from the AM335x ADC's IIO sysfs file
+(in_voltageN_raw) through a file descriptor that stays open, the same way
+ds18b20.py reads w1_slave:  each sample is one pread() instead of the
+open / read / close that every ADC.read() call does.
+
+  Each read() takes a short burst of samples and filters them in three
+stages so pot noise does not turn into setpoint jitter (and relay chatter):
+
+    1. median of the burst        - drops single-sample spikes, and
+                                    decimates the burst to one value
+    2. exponential moving average - smooths what is left
+    3. deadband                   - the output only moves once the average
+                                    is more than "deadband" away from it
+
+  ADC.setup() must have been called first so the ADC is enabled.  While
+the ADC runs through the IIO buffer (iio_stream.py) sysfs reads fail, so
+PotReader can instead take its samples from any object with read_burst()
+and close(), e.g. IIOStream.channel().
+
+Software API:
+
+  ADCChannel(channel, device_dir=IIO_DEVICE_DIR)
+    read_raw()
+      - Return one raw sample (0 - 4095)
+    read_burst(count)
+      - Return count raw samples
+    close()
+
+  SetpointFilter(alpha=0.25, deadband=0.5)
+    update(value)
+      - Feed one (median) value; return the filtered, deadbanded output
+    get_output()
+      - Return the last output
+    reset()
+
+  PotReader(pin="P1_19", scale=100.0, burst=8, alpha=0.25, deadband=0.5,
+            device_dir=IIO_DEVICE_DIR, channel=None)
+    read()
+      - Return the filtered pot position scaled to 0 - scale
+    close()
+
+"""
+import os
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+IIO_DEVICE_DIR        = "/sys/bus/iio/devices/iio:device0/"
+ADC_MAX               = 4095            # 12-bit ADC
+RAW_READ_SIZE         = 16
+
+# PocketBeagle analog input pins -> AIN channel
+PIN_TO_AIN = {
+    "P1_19" : 0,  "P1_21" : 1,  "P1_23" : 2,  "P1_25" : 3,
+    "P1_27" : 4,  "P2_35" : 5,  "P1_2"  : 6,  "P2_36" : 7,
+}
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class ADCChannel():
+    """ One ADC input read through a persistent sysfs file descriptor """
+    path                          = None
+    _fd                           = None
+
+    def __init__(self, channel, device_dir=IIO_DEVICE_DIR):
+        """ Initialize variables """
+        self.path = os.path.join(device_dir, "in_voltage{0}_raw".format(channel))
+        self._fd  = None
+
+    # End def
+
+
+    def read_raw(self):
+        """ Return one raw sample (0 - 4095) """
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDONLY)
+        # A read at offset 0 makes the driver take a new sample
+        return int(os.pread(self._fd, RAW_READ_SIZE, 0))
+
+    # End def
+
+
+    def read_burst(self, count):
+        """ Return count raw samples """
+        return [self.read_raw() for _ in range(count)]
+
+    # End def
+
+
+    def close(self):
+        """ Close the file descriptor """
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    # End def
+
+# End class
+
+
+class SetpointFilter():
+    """ Moving average with an output deadband """
+    alpha                         = None
+    deadband                      = None
+
+    _average                      = None
+    _output                       = None
+
+    def __init__(self, alpha=0.25, deadband=0.5):
+        """ Initialize variables """
+        self.alpha    = alpha
+        self.deadband = deadband
+        self.reset()
+
+    # End def
+
+
+    def reset(self):
+        """ Start again from the next value """
+        self._average = None
+        self._output  = None
+
+    # End def
+
+
+    def get_output(self):
+        """ Return the last output (0.0 before the first value) """
+        if self._output is None:
+            return 0.0
+        return self._output
+
+    # End def
+
+
+    def update(self, value):
+        """ Feed one value; return the filtered output """
+        if self._average is None:
+            self._average = value
+            self._output  = value
+            return self._output
+
+        self._average += self.alpha * (value - self._average)
+        if abs(self._average - self._output) > self.deadband:
+            self._output = self._average
+        return self._output
+
+    # End def
+
+# End class
+
+
+class PotReader():
+    """ Oversampled, filtered potentiometer """
+    scale                         = None
+    burst                         = None
+    channel                       = None
+    filter                        = None
+
+    def __init__(self, pin="P1_19", scale=100.0, burst=8, alpha=0.25, deadband=0.5,
+                 device_dir=IIO_DEVICE_DIR, channel=None):
+        """ Initialize variables """
+        if pin not in PIN_TO_AIN:
+            raise ValueError("Pin {0} is not an analog input".format(pin))
+        if channel is None:
+            channel = ADCChannel(PIN_TO_AIN[pin], device_dir)
+        self.scale   = scale
+        self.burst   = burst
+        self.channel = channel
+        self.filter  = SetpointFilter(alpha, deadband)
+
+    # End def
+
+
+    def read(self):
+        """ Return the filtered pot position, 0 - scale """
+        samples = sorted(self.channel.read_burst(self.burst))
+        if not samples:
+            return self.filter.get_output()
+        median  = samples[len(samples) // 2]
+        return self.filter.update(median * self.scale / ADC_MAX)
+
+    # End def
+
+
+    def close(self):
+        """ Close the ADC file """
+        self.channel.close()
+
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import time
+    import Adafruit_BBIO.ADC as ADC
+
+    ADC.setup()
+    pot = PotReader()
+
+    # Cost of one filtered burst against the same number of ADC.read() calls
+    start = time.perf_counter()
+    for _ in range(100):
+        pot.read()
+    burst_time = (time.perf_counter() - start) / 100
+    start = time.perf_counter()
+    for _ in range(100 * pot.burst):
+        ADC.read("P1_19")
+    single_time = (time.perf_counter() - start) / 100
+    print("{0} samples: PotReader {1:.3f} ms, ADC.read {2:.3f} ms".format(
+          pot.burst, burst_time * 1000, single_time * 1000))
+
+    try:
+        while True:
+            raw = ADC.read("P1_19") * 100
+            print("raw {0:6.2f}   filtered {1:6.2f}".format(raw, pot.read()))
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        pass
+    pot.close()
@@ -0,0 +1,309 @@
+"""
+--------------------------------------------------------------------------
+Relay-Feedback PID Auto-Tuner
+--------------------------------------------------------------------------
+License:
+Copyright 2025 - Emma Berdou
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+2. Redistributions   in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors
+may be used to endorse or promote products derived from this software without
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Relay Auto-Tuner
+
+  Finds PID gains for a warmer plate with the Astrom-Hagglund relay
+experiment:  the heater is switched fully on below the setpoint and fully off
+above it (with a small hysteresis so sensor noise does not chatter the
+relays).  The plate settles into a steady oscillation around the setpoint;
+from its period Pu and amplitude a the ultimate gain is
+
+    Ku = 4 d / (pi * sqrt(a^2 - h^2))
+
+where d is half the relay swing (0.5 for a 0 - 1 duty) and h the hysteresis.
+Gains then follow from one of the tuning rules in TUNING_RULES.  Ku is in
+duty per C, the same units controller.PIDController uses.
+
+  The tuner is stepped like the controllers:  update(measurement, now)
+returns the relay state, so it can run from a scheduler task on the real
+heater or against simulated hardware.
+
+  Tuned gains are stored per device (the DS18B20 id of the control probe) in
+a JSON file, so each plate keeps its own gains.
+
+Software API:
+
+  RelayAutotuner(setpoint, hysteresis=0.25, cycles=4, timeout=3600.0,
+                 rule="tyreus_luyben")
+    update(measurement, now)
+      - Return True if the heater should be on
+    is_done()
+      - True once finished (successfully or not)
+    get_result()
+      - Return an AutotuneResult, or None if the experiment failed or is
+        still running
+    get_error()
+      - Return why the experiment failed, or None
+
+  compute_gains(ku, pu, rule="tyreus_luyben")
+    - Return (kp, ki, kd)
+
+  load_gains(device_id, path=GAINS_FILE)
+    - Return {"kp", "ki", "kd", ...} for the device, or None
+
+  save_gains(device_id, result, path=GAINS_FILE)
+    - Store an AutotuneResult for the device
+
+"""
+import json
+import math
+import os
+import time
+from collections import namedtuple
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+GAINS_FILE            = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                     "pid_gains.json")
+
+# Relay swing as a 0 - 1 duty:  d is half the swing
+RELAY_AMPLITUDE       = 0.5
+
+# Rule: (kp / Ku, Ti / Pu, Td / Pu); Ti of None means no integral term.
+# The classic rules assume the heater follows the controller output at once;
+# "pulse_density" matches the controller.py defaults for a pulse density
+# relay (PIDRelayController with window=None) on the coffee warmer
+TUNING_RULES = {
+    "ziegler_nichols"   : (0.6,      0.5,  0.125),
+    "tyreus_luyben"     : (1 / 2.2,  2.2,  1 / 6.3),
+    "pi"                : (0.45,     1 / 1.2, 0.0),
+    "p"                 : (0.5,      None, 0.0),
+    "pulse_density"     : (1.375,    0.35, 0.1),
+}
+
+# A cycle is accepted once its period and amplitude are within this
+# fraction of the previous cycle
+CYCLE_TOLERANCE       = 0.2
+
+AutotuneResult = namedtuple("AutotuneResult",
+                            ["ku", "pu", "amplitude", "kp", "ki", "kd", "rule"])
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+def compute_gains(ku, pu, rule="tyreus_luyben"):
+    """ Return (kp, ki, kd) for an ultimate gain and period """
+    if rule not in TUNING_RULES:
+        raise ValueError("Unknown tuning rule: {0}".format(rule))
+    kp_ratio, ti_ratio, td_ratio = TUNING_RULES[rule]
+    kp = kp_ratio * ku
+    ki = 0.0 if ti_ratio is None else kp / (ti_ratio * pu)
+    kd = kp * td_ratio * pu
+    return (kp, ki, kd)
+
+# End def
+
+
+def load_gains(device_id, path=GAINS_FILE):
+    """ Return the stored gains for a device, or None """
+    try:
+        with open(path, "r") as f:
+            gains = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return gains.get(device_id)
+
+# End def
+
+
+def save_gains(device_id, result, path=GAINS_FILE):
+    """ Store an AutotuneResult for a device """
+    try:
+        with open(path, "r") as f:
+            gains = json.load(f)
+    except (OSError, ValueError):
+        gains = {}
+
+    entry = result._asdict()
+    entry["time"] = time.strftime("%Y-%m-%d %H:%M:%S")
+    gains[device_id] = entry
+
+    # Write a temporary file and rename it so a power cut cannot leave a
+    # half-written file behind
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(gains, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+# End def
+
+
+class RelayAutotuner():
+    """ RelayAutotuner Class """
+    setpoint                      = None
+    hysteresis                    = None
+    cycles                        = None
+    timeout                       = None
+    rule                          = None
+
+    _on                           = None
+    _start_time                   = None
+    _cycle_start                  = None
+    _high                         = None
+    _low                          = None
+    _periods                      = None
+    _amplitudes                   = None
+    _done                         = None
+    _result                       = None
+    _error                        = None
+
+    def __init__(self, setpoint, hysteresis=0.25, cycles=4, timeout=3600.0,
+                 rule="tyreus_luyben"):
+        """ Initialize variables """
+        if rule not in TUNING_RULES:
+            raise ValueError("Unknown tuning rule: {0}".format(rule))
+        self.setpoint    = setpoint
+        self.hysteresis  = hysteresis
+        self.cycles      = cycles
+        self.timeout     = timeout
+        self.rule        = rule
+
+        self._on          = True
+        self._start_time  = None
+        self._cycle_start = None
+        self._high        = None
+        self._low         = None
+        self._periods     = []
+        self._amplitudes  = []
+        self._done        = False
+        self._result      = None
+        self._error       = None
+
+    # End def
+
+
+    def update(self, measurement, now):
+        """ Feed a measurement; return True if the heater should be on """
+        if self._done:
+            return False
+        if self._start_time is None:
+            self._start_time = now
+        if now - self._start_time > self.timeout:
+            self._fail("no steady oscillation after {0:.0f}s".format(self.timeout))
+            return False
+
+        # Track the extremes of the current cycle
+        if (self._high is None) or (measurement > self._high):
+            self._high = measurement
+        if (self._low is None) or (measurement < self._low):
+            self._low = measurement
+
+        if self._on and (measurement > self.setpoint + self.hysteresis):
+            self._on = False
+        elif (not self._on) and (measurement < self.setpoint - self.hysteresis):
+            # A cycle runs from one switch-on to the next
+            self._on = True
+            if self._cycle_start is not None:
+                self._end_cycle(now)
+            self._cycle_start = now
+            self._high        = measurement
+            self._low         = measurement
+
+        return self._on
+
+    # End def
+
+
+    def _end_cycle(self, now):
+        """ Record one full oscillation; finish once enough agree """
+        self._periods.append(now - self._cycle_start)
+        self._amplitudes.append((self._high - self._low) / 2.0)
+
+        if len(self._periods) < self.cycles:
+            return
+
+        # Use only the most recent cycles; the first ones include the
+        # warm-up transient
+        periods    = self._periods[-self.cycles:]
+        amplitudes = self._amplitudes[-self.cycles:]
+        if not (self._steady(periods) and self._steady(amplitudes)):
+            return
+
+        pu = sum(periods) / len(periods)
+        a  = sum(amplitudes) / len(amplitudes)
+        if a <= self.hysteresis:
+            self._fail("oscillation amplitude {0:.3f}C is within the hysteresis".format(a))
+            return
+
+        ku = 4 * RELAY_AMPLITUDE / (math.pi * math.sqrt(a * a - self.hysteresis * self.hysteresis))
+        kp, ki, kd = compute_gains(ku, pu, self.rule)
+        self._result = AutotuneResult(ku, pu, a, kp, ki, kd, self.rule)
+        self._done   = True
+
+    # End def
+
+
+    def _steady(self, values):
+        """ True if successive values are within CYCLE_TOLERANCE """
+        for previous, value in zip(values, values[1:]):
+            if abs(value - previous) > CYCLE_TOLERANCE * abs(previous):
+                return False
+        return True
+
+    # End def
+
+
+    def _fail(self, error):
+        """ Stop the experiment with an error """
+        self._error = error
+        self._done  = True
+
+    # End def
+
+
+    def is_done(self):
+        """ True once finished (successfully or not) """
+        return self._done
+
+    # End def
+
+
+    def get_result(self):
+        """ Return the AutotuneResult, or None """
+        return self._result
+
+    # End def
+
+
+    def get_error(self):
+        """ Return why the experiment failed, or None """
+        return self._error
+
+    # End def
+
+# End class
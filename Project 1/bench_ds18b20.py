@@ -0,0 +1,112 @@
+#!/usr/bin/env python3.11
+"""
+--------------------------------------------------------------------------
+DS18B20 Reader Benchmark
+--------------------------------------------------------------------------
+License:
+Copyright 2025 - Emma Berdou
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+2. Redistributions   in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors
+may be used to endorse or promote products derived from this software without
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Compares the old text-mode read_temp() (open, readlines, slice, float) with
+DS18B20.read_millidegrees() (persistent fd, preadv into a bytearray).
+
+  python3 bench_ds18b20.py [w1_slave path] [iterations]
+
+With no path, a regular file with a typical w1_slave payload is used, which
+measures only the Python-side cost.  On a real probe each read also includes
+the conversion time.
+--------------------------------------------------------------------------
+"""
+import os
+import sys
+import tempfile
+import time
+
+from ds18b20 import DS18B20, parse_w1_slave
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+SAMPLE_W1_SLAVE = ("72 01 4b 46 7f ff 0e 10 57 : crc=57 YES\n"
+                   "72 01 4b 46 7f ff 0e 10 57 t=23125\n")
+
+ITERATIONS      = 100000
+
+# ------------------------------------------------------------------------
+# Functions
+# ------------------------------------------------------------------------
+
+def legacy_read_temp(device_file):
+    """ The original coffee_heater.read_temp() (without the retry loop) """
+    with open(device_file, 'r') as f:
+        lines = f.readlines()
+    return parse_w1_slave(lines)
+
+# End def
+
+
+def bench(name, function, iterations):
+    """ Time function() and print the per-call cost """
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    elapsed = time.perf_counter() - start
+    print("{0:<28} {1:8.2f} us/read".format(name, elapsed / iterations * 1e6))
+    return elapsed
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    device_file = sys.argv[1] if len(sys.argv) > 1 else None
+    iterations  = int(sys.argv[2]) if len(sys.argv) > 2 else ITERATIONS
+
+    tmp_dir = None
+    if device_file is None:
+        tmp_dir     = tempfile.TemporaryDirectory()
+        device_file = os.path.join(tmp_dir.name, "w1_slave")
+        with open(device_file, 'w') as f:
+            f.write(SAMPLE_W1_SLAVE)
+
+    sensor = DS18B20(device_file)
+    assert sensor.read_millidegrees() == int(round(legacy_read_temp(device_file) * 1000))
+
+    print("DS18B20 read benchmark ({0} reads of {1})".format(iterations, device_file))
+    old = bench("read_temp() (text mode)", lambda: legacy_read_temp(device_file), iterations)
+    new = bench("read_millidegrees() (preadv)", sensor.read_millidegrees, iterations)
+    print("Speedup: {0:.1f}x".format(old / new))
+
+    sensor.close()
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
@@ -0,0 +1,471 @@
+"""
+--------------------------------------------------------------------------
+Character LCD
+--------------------------------------------------------------------------
+License:
+Copyright 2025 - Emma Berdou
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+2. Redistributions   in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors
+may be used to endorse or promote products derived from this software without
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Character LCD
+
+  One display API for every way an HD44780 is hooked up in this repo:
+
+  - ParallelTransport     (hd44780.py)  4-bit GPIO, as in coffee_heater.py
+  - I2CBackpackTransport                PCF8574 backpack, as in
+                                        coffeeheateredit.py
+  - BlinkaTransport                     adafruit_character_lcd, as in
+                                        coffeewarmer/lcd_test.py
+
+  CharLCD keeps a shadow copy of what is on the glass, works out the runs of
+changed cells for each new frame, and hands each run to the transport as one
+command (cursor address, only when needed) plus one block of character data,
+so a transport can batch the whole run.  Writing a frame that is already on
+the display costs no bus traffic at all.
+
+  benchmark() measures characters per second and refresh latency for a
+display, so the fastest transport can be picked per board:
+
+    python3 char_lcd.py [parallel|i2c|blinka]
+
+Software API:
+
+  CharLCD(transport, cols=16, rows=2)
+    - Provide the transport the display is connected through
+
+    setup()
+      - Initialize the transport and the display
+
+    message(text, line=1)
+      - Show text on a line (1 = top), padded / cut to the display width
+      - Only the cells that change are sent
+
+    set_frame(lines)
+      - Show a list of lines (one per row) in one update
+
+    clear()
+      - Clear the display
+
+    get_bytes_sent()
+      - Return the number of bytes (commands + characters) sent so far
+
+    cleanup()
+      - Clear the display and release the transport
+
+  Transport interface:
+    init()           - Power-on sequence; leave the display cleared
+    command(b)       - Send one command byte (waits out its execution time)
+    write(data)      - Send a run of character bytes
+    cleanup()        - Release the hardware
+
+  benchmark(lcd, iterations=20)
+    - Return a dict of refresh latencies (ms) and characters per second
+
+"""
+import sys
+import time
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+LCD_CMD_CLEAR         = 0x01
+LCD_CMD_FUNCTION      = 0x28  # 4-bit, 2 lines, 5x8 dots
+LCD_CMD_DISPLAY_ON    = 0x0C  # Display on, cursor off, blink off
+LCD_CMD_ENTRY_MODE    = 0x06  # Increment cursor
+LCD_CMD_SET_DDRAM     = 0x80
+
+# DDRAM address of the first cell of each row
+LCD_ROW_OFFSETS       = [0x00, 0x40, 0x14, 0x54]
+
+# PCF8574 backpack wiring: P0 = RS, P1 = R/W, P2 = E, P3 = backlight,
+# P4 - P7 = D4 - D7
+I2C_LCD_ADDRESS       = 0x27
+I2C_LCD_BUS           = 2     # PocketBeagle I2C bus 2
+I2C_RS                = 0x01
+I2C_ENABLE            = 0x04
+I2C_BACKLIGHT         = 0x08
+I2C_BLOCK_MAX         = 32    # SMBus block write limit
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class CharLCD():
+    """ CharLCD Class """
+    transport                     = None
+    cols                          = None
+    rows                          = None
+
+    _glass                        = None
+    _cursor                       = None
+    _bytes_sent                   = None
+
+    def __init__(self, transport=None, cols=16, rows=2):
+        """ Initialize variables """
+        if (transport == None):
+            raise ValueError("Transport not provided for CharLCD()")
+        self.transport   = transport
+        self.cols        = cols
+        self.rows        = rows
+
+        # What is on the glass; None until the display is initialized
+        self._glass      = None
+        self._cursor     = None
+        self._bytes_sent = 0
+
+    # End def
+
+
+    def setup(self):
+        """ Initialize the transport and the display """
+        self.transport.init()
+        self._reset_glass()
+
+    # End def
+
+
+    def _reset_glass(self):
+        """ The display is blank with the cursor at the top left """
+        self._glass  = [bytearray(b' ' * self.cols) for _ in range(self.rows)]
+        self._cursor = 0
+
+    # End def
+
+
+    def clear(self):
+        """ Clear the display """
+        self.transport.command(LCD_CMD_CLEAR)
+        self._bytes_sent += 1
+        self._reset_glass()
+
+    # End def
+
+
+    def _encode(self, text):
+        """ Return text as display bytes, padded / cut to the display width """
+        data = text.encode('ascii', 'replace')[:self.cols]
+        return data.ljust(self.cols, b' ')
+
+    # End def
+
+
+    def _write_row(self, row, data):
+        """ Send the cells of a row that differ from the glass """
+        glass  = self._glass[row]
+        offset = LCD_ROW_OFFSETS[row]
+        col    = 0
+        while col < self.cols:
+            if data[col] == glass[col]:
+                col += 1
+                continue
+
+            # Find the changed run, carrying through single unchanged cells
+            # since rewriting one cell costs the same as a cursor jump
+            start = col
+            while col < self.cols:
+                if data[col] == glass[col]:
+                    if (col + 1 >= self.cols) or (data[col + 1] == glass[col + 1]):
+                        break
+                col += 1
+
+            # Move the cursor only if auto-increment did not already put it
+            # here
+            address = offset + start
+            if self._cursor != address:
+                self.transport.command(LCD_CMD_SET_DDRAM | address)
+                self._bytes_sent += 1
+
+            run = data[start:col]
+            self.transport.write(run)
+            glass[start:col]  = run
+            self._cursor      = address + len(run)
+            self._bytes_sent += len(run)
+
+    # End def
+
+
+    def message(self, text, line=1):
+        """ Show text on a line (1 = top) """
+        row = line - 1
+        if (row < 0) or (row >= self.rows):
+            raise ValueError("Line must be 1 - {0}".format(self.rows))
+        self._write_row(row, self._encode(text))
+
+    # End def
+
+
+    def set_frame(self, lines):
+        """ Show a list of lines, one per row """
+        for row in range(self.rows):
+            text = lines[row] if row < len(lines) else ""
+            self._write_row(row, self._encode(text))
+
+    # End def
+
+
+    def get_bytes_sent(self):
+        """ Return the number of bytes sent to the display so far """
+        return self._bytes_sent
+
+    # End def
+
+
+    def cleanup(self):
+        """ Clear the display and release the transport """
+        self.clear()
+        self.transport.cleanup()
+
+    # End def
+
+# End class
+
+
+class I2CBackpackTransport():
+    """ HD44780 behind a PCF8574 I2C backpack
+
+        Every nibble is three PCF8574 output bytes (data, data | E, data).
+        At 100 kHz each byte takes ~90 us on the wire, which already covers
+        the enable pulse and execution times, so a whole run is built into
+        one buffer and sent in one I2C transaction (i2c_rdwr with smbus2,
+        or 33-byte block writes with smbus) with no sleeps in between.
+    """
+    address                       = None
+    bus                           = None
+
+    def __init__(self, bus=None, address=I2C_LCD_ADDRESS):
+        """ Provide an smbus / smbus2 SMBus (default: PocketBeagle I2C bus 2) """
+        if bus is None:
+            import smbus
+            bus = smbus.SMBus(I2C_LCD_BUS)
+        self.bus     = bus
+        self.address = address
+
+    # End def
+
+
+    def _encode(self, buf, bits, mode):
+        """ Append the PCF8574 output bytes for one LCD byte to buf """
+        for nibble in (bits & 0xF0, (bits << 4) & 0xF0):
+            data = mode | nibble | I2C_BACKLIGHT
+            buf.append(data)
+            buf.append(data | I2C_ENABLE)
+            buf.append(data & ~I2C_ENABLE)
+
+    # End def
+
+
+    def _send(self, buf):
+        """ Send PCF8574 output bytes in as few I2C transactions as possible """
+        if hasattr(self.bus, "i2c_rdwr"):
+            # smbus2: one transaction of any length
+            from smbus2 import i2c_msg
+            self.bus.i2c_rdwr(i2c_msg.write(self.address, bytes(buf)))
+            return
+        # smbus: the "command" byte is just the first byte the PCF8574 outputs
+        step = I2C_BLOCK_MAX + 1
+        for i in range(0, len(buf), step):
+            chunk = buf[i:i + step]
+            if len(chunk) == 1:
+                self.bus.write_byte(self.address, chunk[0])
+            else:
+                self.bus.write_i2c_block_data(self.address, chunk[0], list(chunk[1:]))
+
+    # End def
+
+
+    def init(self):
+        """ Initialize the LCD """
+        for cmd in (0x33,                   # Initialize
+                    0x32,                   # Set to 4-bit mode
+                    LCD_CMD_FUNCTION,
+                    LCD_CMD_DISPLAY_ON,
+                    LCD_CMD_ENTRY_MODE,
+                    LCD_CMD_CLEAR):
+            buf = bytearray()
+            self._encode(buf, cmd, 0)
+            self._send(buf)
+            # Power-on commands need the datasheet delays
+            time.sleep(0.005)
+
+    # End def
+
+
+    def command(self, b):
+        """ Send one command byte """
+        buf = bytearray()
+        self._encode(buf, b, 0)
+        self._send(buf)
+        if b == LCD_CMD_CLEAR:
+            time.sleep(0.002)
+
+    # End def
+
+
+    def write(self, data):
+        """ Send a run of character bytes in one transaction """
+        buf = bytearray()
+        for b in data:
+            self._encode(buf, b, I2C_RS)
+        self._send(buf)
+
+    # End def
+
+
+    def cleanup(self):
+        """ Release the bus """
+        self.bus.close()
+
+    # End def
+
+# End class
+
+
+class BlinkaTransport():
+    """ HD44780 driven by adafruit_character_lcd (CircuitPython / Blinka) """
+    lcd                           = None
+
+    def __init__(self, lcd=None):
+        """ Provide an adafruit_character_lcd Character_LCD object """
+        if (lcd == None):
+            raise ValueError("lcd not provided for BlinkaTransport()")
+        self.lcd = lcd
+
+    # End def
+
+
+    def init(self):
+        """ The library initializes the display when it is created """
+        self.lcd.clear()
+
+    # End def
+
+
+    # The library only exposes text-level calls publicly; _write8() is the
+    # byte-level primitive they are all built on
+
+    def command(self, b):
+        """ Send one command byte """
+        self.lcd._write8(b)
+        if b == LCD_CMD_CLEAR:
+            time.sleep(0.003)
+
+    # End def
+
+
+    def write(self, data):
+        """ Send a run of character bytes """
+        for b in data:
+            self.lcd._write8(b, True)
+
+    # End def
+
+
+    def cleanup(self):
+        """ Nothing to release """
+        pass
+
+    # End def
+
+# End class
+
+
+def benchmark(lcd, iterations=20):
+    """ Measure refresh latency and throughput of a CharLCD.
+
+        Returns a dict with:
+          full_ms      - mean time to rewrite every cell
+          change_ms    - mean time to update one changing number
+          same_ms      - mean time to "write" a frame that is already shown
+          chars_per_s  - characters per second during full rewrites
+    """
+    frames = [["A" * lcd.cols] * lcd.rows, ["B" * lcd.cols] * lcd.rows]
+    cells  = lcd.cols * lcd.rows
+    lcd.set_frame(frames[1])
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        lcd.set_frame(frames[i % 2])
+    full = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        lcd.set_frame(["HEATING Set:60C", "Now:{0:.1f}C".format(20.0 + i / 10.0)])
+    change = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        lcd.set_frame(["HEATING Set:60C", "Now:20.0C"])
+    same = (time.perf_counter() - start) / iterations
+
+    return {
+        "full_ms"     : full * 1000,
+        "change_ms"   : change * 1000,
+        "same_ms"     : same * 1000,
+        "chars_per_s" : cells / full if full > 0 else float("inf"),
+    }
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    transport_name = sys.argv[1] if len(sys.argv) > 1 else "parallel"
+
+    if transport_name == "parallel":
+        # Wiring from coffee_heater.py
+        from hd44780 import HD44780
+        lcd = HD44780("P1_2", "P1_4", "P2_18", "P2_20", "P2_22", "P2_24")
+    elif transport_name == "i2c":
+        # Wiring from coffeeheateredit.py
+        lcd = CharLCD(I2CBackpackTransport())
+    elif transport_name == "blinka":
+        # Wiring from coffeewarmer/lcd_test.py
+        import board
+        import digitalio
+        import adafruit_character_lcd.character_lcd as characterlcd
+        pins = [digitalio.DigitalInOut(p) for p in
+                (board.P2_4, board.P2_6, board.P2_8, board.P2_10, board.P2_1, board.P2_5)]
+        lcd = CharLCD(BlinkaTransport(characterlcd.Character_LCD_Mono(*pins, 16, 2)))
+    else:
+        print("Usage: char_lcd.py [parallel|i2c|blinka]")
+        sys.exit(1)
+
+    try:
+        lcd.setup()
+        results = benchmark(lcd)
+        print("LCD benchmark ({0})".format(transport_name))
+        print("  Full refresh:     {0:8.2f} ms".format(results["full_ms"]))
+        print("  Number change:    {0:8.2f} ms".format(results["change_ms"]))
+        print("  Unchanged frame:  {0:8.3f} ms".format(results["same_ms"]))
+        print("  Throughput:       {0:8.0f} chars/s".format(results["chars_per_s"]))
+    finally:
+        lcd.cleanup()
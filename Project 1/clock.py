@@ -0,0 +1,126 @@
+"""
+--------------------------------------------------------------------------
+Clocks
+--------------------------------------------------------------------------
+License:
+Copyright 2025 - Emma Berdou
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+2. Redistributions   in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors
+may be used to endorse or promote products derived from this software without
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Clocks
+
+  The control code takes its time from a clock object instead of calling
+time.monotonic() / time.sleep() directly, so the same code can run in real
+time on the PocketBeagle or in simulated time against the virtual hardware.
+
+  SimClock never waits:  sleep() just moves the simulated time forward, so
+a loop that sleeps until its next deadline jumps straight to it and a day of
+control runs in seconds.  A SimClock must only be used from one thread.
+
+Software API:
+
+  WallClock()
+    monotonic()
+      - Return time.monotonic()
+    sleep(seconds)
+      - time.sleep(seconds)
+
+  SimClock(start=0.0)
+    monotonic()
+      - Return the simulated time
+    sleep(seconds)
+      - Advance the simulated time by seconds and return immediately
+    advance(seconds)
+      - Same as sleep()
+
+"""
+import time
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class WallClock():
+    """ Real time """
+
+    def monotonic(self):
+        """ Return the current time in seconds """
+        return time.monotonic()
+
+    # End def
+
+
+    def sleep(self, seconds):
+        """ Wait for seconds """
+        if seconds > 0:
+            time.sleep(seconds)
+
+    # End def
+
+# End class
+
+
+class SimClock():
+    """ Simulated time that advances only when slept """
+    now                           = None
+
+    def __init__(self, start=0.0):
+        """ Initialize variables """
+        self.now = start
+
+    # End def
+
+
+    def monotonic(self):
+        """ Return the simulated time in seconds """
+        return self.now
+
+    # End def
+
+
+    def sleep(self, seconds):
+        """ Jump forward by seconds """
+        if seconds > 0:
+            self.now += seconds
+
+    # End def
+
+
+    def advance(self, seconds):
+        """ Jump forward by seconds """
+        self.sleep(seconds)
+
+    # End def
+
+# End class
@@ -36,12 +36,43 @@ THE POSSIBILITY OF SUCH DAMAGE.
 """
 
 import os
+import signal
 import sys
 import time
-import glob
-import Adafruit_BBIO.GPIO as GPIO
+from collections import namedtuple
 import Adafruit_BBIO.ADC as ADC
 
+from ds18b20 import TempReader
+from w1_bus import W1Bus
+from hd44780 import HD44780
+from mmap_gpio import get_gpio
+from scheduler import Scheduler
+from gesture import GestureDecoder, CLICK, DOUBLE_CLICK, LONG_PRESS
+import controller
+from controller import BangBangController, PIDRelayController
+from autotune import RelayAutotuner, load_gains, save_gains
+from clock import WallClock
+from state_exchange import CommandChannel, Snapshot
+from adc_filter import PotReader, PIN_TO_AIN
+from telemetry import Telemetry, LOG_RECORD, LOG_VERBOSE, LOG_LEVEL_NAMES, format_sample
+from tsdb import TimeSeriesDB
+from instrument import Instruments, DumpServer, SOCKET_PATH
+
+# -------------------------
+# Clock
+# -------------------------
+# All control timing comes from this clock (swap in clock.SimClock to run
+# the control code faster than real time)
+clock = WallClock()
+
+# -------------------------
+# GPIO Backend
+# -------------------------
+# Direct register access through /dev/mem when running as root, otherwise
+# Adafruit_BBIO.GPIO; both have the same interface
+USE_MMAP_GPIO = True
+GPIO = get_gpio(USE_MMAP_GPIO)
+
 # -------------------------
 # Load 1-Wire Modules
 # -------------------------
@@ -51,31 +82,74 @@ os.system('modprobe w1-therm')
 # -------------------------
 # DS18B20 Temperature Sensor
 # -------------------------
-base_dir = '/sys/bus/w1/devices/'
-folders = glob.glob(base_dir + '28*')
-device_file = None
-if folders:
-    device_file = os.path.join(folders[0], 'w1_slave')
-else:
-    print("Warning: No DS18B20 sensor detected; readings will be 0.0")
-
-def read_temp_raw():
-    if not device_file:
-        return None
-    with open(device_file, 'r') as f:
-        return f.readlines()
-
-def read_temp():
-    if not device_file:
-        return None
-    lines = read_temp_raw()
-    while lines[0].strip()[-3:] != 'YES':
-        time.sleep(0.2)
-        lines = read_temp_raw()
-    pos = lines[1].find('t=')
-    if pos != -1:
-        return float(lines[1][pos+2:]) / 1000.0
-    return None
+w1_bus = W1Bus()
+if not w1_bus.list_sensors():
+    print("Warning: No DS18B20 sensor detected; heater stays off and shows NO TEMP until one is found")
+
+# Probe used for control; None uses the first probe on the bus
+CONTROL_SENSOR = None
+
+# A w1 conversion takes ~750 ms, so all probes are converted together on
+# their own thread and the main loop just picks up the latest good sweep
+TEMP_READ_PERIOD = 1.0
+TEMP_MAX_AGE = 5.0
+
+# Sensor modes (resolution in bits): fast and coarse (0.5 C, ~94 ms) while
+# far from the setpoint, slow and precise (0.0625 C, ~750 ms) near it
+SENSOR_MODE_FAST = 9
+SENSOR_MODE_PRECISE = 12
+# Separate enter / exit bands so noise around one edge cannot flip the
+# mode (and rewrite every probe's resolution) on each control tick
+SENSOR_FAST_BAND = 3.0     # C from the setpoint to switch to fast
+SENSOR_PRECISE_BAND = 2.0  # C from the setpoint to switch back to precise
+TEMP_MIN_PERIOD = 0.1
+sensor_mode = None
+
+def read_temps():
+    return w1_bus.read_all()
+
+# The control probe is fixed once chosen:  if it fails, control stops
+# rather than carrying on with another probe's reading
+control_probe = CONTROL_SENSOR
+
+def control_device_id():
+    global control_probe
+    if control_probe is None:
+        sensors = w1_bus.list_sensors()
+        if sensors:
+            control_probe = sensors[0]
+    return control_probe or "default"
+
+def read_temp(temps=None):
+    if temps is None:
+        temps = read_temps()
+    return temps.get(control_device_id())
+
+# Each probe keeps its last good reading; a probe that fails its CRC check
+# goes stale instead of being replaced by None
+temp_reader = TempReader(read_temps, TEMP_READ_PERIOD)
+
+def apply_sensor_mode(bits):
+    # Runs on the TempReader thread, between conversions:  the sysfs writes
+    # block, so they stay off the control loop
+    w1_bus.set_resolution(bits)
+    # Sample as fast as the probes can convert
+    temp_reader.period = max(w1_bus.get_conversion_time(), TEMP_MIN_PERIOD)
+    print(f"Sensor mode: {bits}-bit, period {temp_reader.period:.3f}s")  # Debug
+
+def set_sensor_mode(bits):
+    global sensor_mode
+    if bits == sensor_mode:
+        return
+    sensor_mode = bits
+    temp_reader.run_on_thread(lambda: apply_sensor_mode(bits))
+
+def select_sensor_mode(cur, want):
+    error = abs(want - cur)
+    if sensor_mode != SENSOR_MODE_FAST and error > SENSOR_FAST_BAND:
+        set_sensor_mode(SENSOR_MODE_FAST)
+    elif sensor_mode != SENSOR_MODE_PRECISE and error < SENSOR_PRECISE_BAND:
+        set_sensor_mode(SENSOR_MODE_PRECISE)
 
 # -------------------------
 # LCD (4-bit Parallel)
@@ -86,61 +160,57 @@ LCD_D4 = "P2_18"
 LCD_D5 = "P2_20"
 LCD_D6 = "P2_22"
 LCD_D7 = "P2_24"
-lcd_pins = [LCD_RS, LCD_E, LCD_D4, LCD_D5, LCD_D6, LCD_D7]
+LCD_RW = None  # Set to the R/W GPIO for busy-flag timing (3.3 V display only)
 
-LCD_CMD_CLEAR = 0x01
-LCD_CMD_FUNCTION = 0x28
-LCD_CMD_DISPLAY_ON = 0x0C
-LCD_CMD_ENTRY_MODE = 0x06
+# The driver keeps a copy of what is on the glass and only sends the
+# characters that changed
+lcd = HD44780(LCD_RS, LCD_E, LCD_D4, LCD_D5, LCD_D6, LCD_D7, cols=16, rows=2,
+              gpio=GPIO, rw=LCD_RW)
 
 def lcd_setup():
-    for p in lcd_pins:
-        GPIO.setup(p, GPIO.OUT)
-    lcd_init()
-
-def lcd_toggle():
-    time.sleep(0.001)
-    GPIO.output(LCD_E, GPIO.HIGH)
-    time.sleep(0.001)
-    GPIO.output(LCD_E, GPIO.LOW)
-    time.sleep(0.001)
-
-def lcd_nibble(n):
-    GPIO.output(LCD_D4, GPIO.HIGH if (n & 1) else GPIO.LOW)
-    GPIO.output(LCD_D5, GPIO.HIGH if (n & 2) else GPIO.LOW)
-    GPIO.output(LCD_D6, GPIO.HIGH if (n & 4) else GPIO.LOW)
-    GPIO.output(LCD_D7, GPIO.HIGH if (n & 8) else GPIO.LOW)
-    lcd_toggle()
-
-def lcd_byte(b, mode):
-    GPIO.output(LCD_RS, GPIO.HIGH if mode else GPIO.LOW)
-    lcd_nibble((b >> 4) & 0x0F)
-    lcd_nibble(b & 0x0F)
-    time.sleep(0.002)
-
-def lcd_init():
-    time.sleep(0.02)
-    GPIO.output(LCD_RS, GPIO.LOW)
-    for _ in range(3):
-        lcd_nibble(0x03)
-        time.sleep(0.005)
-    lcd_nibble(0x02)
-    time.sleep(0.001)
-    lcd_byte(LCD_CMD_FUNCTION, False)
-    lcd_byte(LCD_CMD_DISPLAY_ON, False)
-    lcd_byte(LCD_CMD_CLEAR, False)
-    lcd_byte(LCD_CMD_ENTRY_MODE, False)
-    time.sleep(0.002)
+    lcd.setup()
 
 def lcd_message(msg, line=1):
-    addr = 0x80 if line == 1 else 0xC0
-    lcd_byte(addr, False)
-    for c in msg:
-        lcd_byte(ord(c), True)
+    lcd.message(msg, line)
 
 def lcd_clear():
-    lcd_byte(LCD_CMD_CLEAR, False)
-    time.sleep(0.002)
+    lcd.clear()
+
+# -------------------------
+# Setpoint Potentiometer
+# -------------------------
+# Each read takes a burst of samples through one open sysfs file, then
+# median + moving average + deadband so pot noise does not move the setpoint
+POT_PIN = "P1_19"
+SETPOINT_BURST = 8
+SETPOINT_ALPHA = 0.25
+SETPOINT_DEADBAND = 0.5  # C
+
+# -------------------------
+# Heater Current Monitor
+# -------------------------
+# Optional current sensor on the heater supply, scaled into the ADC's
+# 0 - 1.8 V range.  When CURRENT_SENSE_PIN is set the ADC streams
+# continuously through the IIO buffer (needs numpy), and the pot is read
+# from the same stream since sysfs reads fail while the buffer is enabled.
+CURRENT_SENSE_PIN = None       # e.g. "P1_21"
+CURRENT_ZERO_VOLTS = 0.9       # Sensor output at 0 A
+CURRENT_AMPS_PER_VOLT = 10.0
+CURRENT_WINDOW = 2048          # Scans per RMS reading
+CURRENT_SAMPLE_RATE = None     # None keeps the device tree rate
+CURRENT_MIN_AMPS = 0.5         # Less than this with the relays on is a fault
+CURRENT_FAULT_COUNT = 3        # Low readings in a row before warning
+
+adc_stream = None
+pot_channel = None
+if CURRENT_SENSE_PIN is not None:
+    from iio_stream import IIOStream
+    adc_stream = IIOStream([PIN_TO_AIN[POT_PIN], PIN_TO_AIN[CURRENT_SENSE_PIN]],
+                           sample_rate=CURRENT_SAMPLE_RATE)
+    pot_channel = adc_stream.channel(PIN_TO_AIN[POT_PIN])
+
+pot_reader = PotReader(POT_PIN, 100.0, SETPOINT_BURST, SETPOINT_ALPHA, SETPOINT_DEADBAND,
+                       channel=pot_channel)
 
 # -------------------------
 # Other Hardware Pins
@@ -150,44 +220,215 @@ HEATER1_PIN = "P2_32"
 HEATER2_PIN = "P2_34"
 
 heater_enabled = False
-_last_button_state = True
+
+# -------------------------
+# Control State Exchange
+# -------------------------
+# Only control_task() changes the control state.  Anything else (button,
+# interrupt callbacks, other threads) sends it a command, and reads the
+# snapshot it publishes every tick.
+ControlState = namedtuple("ControlState", ["enabled", "desired", "current", "status", "heater_on"])
+commands = CommandChannel()
+control_state = Snapshot(ControlState(False, 0, None, "OFF", False))
+
+# Click toggles the heater, double click starts auto-tuning at the current
+# setpoint, long press prints the task statistics
+button_gestures = GestureDecoder()
 
 def check_button():
-    global heater_enabled, _last_button_state
-    state = GPIO.input(BUTTON_PIN)
-    if state == GPIO.LOW and _last_button_state == GPIO.HIGH:
-        heater_enabled = not heater_enabled
-        print(f"Heater toggled: {'ON' if heater_enabled else 'OFF'}")  # Debug
-        time.sleep(0.2)  # debounce
-    _last_button_state = state
+    pressed = GPIO.input(BUTTON_PIN) == GPIO.LOW
+    event = button_gestures.update(pressed, clock.monotonic())
+    if event == CLICK:
+        commands.send("toggle")
+    elif event == DOUBLE_CLICK:
+        commands.send("autotune")
+    elif event == LONG_PRESS:
+        print(scheduler.report())
+
+# -------------------------
+# Heater Control
+# -------------------------
+# "pid": PID driving the relays by pulse density (no window to wait out)
+# "bangbang": original on-below-setpoint control with hysteresis
+# The PID defaults live in controller.py so the simulations run the same
+# configuration; see controller_benchmark.py for how they compare
+CONTROL_MODE = "pid"
+PID_KP = controller.PID_KP
+PID_KI = controller.PID_KI
+PID_KD = controller.PID_KD
+PID_D_FILTER = controller.PID_D_FILTER
+RELAY_WINDOW = controller.RELAY_WINDOW        # None: pulse density
+RELAY_MIN_PULSE = controller.RELAY_MIN_PULSE  # Shortest relay on / off time
+BANGBANG_HYSTERESIS = 1.0
+READY_BAND = 1.0           # Within this many C of the setpoint shows DONE
+
+# Relay auto-tuning: gains are stored per control probe in pid_gains.json
+# and override the PID_* defaults.  The rule must suit RELAY_WINDOW (see
+# autotune.TUNING_RULES)
+AUTOTUNE_RULE = "pulse_density"
+AUTOTUNE_HYSTERESIS = 0.25
+AUTOTUNE_CYCLES = 4
+AUTOTUNE_TIMEOUT = 3600.0
+
+# The gains are reloaded when the control probe changes (e.g. the probe is
+# only found after start-up, when they were loaded for "default")
+gains_device = None
+
+def make_controller(mode):
+    global gains_device
+    gains_device = control_device_id()
+    if mode == "bangbang":
+        return BangBangController(BANGBANG_HYSTERESIS)
+    gains = load_gains(gains_device) or {"kp": PID_KP, "ki": PID_KI, "kd": PID_KD}
+    print(f"PID gains: kp={gains['kp']:.4f} ki={gains['ki']:.5f} kd={gains['kd']:.3f}")  # Debug
+    return PIDRelayController(gains["kp"], gains["ki"], gains["kd"],
+                              RELAY_WINDOW, RELAY_MIN_PULSE, PID_D_FILTER)
+
+heater_controller = make_controller(CONTROL_MODE)
+heater_on = False
+relay_actuations = 0
+autotuner = None
+
+def start_autotune(setpoint):
+    global autotuner, heater_enabled
+    autotuner = RelayAutotuner(setpoint, AUTOTUNE_HYSTERESIS, AUTOTUNE_CYCLES,
+                               AUTOTUNE_TIMEOUT, AUTOTUNE_RULE)
+    heater_enabled = True
+    print(f"Auto-tune started at {setpoint}C")  # Debug
+
+def finish_autotune():
+    global autotuner, heater_controller
+    result = autotuner.get_result()
+    error = autotuner.get_error()
+    autotuner = None
+    if result is None:
+        print(f"Auto-tune failed: {error}")  # Debug
+        return
+    save_gains(control_device_id(), result)
+    print(f"Auto-tune done: Ku={result.ku:.3f} Pu={result.pu:.1f}s")  # Debug
+    heater_controller = make_controller(CONTROL_MODE)
+
+def set_heater(on):
+    global heater_on, relay_actuations
+    # Only touch the relays when the state changes
+    if on == heater_on:
+        return
+    level = GPIO.LOW if on else GPIO.HIGH  # Relays are active LOW
+    GPIO.output(HEATER1_PIN, level)
+    GPIO.output(HEATER2_PIN, level)
+    heater_on = on
+    relay_actuations += 1
 
 def update_heater(cur, want):
+    global autotuner, heater_controller
+    if control_device_id() != gains_device:
+        heater_controller = make_controller(CONTROL_MODE)
     if not heater_enabled:
-        GPIO.output(HEATER1_PIN, GPIO.HIGH)  # OFF
-        GPIO.output(HEATER2_PIN, GPIO.HIGH)  # OFF
+        autotuner = None  # Turning the heater off cancels auto-tuning
+        heater_controller.reset()
+        set_heater(False)
         return "OFF"
-    if cur < want:
-        GPIO.output(HEATER1_PIN, GPIO.LOW)   # ON
-        GPIO.output(HEATER2_PIN, GPIO.LOW)   # ON
+    if cur is None:
+        # No fresh reading from the control probe: fail safe
+        if autotuner is not None:
+            autotuner = None
+            print("Auto-tune cancelled: no temperature")  # Debug
+        heater_controller.reset()
+        set_heater(False)
+        return "NO TEMP"
+    if autotuner is not None:
+        set_heater(autotuner.update(cur, clock.monotonic()))
+        if autotuner.is_done():
+            finish_autotune()
+        return "TUNING"
+    set_heater(heater_controller.update(want, cur, clock.monotonic()))
+    if cur < want - READY_BAND:
         return "HEATING"
-    GPIO.output(HEATER1_PIN, GPIO.HIGH)      # OFF
-    GPIO.output(HEATER2_PIN, GPIO.HIGH)      # OFF
     return "DONE"
 
+# -------------------------
+# Telemetry
+# -------------------------
+# Every control tick is recorded in a binary ring and flushed in blocks to
+# the history store (1 s / 1 min / 1 h tiers under history/; print one with
+# "tsdb.py 1m 24").  Set TELEMETRY_RAW_FILE to also keep every tick (print
+# it with "telemetry.py FILE").  SIGUSR1 cycles the level (off / record /
+# verbose); verbose also prints a status line every DEBUG_PERIOD:
+#   systemctl kill -s USR1 <service>
+TELEMETRY_LEVEL = LOG_RECORD
+TELEMETRY_CAPACITY = 4096  # Samples; ~7 minutes of control ticks
+TELEMETRY_FLUSH_PERIOD = 30.0
+TELEMETRY_RAW_FILE = None
+HISTORY_FLUSH_PERIOD = 600.0  # Most history a power cut can lose
+
+history = TimeSeriesDB()
+telemetry = Telemetry(TELEMETRY_RAW_FILE, TELEMETRY_CAPACITY, TELEMETRY_LEVEL,
+                      on_flush=history.add_columns)
+
+def log_level_signal(signum, frame):
+    commands.send("log_level")
+
+# -------------------------
+# Instrumentation
+# -------------------------
+# Every scheduler task is timed (deadline: its period), and the phases of
+# the control task on their own.  SIGUSR2 prints the latency report; it is
+# also served on INSTRUMENT_SOCKET (read it with "instrument.py SOCKET"),
+# $XDG_RUNTIME_DIR or /run.  If the socket cannot be created (e.g. /run when
+# not root) the report is only available through SIGUSR2.
+INSTRUMENT_SOCKET = SOCKET_PATH  # None: signal only
+
+instruments = Instruments()
+dump_server = None
+if INSTRUMENT_SOCKET is not None:
+    dump_server = DumpServer(instruments, INSTRUMENT_SOCKET)
+
+pot_span = instruments.span("ctl.pot")
+mode_span = instruments.span("ctl.mode")
+heater_span = instruments.span("ctl.heater")
+record_span = instruments.span("ctl.record")
+
+def instruments_signal(signum, frame):
+    commands.send("instruments")
+
 # -------------------------
 # Setup & Cleanup
 # -------------------------
 def setup():
+    global dump_server
     print(">> STARTING SETUP")
     ADC.setup()
+    if adc_stream is not None:
+        adc_stream.start()
     GPIO.setup(BUTTON_PIN, GPIO.IN)
     for p in (HEATER1_PIN, HEATER2_PIN):
         GPIO.setup(p, GPIO.OUT)
         GPIO.output(p, GPIO.HIGH)  # Initialize relays to OFF (HIGH)
     lcd_setup()
+    set_sensor_mode(SENSOR_MODE_PRECISE)
+    temp_reader.start()
+    signal.signal(signal.SIGUSR1, log_level_signal)
+    signal.signal(signal.SIGUSR2, instruments_signal)
+    signal.signal(signal.SIGTERM, stop_signal)
+    if dump_server is not None:
+        try:
+            dump_server.start()
+        except OSError as e:
+            print(f"Warning: no instrument socket at {INSTRUMENT_SOCKET} ({e}); use SIGUSR2")
+            dump_server = None
     print(">> SETUP COMPLETE")
 
 def cleanup():
+    temp_reader.stop()
+    telemetry.flush()
+    history.close()
+    pot_reader.close()
+    if adc_stream is not None:
+        adc_stream.stop()
+    if dump_server is not None:
+        dump_server.stop()
+    print(scheduler.report())
+    print(instruments.report())
     lcd_clear()
     for p in (HEATER1_PIN, HEATER2_PIN):
         GPIO.output(p, GPIO.HIGH)  # Ensure relays are OFF on exit
@@ -196,23 +437,129 @@ def cleanup():
 # -------------------------
 # Main Loop
 # -------------------------
+# Each task runs at its own rate on the scheduler; the sensor task follows
+# the probes' conversion time
+BUTTON_PERIOD = 0.01
+CONTROL_PERIOD = 0.1
+LCD_PERIOD = 0.25
+DEBUG_PERIOD = 1.0
+CURRENT_PERIOD = 0.5
+REPORT_PERIOD = 60.0
+
+scheduler = Scheduler(clock.monotonic, clock.sleep)
+tasks = {}
+
+def stop_signal(signum, frame):
+    # systemctl stop sends SIGTERM:  leave the main loop after the current
+    # task so cleanup() still turns the relays off
+    scheduler.stop()
+
+current = None  # None while the control probe is missing or stale
+
+def sensor_task():
+    global current
+    current = read_temp(temp_reader.get_temps(TEMP_MAX_AGE))
+    set_task_period("sensor", temp_reader.period)
+
+def apply_commands(desired):
+    global heater_enabled
+    for command, _ in commands.drain():
+        if command == "toggle":
+            heater_enabled = not heater_enabled
+            print(f"Heater toggled: {'ON' if heater_enabled else 'OFF'}")  # Debug
+        elif command == "autotune":
+            start_autotune(desired)
+        elif command == "log_level":
+            level = telemetry.cycle_level()
+            print(f"Telemetry level: {LOG_LEVEL_NAMES[level]}")
+        elif command == "instruments":
+            print(instruments.report())
+
+def control_task():
+    with pot_span:
+        desired = int(round(pot_reader.read()))
+    apply_commands(desired)
+    with mode_span:
+        if current is not None:
+            select_sensor_mode(current, desired)
+    with heater_span:
+        status = update_heater(current, desired)
+    control_state.publish(ControlState(heater_enabled, desired, current, status, heater_on))
+    with record_span:
+        # The scheduler moves next_release on only after the task returns
+        latency = clock.monotonic() - tasks["control"].next_release
+        temp = current if current is not None else float("nan")
+        telemetry.record(time.time(), desired, temp, heater_on, latency)
+
+heater_amps = 0.0
+current_faults = 0
+
+def current_task():
+    global heater_amps, current_faults
+    adc_stream.poll()
+    volts = adc_stream.get_rms(PIN_TO_AIN[CURRENT_SENSE_PIN], CURRENT_WINDOW,
+                               CURRENT_ZERO_VOLTS)
+    heater_amps = volts * CURRENT_AMPS_PER_VOLT
+    # The window straddles relay switching, so only warn on a run of lows
+    if heater_on and heater_amps < CURRENT_MIN_AMPS:
+        current_faults += 1
+        if current_faults == CURRENT_FAULT_COUNT:
+            print(f"Warning: relays on but heater draws {heater_amps:.2f}A")
+    else:
+        current_faults = 0
+
+def lcd_task():
+    s = control_state.get()
+    lcd_message(f"{s.status} Set:{s.desired}C", 1)
+    if s.current is None:
+        lcd_message("Now:--.-C", 2)
+    else:
+        lcd_message(f"Now:{s.current:.1f}C", 2)
+
+def debug_task():
+    # Status line from the last recorded sample, only when verbose
+    sample = telemetry.get_latest()
+    if telemetry.level < LOG_VERBOSE or sample is None:
+        return
+    s = control_state.get()
+    line = f"DBG: {s.status} enabled={s.enabled} {format_sample(sample)} actuations={relay_actuations}"
+    if adc_stream is not None:
+        line += f" current={heater_amps:.2f}A"
+    print(line)
+
+def telemetry_task():
+    telemetry.flush()
+
+def history_task():
+    history.flush()
+
+def report_task():
+    print(scheduler.report())
+
+def add_task(name, period, function, offset=0.0):
+    # Timed by the instruments, with the period as the deadline
+    timed = instruments.wrap(name, function, period)
+    tasks[name] = scheduler.add_task(name, period, timed, offset=offset)
+
+def set_task_period(name, period):
+    # Keep the span deadline in step (the scheduler's defaults to the period)
+    if tasks[name].period != period:
+        tasks[name].period = period
+        instruments.span(name).set_deadline(period)
+
 def main_loop():
     print(">> ENTERING MAIN LOOP")
-    while True:
-        check_button()
-        desired = int(round(ADC.read("P1_19") * 100))
-        current = read_temp() or 0.0
-        status = update_heater(current, desired)
-        
-        # Debug prints (check GPIO states)
-        h1_state = "ON (LOW)" if GPIO.input(HEATER1_PIN) == GPIO.LOW else "OFF (HIGH)"
-        h2_state = "ON (LOW)" if GPIO.input(HEATER2_PIN) == GPIO.LOW else "OFF (HIGH)"
-        print(f"DBG: enabled={heater_enabled}, status={status}, set={desired}, now={current:.1f}")
-        print(f"DBG: HEATER1={h1_state}, HEATER2={h2_state}")
-        
-        lcd_message(f"{status} Set:{desired}C", 1)
-        lcd_message(f"Now:{current:.1f}C", 2)
-        time.sleep(1)
+    add_task("button", BUTTON_PERIOD, check_button)
+    add_task("sensor", temp_reader.period, sensor_task)
+    add_task("control", CONTROL_PERIOD, control_task)
+    add_task("lcd", LCD_PERIOD, lcd_task)
+    add_task("debug", DEBUG_PERIOD, debug_task)
+    add_task("telemetry", TELEMETRY_FLUSH_PERIOD, telemetry_task, offset=TELEMETRY_FLUSH_PERIOD)
+    add_task("history", HISTORY_FLUSH_PERIOD, history_task, offset=HISTORY_FLUSH_PERIOD)
+    if adc_stream is not None:
+        add_task("current", CURRENT_PERIOD, current_task)
+    add_task("report", REPORT_PERIOD, report_task, offset=REPORT_PERIOD)
+    scheduler.run()
 
 if __name__ == '__main__':
     try:
@@ -0,0 +1,354 @@
+"""
+--------------------------------------------------------------------------
+Heater Controllers
+--------------------------------------------------------------------------
+License:
+Copyright 2025 - Emma Berdou
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+2. Redistributions   in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors
+may be used to endorse or promote products derived from this software without
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Heater Controllers
+
+  Every controller has the same interface, so the heater code can switch
+between them:
+
+    update(setpoint, measurement, now)  ->  True (heater on) / False
+    reset()
+
+  BangBangController is the original "on below the setpoint" logic, with
+optional hysteresis (coffeeheateredit.py used 1 C).
+
+  PIDRelayController runs a PID controller and turns its 0 - 1 output into
+relay on/off time with time-proportioning:  every "window" seconds the relay
+is switched on for output * window seconds and then off.  The relays switch
+at most twice per window instead of on every loop tick, and the heater gets
+a proportional amount of power instead of all or nothing.  With window=None
+it uses PulseDensityOutput instead:  no window to wait out, so a step in
+the output (fresh coffee, a new setpoint) changes the relay at once, and
+min_pulse is a hard floor on every on and off time.
+
+  The PID controller:
+    - takes the derivative of the measurement, not the error, so setpoint
+      changes do not cause derivative kicks; the derivative is low-pass
+      filtered since the DS18B20 reads in 0.0625 C steps
+    - stops integrating while the output is saturated in the direction the
+      error is pushing (conditional integration) and clamps the integral
+      term to the output range, so the integral does not wind up during a
+      long warm-up and overshoot afterwards
+
+Software API:
+
+  BangBangController(hysteresis=0.0)
+
+  PIDController(kp, ki, kd, out_min=0.0, out_max=1.0, d_filter=5.0)
+    - d_filter is the derivative filter time constant in seconds
+    compute(setpoint, measurement, now)
+      - Return the output, clamped to [out_min, out_max]
+    reset()
+
+  TimeProportionalOutput(window=10.0, min_pulse=0.5)
+    update(duty, now)
+      - Return the relay state for a 0 - 1 duty cycle
+      - Pulses shorter than min_pulse are dropped / stretched to a full
+        window to save relay switching
+
+  PulseDensityOutput(min_pulse=30.0)
+    update(duty, now)
+      - Return the relay state for a 0 - 1 duty cycle
+      - Integrates requested minus delivered on-time and switches when it
+        reaches +/- min_pulse / 2, so each on / off time is >= min_pulse
+
+  PIDRelayController(kp, ki, kd, window=10.0, min_pulse=0.5, d_filter=5.0)
+    - PIDController + TimeProportionalOutput, or PulseDensityOutput if
+      window is None
+    - get_output() returns the last PID output (0 - 1)
+
+"""
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+# Coffee warmer defaults, shared by coffee_heater.py and the simulations;
+# chosen with batch_sim.py (classwork/project_01/coffee_warmer)
+PID_KP                = 1.3             # Duty per C of error
+PID_KI                = 0.01            # Duty per C*s
+PID_KD                = 48.0            # Duty per C/s (on the measurement)
+PID_D_FILTER          = 13.0            # Derivative filter, seconds
+RELAY_WINDOW          = None            # None: pulse density, no window
+RELAY_MIN_PULSE       = 28.0            # Shortest relay on / off time
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class BangBangController():
+    """ On below the setpoint, off above it """
+    hysteresis                    = None
+    _on                           = None
+
+    def __init__(self, hysteresis=0.0):
+        """ Initialize variables """
+        self.hysteresis = hysteresis
+        self._on        = False
+
+    # End def
+
+
+    def reset(self):
+        """ Start from the heater being off """
+        self._on = False
+
+    # End def
+
+
+    def update(self, setpoint, measurement, now):
+        """ Return True if the heater should be on """
+        if measurement < setpoint - self.hysteresis:
+            self._on = True
+        elif measurement >= setpoint:
+            self._on = False
+        return self._on
+
+    # End def
+
+# End class
+
+
+class PIDController():
+    """ PID with derivative on measurement and integral anti-windup """
+    kp                            = None
+    ki                            = None
+    kd                            = None
+    out_min                       = None
+    out_max                       = None
+    d_filter                      = None
+
+    _integral                     = None
+    _derivative                   = None
+    _last_measurement             = None
+    _last_time                    = None
+    _output                       = None
+
+    def __init__(self, kp, ki, kd, out_min=0.0, out_max=1.0, d_filter=5.0):
+        """ Initialize variables """
+        self.kp       = kp
+        self.ki       = ki
+        self.kd       = kd
+        self.out_min  = out_min
+        self.out_max  = out_max
+        self.d_filter = d_filter
+        self.reset()
+
+    # End def
+
+
+    def reset(self):
+        """ Forget the integral and derivative history """
+        self._integral         = 0.0
+        self._derivative       = 0.0
+        self._last_measurement = None
+        self._last_time        = None
+        self._output           = self.out_min
+
+    # End def
+
+
+    def compute(self, setpoint, measurement, now):
+        """ Return the output for this sample """
+        error = setpoint - measurement
+
+        dt = 0.0
+        if self._last_time is not None:
+            dt = now - self._last_time
+
+        if (dt > 0) and (self._last_measurement is not None):
+            raw = -(measurement - self._last_measurement) / dt
+            self._derivative += (raw - self._derivative) * dt / (self.d_filter + dt)
+
+        # Only integrate if it would not push a saturated output further
+        # into saturation
+        if dt > 0:
+            saturated_high = (self._output >= self.out_max) and (error > 0)
+            saturated_low  = (self._output <= self.out_min) and (error < 0)
+            if not (saturated_high or saturated_low):
+                self._integral += self.ki * error * dt
+                self._integral  = min(max(self._integral, self.out_min), self.out_max)
+
+        output = self.kp * error + self._integral + self.kd * self._derivative
+        output = min(max(output, self.out_min), self.out_max)
+
+        self._last_measurement = measurement
+        self._last_time        = now
+        self._output           = output
+        return output
+
+    # End def
+
+
+    def get_output(self):
+        """ Return the last output """
+        return self._output
+
+    # End def
+
+# End class
+
+
+class TimeProportionalOutput():
+    """ Turn a 0 - 1 duty cycle into relay on/off time """
+    window                        = None
+    min_pulse                     = None
+
+    _window_start                 = None
+    _on_time                      = None
+
+    def __init__(self, window=10.0, min_pulse=0.5):
+        """ Initialize variables """
+        self.window    = window
+        self.min_pulse = min_pulse
+        self.reset()
+
+    # End def
+
+
+    def reset(self):
+        """ Start a new window on the next update """
+        self._window_start = None
+        self._on_time      = 0.0
+
+    # End def
+
+
+    def update(self, duty, now):
+        """ Return True if the relay should be on """
+        if (self._window_start is None) or (now - self._window_start >= self.window):
+            self._window_start = now
+            on_time = min(max(duty, 0.0), 1.0) * self.window
+
+            # Skip pulses too short to be worth a relay cycle
+            if on_time < self.min_pulse:
+                on_time = 0.0
+            elif on_time > self.window - self.min_pulse:
+                on_time = self.window
+            self._on_time = on_time
+
+        return (now - self._window_start) < self._on_time
+
+    # End def
+
+# End class
+
+
+class PulseDensityOutput():
+    """ Turn a 0 - 1 duty cycle into relay on/off time without windows """
+    min_pulse                     = None
+
+    _on                           = None
+    _error                        = None
+    _last_time                    = None
+
+    def __init__(self, min_pulse=30.0):
+        """ Initialize variables """
+        self.min_pulse = min_pulse
+        self.reset()
+
+    # End def
+
+
+    def reset(self):
+        """ Start again from the next update """
+        self._on        = False
+        self._error     = 0.0
+        self._last_time = None
+
+    # End def
+
+
+    def update(self, duty, now):
+        """ Return True if the relay should be on """
+        duty = min(max(duty, 0.0), 1.0)
+        if self._last_time is None:
+            self._on = duty >= 0.5
+        else:
+            # On-time asked for minus on-time delivered; after a switch it
+            # has to move a whole min_pulse before the next one
+            limit = self.min_pulse / 2.0
+            self._error += (duty - self._on) * (now - self._last_time)
+            self._error  = min(max(self._error, -limit), limit)
+            if self._error >= limit:
+                self._on = True
+            elif self._error <= -limit:
+                self._on = False
+        self._last_time = now
+        return self._on
+
+    # End def
+
+# End class
+
+
+class PIDRelayController():
+    """ PID controller driving a time-proportioned relay """
+    pid                           = None
+    output                        = None
+
+    def __init__(self, kp, ki, kd, window=10.0, min_pulse=0.5, d_filter=5.0):
+        """ Initialize variables """
+        self.pid    = PIDController(kp, ki, kd, d_filter=d_filter)
+        if window is None:
+            self.output = PulseDensityOutput(min_pulse)
+        else:
+            self.output = TimeProportionalOutput(window, min_pulse)
+
+    # End def
+
+
+    def reset(self):
+        """ Forget the controller history """
+        self.pid.reset()
+        self.output.reset()
+
+    # End def
+
+
+    def update(self, setpoint, measurement, now):
+        """ Return True if the heater should be on """
+        duty = self.pid.compute(setpoint, measurement, now)
+        return self.output.update(duty, now)
+
+    # End def
+
+
+    def get_output(self):
+        """ Return the last PID output (0 - 1) """
+        return self.pid.get_output()
+
+    # End def
+
+# End class
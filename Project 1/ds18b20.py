@@ -0,0 +1,442 @@
+"""
+--------------------------------------------------------------------------
+DS18B20 Temperature Sensor Driver
+--------------------------------------------------------------------------
+License:
+Copyright 2025 - Emma Berdou
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+2. Redistributions   in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors
+may be used to endorse or promote products derived from this software without
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+DS18B20 Driver
+
+  Reads a DS18B20 probe through the Linux w1-therm sysfs interface.  Every
+read of "w1_slave" makes the kernel run a full temperature conversion (about
+750 ms at the default 12-bit resolution), so reading the probe directly from
+the control loop stalls everything else.  The TempReader class moves those
+reads onto a background thread and publishes the latest good sample so the
+control loop only ever does a cheap lookup.
+
+  The probe's "w1_slave" file is kept open and re-read with os.preadv() into
+a preallocated buffer, and the CRC flag and "t=" value are parsed straight
+out of that buffer, so read_millidegrees() builds no intermediate strings or
+lists.  "bench_ds18b20.py" compares it with the old text-mode reader.
+
+Software API:
+
+  DS18B20(device_file)
+    - Provide the path to the probe's "w1_slave" file
+
+    read_millidegrees()
+      - Do one read of the probe
+      - Return the temperature in integer millidegrees C, or None if the
+        CRC check failed or the probe has gone away
+      - Function consumes time (one conversion)
+
+    read_temp()
+      - Same as read_millidegrees(), but in C
+
+    close()
+      - Close the probe's file (it is reopened on the next read)
+
+    get_resolution() / set_resolution(bits)
+      - Read / set the conversion resolution (9, 10, 11 or 12 bits) through
+        the w1-therm "resolution" attribute (setting needs root)
+      - Lower resolution converts faster:  9 bits = 0.5 C in ~94 ms,
+        12 bits = 0.0625 C in ~750 ms (see CONVERSION_TIMES)
+
+    get_conversion_time()
+      - Return the conversion time in seconds for the current resolution
+
+  TempReader(read_function, period=1.0)
+    - Provide a function that returns a new reading (or None on failure),
+      or a dict of readings {probe id: value or None}; each probe then
+      keeps its own last good sample, so one failed read does not replace
+      the good readings
+
+    start() / stop()
+      - Start / stop the background reader thread
+
+    run_on_thread(function)
+      - Queue function() to run on the reader thread before its next read,
+        e.g. to change the probe resolution without racing a conversion
+      - Function consumes no time
+
+    get_sample()
+      - Return the latest good Sample(value, timestamp), or None
+      - Timestamp is from time.monotonic()
+      - Function consumes no time
+
+    get_temp(max_age=None)
+      - Return the latest good value, or None if there is no sample or the
+        sample is older than max_age seconds
+      - Function consumes no time
+
+    get_samples() / get_temps(max_age=None)
+      - Same for a dict reading function:  return {probe id: Sample} /
+        {probe id: value} of the probes with a good (and fresh) sample
+
+"""
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+W1_DEVICES_DIR   = "/sys/bus/w1/devices/"
+
+# "xx xx xx xx xx xx xx xx xx : crc=xx YES\nxx xx xx xx xx xx xx xx xx t=-xxxxx\n"
+# is at most 76 bytes
+W1_SLAVE_SIZE    = 128
+
+ASCII_0          = ord('0')
+ASCII_9          = ord('9')
+ASCII_MINUS      = ord('-')
+ASCII_Y          = ord('Y')
+ASCII_E          = ord('E')
+ASCII_S          = ord('S')
+
+# Datasheet maximum conversion time (seconds) and step size (C) per
+# resolution (bits)
+CONVERSION_TIMES = {9: 0.094, 10: 0.188, 11: 0.375, 12: 0.750}
+RESOLUTION_STEPS = {9: 0.5,   10: 0.25,  11: 0.125, 12: 0.0625}
+DEFAULT_RESOLUTION = 12
+
+# Sample published by TempReader
+Sample           = namedtuple("Sample", ["value", "timestamp"])
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+def parse_w1_slave(lines):
+    """ Parse the two lines of a w1_slave file.
+
+        Returns:  temperature in C, or None if the CRC check failed
+    """
+    if len(lines) < 2 or lines[0].strip()[-3:] != 'YES':
+        return None
+    pos = lines[1].find('t=')
+    if pos == -1:
+        return None
+    return float(lines[1][pos+2:]) / 1000.0
+
+# End def
+
+
+def parse_w1_slave_buffer(buf, length):
+    """ Parse a w1_slave file held in the first "length" bytes of buf.
+
+        Returns:  temperature in integer millidegrees C, or None if the CRC
+                  check failed
+    """
+    # First line must end in "YES"
+    eol = buf.find(b'\n', 0, length)
+    if (eol < 3) or (buf[eol-3] != ASCII_Y) or (buf[eol-2] != ASCII_E) or (buf[eol-1] != ASCII_S):
+        return None
+
+    pos = buf.find(b't=', eol, length)
+    if pos == -1:
+        return None
+    pos += 2
+
+    negative = False
+    if (pos < length) and (buf[pos] == ASCII_MINUS):
+        negative = True
+        pos += 1
+
+    value  = 0
+    digits = 0
+    while pos < length:
+        c = buf[pos]
+        if (c < ASCII_0) or (c > ASCII_9):
+            break
+        value   = value * 10 + (c - ASCII_0)
+        digits += 1
+        pos    += 1
+
+    if digits == 0:
+        return None
+    return -value if negative else value
+
+# End def
+
+
+class DS18B20():
+    """ DS18B20 Class """
+    device_file                   = None
+    resolution_file               = None
+    resolution                    = None
+
+    _fd                           = None
+    _buf                          = None
+    _iov                          = None
+
+    def __init__(self, device_file=None):
+        """ Initialize variables """
+        if (device_file == None):
+            raise ValueError("device_file not provided for DS18B20()")
+        self.device_file     = device_file
+        self.resolution_file = os.path.join(os.path.dirname(device_file), "resolution")
+        self.resolution      = None
+        self._fd             = None
+        self._buf        = bytearray(W1_SLAVE_SIZE)
+        self._iov        = [self._buf]
+
+    # End def
+
+
+    def read_millidegrees(self):
+        """ Do one conversion and return the temperature in millidegrees C.
+
+            Returns None on a CRC failure or if the probe has gone away; the
+            caller decides when to try again instead of spinning here.
+        """
+        try:
+            if self._fd is None:
+                self._fd = os.open(self.device_file, os.O_RDONLY)
+            # Reading sysfs from offset 0 runs a new conversion
+            length = os.preadv(self._fd, self._iov, 0)
+        except OSError:
+            self.close()
+            return None
+        return parse_w1_slave_buffer(self._buf, length)
+
+    # End def
+
+
+    def read_temp(self):
+        """ Do one conversion and return the temperature in C, or None """
+        value = self.read_millidegrees()
+        if value is None:
+            return None
+        return value / 1000.0
+
+    # End def
+
+
+    def get_resolution(self):
+        """ Return the probe's resolution in bits.
+
+            Falls back to the power-on default if the kernel does not
+            expose the "resolution" attribute.
+        """
+        if self.resolution is None:
+            try:
+                with open(self.resolution_file, 'r') as f:
+                    self.resolution = int(f.read().strip())
+            except (OSError, ValueError):
+                return DEFAULT_RESOLUTION
+        return self.resolution
+
+    # End def
+
+
+    def set_resolution(self, bits):
+        """ Set the probe's resolution in bits (9 - 12).
+
+            Only the scratchpad is written, not the EEPROM, so this is safe
+            to call often.
+
+            Returns:  True  - Resolution set
+                      False - Kernel / permissions did not allow it
+        """
+        if bits not in CONVERSION_TIMES:
+            raise ValueError("Resolution must be one of {0}".format(sorted(CONVERSION_TIMES)))
+        try:
+            with open(self.resolution_file, 'w') as f:
+                f.write("{0}\n".format(bits))
+        except OSError as e:
+            print("DS18B20: could not set resolution of {0}: {1}".format(self.device_file, e))
+            self.resolution = None
+            return False
+        self.resolution = bits
+        return True
+
+    # End def
+
+
+    def get_conversion_time(self):
+        """ Return the conversion time in seconds at the current resolution """
+        return CONVERSION_TIMES[self.get_resolution()]
+
+    # End def
+
+
+    def close(self):
+        """ Close the probe's file """
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+
+    # End def
+
+# End class
+
+
+class TempReader():
+    """ Background reader that publishes the latest good sample """
+    read_function                 = None
+    period                        = None
+
+    _sample                       = None
+    _samples                      = None
+    _thread                       = None
+    _stop_event                   = None
+    _requests                     = None
+
+    def __init__(self, read_function=None, period=1.0):
+        """ Initialize variables """
+        if (read_function == None):
+            raise ValueError("read_function not provided for TempReader()")
+        self.read_function = read_function
+        self.period        = period
+        self._sample       = None
+        self._samples      = {}
+        self._thread       = None
+        self._stop_event   = threading.Event()
+        self._requests     = queue.SimpleQueue()
+
+    # End def
+
+
+    def start(self):
+        """ Start the background reader thread """
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="TempReader")
+        self._thread.daemon = True
+        self._thread.start()
+
+    # End def
+
+
+    def stop(self, timeout=2.0):
+        """ Stop the background reader thread """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    # End def
+
+
+    def run_on_thread(self, function):
+        """ Queue function() to run on the reader thread before its next read """
+        self._requests.put(function)
+
+    # End def
+
+
+    def _run_requests(self):
+        """ Run the queued requests, in order """
+        while True:
+            try:
+                function = self._requests.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                function()
+            except Exception as e:
+                print("TempReader: request failed: {0}".format(e))
+
+    # End def
+
+
+    def _run(self):
+        """ Reader thread: read, publish, wait out the rest of the period """
+        while not self._stop_event.is_set():
+            self._run_requests()
+            start = time.monotonic()
+            try:
+                value = self.read_function()
+            except Exception as e:
+                print("TempReader: read failed: {0}".format(e))
+                value = None
+
+            # Replacing the reference is atomic, so readers never see a
+            # half-built sample and never need a lock
+            if isinstance(value, dict):
+                now     = time.monotonic()
+                samples = dict(self._samples)
+                for key, reading in value.items():
+                    if reading is not None:
+                        samples[key] = Sample(reading, now)
+                self._samples = samples
+            elif value is not None:
+                self._sample = Sample(value, time.monotonic())
+
+            remaining = self.period - (time.monotonic() - start)
+            if remaining > 0:
+                self._stop_event.wait(remaining)
+
+    # End def
+
+
+    def get_sample(self):
+        """ Return the latest good Sample, or None """
+        return self._sample
+
+    # End def
+
+
+    def get_temp(self, max_age=None):
+        """ Return the latest good value, or None if missing / stale """
+        sample = self._sample
+        if sample is None:
+            return None
+        if (max_age is not None) and (time.monotonic() - sample.timestamp > max_age):
+            return None
+        return sample.value
+
+    # End def
+
+
+    def get_samples(self):
+        """ Return {probe id: latest good Sample} """
+        return self._samples
+
+    # End def
+
+
+    def get_temps(self, max_age=None):
+        """ Return {probe id: latest good value} without stale probes """
+        now = time.monotonic()
+        return {key: sample.value for key, sample in self._samples.items()
+                if (max_age is None) or (now - sample.timestamp <= max_age)}
+
+    # End def
+
+# End class
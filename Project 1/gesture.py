@@ -0,0 +1,194 @@
+"""
+--------------------------------------------------------------------------
+Button Gesture Decoder
+--------------------------------------------------------------------------
+License:
+Copyright 2025 - Emma Berdou
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+2. Redistributions   in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors
+may be used to endorse or promote products derived from this software without
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Gesture Decoder
+
+  Turns a stream of timestamped button levels into gestures without ever
+sleeping.  Feed it either polled samples (e.g. from a 10 ms scheduler task)
+or the timestamped edges from Button's edge callback
+(classwork/button/button.py, use_interrupts=True); call update() again
+periodically so time-based gestures (long press, hold repeat, single click)
+fire even when the level does not change.
+
+  Debouncing is done by time:  a level change only counts once it has been
+stable for "debounce" seconds, and the gesture is timed from the moment the
+level first changed.
+
+  Each update() does a few comparisons and returns at most one event, so it
+is cheap enough to run at 1 kHz.
+
+Gestures:
+
+  CLICK         - short press, no second press within "double_click" seconds
+  DOUBLE_CLICK  - second press within "double_click" seconds of a release
+  LONG_PRESS    - held for "long_press" seconds (fires while still held)
+  HOLD_REPEAT   - every "repeat_interval" seconds while held, starting
+                  "repeat_delay" seconds after LONG_PRESS
+
+Software API:
+
+  GestureDecoder(debounce=0.02, double_click=0.3, long_press=1.0,
+                 repeat_delay=0.5, repeat_interval=0.2)
+
+    update(pressed, now)
+      - Provide the current level (True = pressed) and a time.monotonic()
+        timestamp
+      - Return CLICK, DOUBLE_CLICK, LONG_PRESS, HOLD_REPEAT or None
+
+    reset()
+      - Forget any gesture in progress
+
+"""
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+CLICK                 = "click"
+DOUBLE_CLICK          = "double_click"
+LONG_PRESS            = "long_press"
+HOLD_REPEAT           = "hold_repeat"
+
+# Decoder states
+IDLE                  = 0
+PRESSED               = 1     # First press, not yet long
+WAIT_SECOND           = 2     # Released after a short press
+SECOND_PRESSED        = 3     # Second press of a double click
+HELD                  = 4     # Long press in progress
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class GestureDecoder():
+    """ GestureDecoder Class """
+    debounce                      = None
+    double_click                  = None
+    long_press                    = None
+    repeat_delay                  = None
+    repeat_interval               = None
+
+    state                         = None
+    _raw                          = None
+    _raw_since                    = None
+    _stable                       = None
+    _press_time                   = None
+    _release_time                 = None
+    _next_repeat                  = None
+
+    def __init__(self, debounce=0.02, double_click=0.3, long_press=1.0,
+                 repeat_delay=0.5, repeat_interval=0.2):
+        """ Initialize variables """
+        self.debounce        = debounce
+        self.double_click    = double_click
+        self.long_press      = long_press
+        self.repeat_delay    = repeat_delay
+        self.repeat_interval = repeat_interval
+        self.reset()
+
+    # End def
+
+
+    def reset(self):
+        """ Forget any gesture in progress """
+        self.state         = IDLE
+        self._raw          = False
+        self._raw_since    = 0.0
+        self._stable       = False
+        self._press_time   = 0.0
+        self._release_time = 0.0
+        self._next_repeat  = 0.0
+
+    # End def
+
+
+    def update(self, pressed, now):
+        """ Feed the current level; return an event or None """
+        if pressed != self._raw:
+            self._raw       = pressed
+            self._raw_since = now
+
+        if (self._raw != self._stable) and (now - self._raw_since >= self.debounce):
+            self._stable = self._raw
+            return self._edge(self._raw, self._raw_since)
+
+        return self._tick(now)
+
+    # End def
+
+
+    def _edge(self, pressed, t):
+        """ Handle a debounced edge that happened at time t """
+        state = self.state
+        if pressed:
+            if state == WAIT_SECOND and t - self._release_time <= self.double_click:
+                self.state = SECOND_PRESSED
+                return DOUBLE_CLICK
+            # A press after the window (update() not called in time to
+            # time out) ends the pending click and starts a new gesture
+            self.state       = PRESSED
+            self._press_time = t
+            return CLICK if state == WAIT_SECOND else None
+
+        if state == PRESSED:
+            self.state         = WAIT_SECOND
+            self._release_time = t
+        else:
+            self.state = IDLE
+        return None
+
+    # End def
+
+
+    def _tick(self, now):
+        """ Handle gestures that depend only on time passing """
+        state = self.state
+        if state == PRESSED:
+            if now - self._press_time >= self.long_press:
+                self.state        = HELD
+                self._next_repeat = self._press_time + self.long_press + self.repeat_delay
+                return LONG_PRESS
+        elif state == HELD:
+            if now >= self._next_repeat:
+                self._next_repeat += self.repeat_interval
+                return HOLD_REPEAT
+        elif state == WAIT_SECOND:
+            if now - self._release_time > self.double_click:
+                self.state = IDLE
+                return CLICK
+        return None
+
+    # End def
+
+# End class
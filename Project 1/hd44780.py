@@ -0,0 +1,285 @@
+"""
+--------------------------------------------------------------------------
+HD44780 Character LCD Driver
+--------------------------------------------------------------------------
+License:
+Copyright 2025 - Emma Berdou
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+2. Redistributions   in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors
+may be used to endorse or promote products derived from this software without
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+HD44780 Driver
+
+  Drives an HD44780 character LCD in 4-bit parallel mode.  ParallelTransport
+moves bytes over the GPIO pins; HD44780 is a CharLCD (see char_lcd.py) on
+top of it, so only the cells that change are sent.
+
+  Timing:  the HD44780 needs ~37 us to execute most instructions (1.52 ms for
+clear).  Instead of fixed millisecond sleeps the transport records when the
+controller will be ready and only waits if the next byte comes sooner:
+
+  - Delay mode (R/W tied to ground):  spin on time.perf_counter() until the
+    datasheet execution time has passed.  Time already spent in GPIO writes
+    counts towards it, so slow GPIO backends add no extra delay.
+  - Busy-flag mode (R/W wired to a GPIO):  if the next byte comes before the
+    execution time has passed, read the busy flag (D7) and continue as soon
+    as the controller reports ready.
+    NOTE:  in read mode the display drives D4 - D7.  Only use this with a
+           3.3 V display or level shifters on the data lines.
+
+Software API:
+
+  ParallelTransport(rs, e, d4, d5, d6, d7, gpio=None, rw=None)
+    - Provide the pins of the display
+    - gpio is the GPIO backend to use (default Adafruit_BBIO.GPIO)
+    - Provide rw to use busy-flag timing, otherwise delay timing is used
+    - If the backend has pin_group() (see mmap_gpio.py), RS and D4 - D7 are
+      written together in one register store per nibble
+    - Implements the char_lcd.py transport interface
+
+    get_timing_mode()
+      - Return "busy" or "delay"
+
+  HD44780(rs, e, d4, d5, d6, d7, cols=16, rows=2, gpio=None, rw=None)
+    - A CharLCD on a ParallelTransport; see char_lcd.py for the display API
+      (setup, message, set_frame, clear, get_bytes_sent, cleanup)
+
+    get_timing_mode()
+      - Return "busy" or "delay"
+
+"""
+import time
+
+import Adafruit_BBIO.GPIO as GPIO
+
+from char_lcd import CharLCD, LCD_CMD_CLEAR, LCD_CMD_FUNCTION, \
+                     LCD_CMD_DISPLAY_ON, LCD_CMD_ENTRY_MODE
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+# Instruction execution times (datasheet 37 us / 1.52 ms, plus margin)
+LCD_EXEC_TIME         = 0.00005
+LCD_CLEAR_TIME        = 0.002
+
+# Give up on the busy flag after this long (e.g. R/W not really wired)
+LCD_BUSY_TIMEOUT      = 0.01
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class ParallelTransport():
+    """ ParallelTransport Class """
+    rs                            = None
+    e                             = None
+    data_pins                     = None
+    rw                            = None
+    gpio                          = None
+
+    _group                        = None
+    _rs_bit                       = None
+    _ready_at                     = None
+
+    def __init__(self, rs=None, e=None, d4=None, d5=None, d6=None, d7=None,
+                 gpio=None, rw=None):
+        """ Initialize variables """
+        if None in (rs, e, d4, d5, d6, d7):
+            raise ValueError("Pins not provided for ParallelTransport()")
+        self.rs          = rs
+        self.e           = e
+        self.rw          = rw
+        self.data_pins   = [d4, d5, d6, d7]
+        self.gpio        = gpio if gpio is not None else GPIO
+        self._group      = None
+        self._rs_bit     = 0
+
+        # time.perf_counter() value when the controller will be ready
+        self._ready_at   = 0.0
+
+    # End def
+
+
+    def get_timing_mode(self):
+        """ Return "busy" or "delay" """
+        return "delay" if self.rw is None else "busy"
+
+    # End def
+
+
+    def _toggle(self):
+        """ Strobe the enable pin.
+
+            The 450 ns minimum pulse width is shorter than one GPIO write.
+        """
+        self.gpio.output(self.e, self.gpio.HIGH)
+        self.gpio.output(self.e, self.gpio.LOW)
+
+    # End def
+
+
+    def _wait_ready(self):
+        """ Wait until the controller can take the next byte """
+        if time.perf_counter() >= self._ready_at:
+            return
+        if self.rw is None:
+            while time.perf_counter() < self._ready_at:
+                pass
+        else:
+            self._wait_busy()
+
+    # End def
+
+
+    def _wait_busy(self):
+        """ Poll the busy flag until the controller is ready """
+        gpio = self.gpio
+        d7   = self.data_pins[3]
+        for p in self.data_pins:
+            gpio.setup(p, gpio.IN)
+        gpio.output(self.rs, gpio.LOW)
+        gpio.output(self.rw, gpio.HIGH)
+
+        timeout = time.perf_counter() + LCD_BUSY_TIMEOUT
+        while True:
+            # High nibble holds BF in D7; the low nibble must still be clocked
+            gpio.output(self.e, gpio.HIGH)
+            busy = gpio.input(d7)
+            gpio.output(self.e, gpio.LOW)
+            self._toggle()
+            if (not busy) or (time.perf_counter() > timeout):
+                break
+
+        gpio.output(self.rw, gpio.LOW)
+        for p in self.data_pins:
+            gpio.setup(p, gpio.OUT)
+
+    # End def
+
+
+    def _nibble(self, n):
+        """ Send the low 4 bits of n """
+        if self._group is not None:
+            self._group.write((n & 0x0F) | self._rs_bit)
+            self._toggle()
+            return
+        for i, p in enumerate(self.data_pins):
+            self.gpio.output(p, self.gpio.HIGH if (n & (1 << i)) else self.gpio.LOW)
+        self._toggle()
+
+    # End def
+
+
+    def _byte(self, b, mode, exec_time=LCD_EXEC_TIME):
+        """ Send a byte; mode True = character data, False = command """
+        self._wait_ready()
+        if self._group is not None:
+            self._rs_bit = 0x10 if mode else 0
+        else:
+            self.gpio.output(self.rs, self.gpio.HIGH if mode else self.gpio.LOW)
+        self._nibble((b >> 4) & 0x0F)
+        self._nibble(b & 0x0F)
+        self._ready_at = time.perf_counter() + exec_time
+
+    # End def
+
+
+    def init(self):
+        """ Configure the pins, put the display into 4-bit mode and clear it """
+        pins = [self.rs, self.e] + self.data_pins
+        if self.rw is not None:
+            pins.append(self.rw)
+        for p in pins:
+            self.gpio.setup(p, self.gpio.OUT)
+            self.gpio.output(p, self.gpio.LOW)
+        if hasattr(self.gpio, "pin_group"):
+            # Bits 0 - 3 = D4 - D7, bit 4 = RS
+            self._group = self.gpio.pin_group(self.data_pins + [self.rs])
+
+        # The busy flag cannot be read until 4-bit mode is set, so the
+        # power-on sequence uses the datasheet delays
+        time.sleep(0.02)
+        self.gpio.output(self.rs, self.gpio.LOW)
+        for _ in range(3):
+            self._nibble(0x03)
+            time.sleep(0.005)
+        self._nibble(0x02)
+        self._ready_at = time.perf_counter() + LCD_EXEC_TIME
+        self._byte(LCD_CMD_FUNCTION, False)
+        self._byte(LCD_CMD_DISPLAY_ON, False)
+        self._byte(LCD_CMD_ENTRY_MODE, False)
+        self.command(LCD_CMD_CLEAR)
+
+    # End def
+
+
+    def command(self, b):
+        """ Send one command byte """
+        self._byte(b, False, LCD_CLEAR_TIME if b == LCD_CMD_CLEAR else LCD_EXEC_TIME)
+
+    # End def
+
+
+    def write(self, data):
+        """ Send a run of character bytes """
+        for b in data:
+            self._byte(b, True)
+
+    # End def
+
+
+    def cleanup(self):
+        """ Release the pins """
+        self.gpio.cleanup()
+
+    # End def
+
+# End class
+
+
+class HD44780(CharLCD):
+    """ HD44780 Class """
+
+    def __init__(self, rs=None, e=None, d4=None, d5=None, d6=None, d7=None,
+                 cols=16, rows=2, gpio=None, rw=None):
+        """ Initialize variables """
+        if None in (rs, e, d4, d5, d6, d7):
+            raise ValueError("Pins not provided for HD44780()")
+        transport = ParallelTransport(rs, e, d4, d5, d6, d7, gpio=gpio, rw=rw)
+        CharLCD.__init__(self, transport, cols, rows)
+
+    # End def
+
+
+    def get_timing_mode(self):
+        """ Return "busy" or "delay" """
+        return self.transport.get_timing_mode()
+
+    # End def
+
+# End class
@@ -0,0 +1,312 @@
+"""
+--------------------------------------------------------------------------
+IIO ADC Streaming Capture
+--------------------------------------------------------------------------
+License:
+Copyright 2025 - Emma Berdou
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+2. Redistributions   in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors
+may be used to endorse or promote products derived from this software without
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+IIO Streaming Capture
+
+  Captures the AM335x ADC continuously through the IIO buffer instead of
+one sysfs read per sample.  start() enables the chosen channels under
+scan_elements/, sets the buffer length (and the sample rate, if the kernel
+exposes sampling_frequency) and enables the buffer; the driver then fills
+/dev/iio:deviceN with scans:  one 16-bit little-endian word per enabled
+channel, in channel order.
+
+  poll() reads whatever is waiting straight into a NumPy ring buffer with
+readinto(), so samples are never copied through a bytes object.  latest()
+returns the most recent scans as a view of the ring (a copy only when they
+wrap around its end).
+
+  While the buffer is enabled the driver refuses single-shot
+in_voltageN_raw reads, so every channel in use has to be streamed:
+channel(ain) returns a reader that adc_filter.PotReader can take samples
+from.
+
+  For testing, sysfs_dir and dev_dir can point at a fake device:  a
+directory with the same attribute files and a regular file of scans.
+
+Software API:
+
+  IIOStream(channels, buffer_length=1024, ring_scans=16384, sample_rate=None,
+            device=0, sysfs_dir=IIO_SYSFS_DIR, dev_dir="/dev")
+    start()
+    poll()
+      - Read everything available into the ring; return the number of new
+        scans (never blocks)
+    latest(count)
+      - Return up to count most recent scans as a (scans, channels) array
+    get_volts(ain, count)
+      - Return the latest count samples of one channel in volts
+    get_rms(ain, count, offset=0.0)
+      - Return the RMS of the latest count samples of one channel, in volts
+        from offset
+    channel(ain)
+      - Return a reader with read_burst(count) for one channel
+    get_scan_count()
+      - Total scans captured since start()
+    stop()
+
+"""
+import os
+
+import numpy as np
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+IIO_SYSFS_DIR         = "/sys/bus/iio/devices/"
+ADC_MAX               = 4095            # 12-bit ADC
+ADC_VREF              = 1.8             # Volts at ADC_MAX
+SAMPLE_DTYPE          = np.dtype("<u2") # "le:u12/16>>0"
+READ_CHUNK            = 65536           # Bytes per readinto() at most
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+def write_attribute(path, value):
+    """ Write a sysfs attribute """
+    with open(path, "w") as f:
+        f.write(str(value))
+
+# End def
+
+
+class ChannelReader():
+    """ read_burst() source for one streamed channel """
+    stream                        = None
+    index                         = None
+
+    def __init__(self, stream, index):
+        """ Initialize variables """
+        self.stream = stream
+        self.index  = index
+
+    # End def
+
+
+    def read_burst(self, count):
+        """ Return up to count of the latest raw samples """
+        self.stream.poll()
+        return self.stream.latest(count)[:, self.index].tolist()
+
+    # End def
+
+
+    def close(self):
+        """ Nothing to close; the stream is stopped by its owner """
+        pass
+
+    # End def
+
+# End class
+
+
+class IIOStream():
+    """ Continuous ADC capture into a NumPy ring buffer """
+    channels                      = None
+    buffer_length                 = None
+    sample_rate                   = None
+    device_dir                    = None
+    dev_path                      = None
+
+    _ring                         = None
+    _ring_bytes                   = None
+    _write                        = None
+    _total_bytes                  = None
+    _scan_bytes                   = None
+    _file                         = None
+
+    def __init__(self, channels, buffer_length=1024, ring_scans=16384, sample_rate=None,
+                 device=0, sysfs_dir=IIO_SYSFS_DIR, dev_dir="/dev"):
+        """ Initialize variables """
+        if not channels:
+            raise ValueError("channels not provided for IIOStream()")
+        self.channels      = sorted(channels)
+        self.buffer_length = buffer_length
+        self.sample_rate   = sample_rate
+        self.device_dir    = os.path.join(sysfs_dir, "iio:device{0}".format(device))
+        self.dev_path      = os.path.join(dev_dir, "iio:device{0}".format(device))
+
+        # Scans are stored in channel order, one row per scan
+        self._ring        = np.zeros((ring_scans, len(self.channels)), dtype=SAMPLE_DTYPE)
+        self._ring_bytes  = memoryview(self._ring).cast("B")
+        self._scan_bytes  = len(self.channels) * SAMPLE_DTYPE.itemsize
+        self._write       = 0
+        self._total_bytes = 0
+        self._file        = None
+
+    # End def
+
+
+    def _attribute(self, *parts):
+        """ Return the path of a device attribute """
+        return os.path.join(self.device_dir, *parts)
+
+    # End def
+
+
+    def start(self):
+        """ Configure and enable the IIO buffer """
+        write_attribute(self._attribute("buffer", "enable"), 0)
+
+        # Enable exactly the requested channels
+        scan_dir = self._attribute("scan_elements")
+        for name in sorted(os.listdir(scan_dir)):
+            if name.startswith("in_voltage") and name.endswith("_en"):
+                ain = int(name[len("in_voltage"):-len("_en")])
+                write_attribute(os.path.join(scan_dir, name), int(ain in self.channels))
+            elif name == "in_timestamp_en":
+                write_attribute(os.path.join(scan_dir, name), 0)
+
+        write_attribute(self._attribute("buffer", "length"), self.buffer_length)
+        if self.sample_rate is not None:
+            rate_path = self._attribute("sampling_frequency")
+            if os.path.exists(rate_path):
+                write_attribute(rate_path, self.sample_rate)
+            else:
+                print("IIOStream: sample rate is fixed by the device tree on this kernel")
+        write_attribute(self._attribute("buffer", "enable"), 1)
+
+        self._write       = 0
+        self._total_bytes = 0
+        fd = os.open(self.dev_path, os.O_RDONLY | os.O_NONBLOCK)
+        self._file = os.fdopen(fd, "rb", buffering=0)
+
+    # End def
+
+
+    def poll(self):
+        """ Read all waiting scans into the ring; return how many are new """
+        if self._file is None:
+            return 0
+        before = self._total_bytes // self._scan_bytes
+        ring_size = len(self._ring_bytes)
+        while True:
+            end = min(ring_size, self._write + READ_CHUNK)
+            try:
+                count = self._file.readinto(self._ring_bytes[self._write:end])
+            except BlockingIOError:
+                count = None
+            if not count:
+                break
+            self._total_bytes += count
+            self._write += count
+            if self._write == ring_size:
+                self._write = 0
+        return self._total_bytes // self._scan_bytes - before
+
+    # End def
+
+
+    def latest(self, count):
+        """ Return up to count of the most recent complete scans """
+        scans = self._total_bytes // self._scan_bytes
+        # The slot after the newest scan may hold the start of the next one
+        count = min(count, scans, len(self._ring) - 1)
+        end   = scans % len(self._ring)
+        start = end - count
+        if start >= 0:
+            return self._ring[start:end]
+        return np.concatenate((self._ring[start:], self._ring[:end]))
+
+    # End def
+
+
+    def get_volts(self, ain, count):
+        """ Return the latest count samples of one channel in volts """
+        samples = self.latest(count)[:, self.channels.index(ain)]
+        return samples * (ADC_VREF / ADC_MAX)
+
+    # End def
+
+
+    def get_rms(self, ain, count, offset=0.0):
+        """ Return the RMS (volts from offset) of the latest count samples """
+        volts = self.get_volts(ain, count)
+        if len(volts) == 0:
+            return 0.0
+        return float(np.sqrt(np.mean(np.square(volts - offset))))
+
+    # End def
+
+
+    def channel(self, ain):
+        """ Return a read_burst() reader for one channel """
+        return ChannelReader(self, self.channels.index(ain))
+
+    # End def
+
+
+    def get_scan_count(self):
+        """ Return the total scans captured since start() """
+        return self._total_bytes // self._scan_bytes
+
+    # End def
+
+
+    def stop(self):
+        """ Disable the buffer and close the device """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        write_attribute(self._attribute("buffer", "enable"), 0)
+
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import time
+
+    # Stream AIN0 (P1_19) for a second and report the achieved rate
+    stream = IIOStream([0])
+    stream.start()
+    start = time.perf_counter()
+    try:
+        while time.perf_counter() - start < 1.0:
+            stream.poll()
+            time.sleep(0.01)
+    finally:
+        stream.poll()
+        stream.stop()
+    elapsed = time.perf_counter() - start
+    volts = stream.get_volts(0, stream.get_scan_count())
+    print("{0} scans in {1:.2f} s ({2:.0f} /s), mean {3:.3f} V".format(
+          stream.get_scan_count(), elapsed, stream.get_scan_count() / elapsed,
+          float(volts.mean()) if len(volts) else 0.0))
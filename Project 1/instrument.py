@@ -0,0 +1,400 @@
+"""
+--------------------------------------------------------------------------
+Hot-Path Instrumentation
+--------------------------------------------------------------------------
+License:
+Copyright 2025 - Emma Berdou
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+2. Redistributions   in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors
+may be used to endorse or promote products derived from this software without
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+
+Hot-Path Instrumentation
+
+  Times named spans of the main loop (the scheduler tasks and the phases
+inside them) with time.perf_counter_ns(), and keeps for each span:
+
+    - a log-linear latency histogram (as in HdrHistogram):  values below
+      2 * SUB_BUCKETS ns are counted exactly, above that every power of two
+      is split into SUB_BUCKETS linear buckets, so any percentile is within
+      1 / SUB_BUCKETS (~6%) of the true value.  Recording is a bit_length()
+      and a list increment; the histogram never grows.
+    - a deadline miss counter, if the span has a deadline
+
+  Spans are reusable context managers, created once per name:
+
+    pot_span = instruments.span("pot")
+    ...
+    with pot_span:
+        desired = pot_reader.read()
+
+  report() returns percentiles for every span.  DumpServer serves the
+report on a unix socket from its own thread, so a deployed unit can be
+inspected without stopping it ("instrument.py SOCKET" reads it).  The
+report may be a few samples inconsistent while the loop is running.
+
+Software API:
+
+  LatencyHistogram()
+    record(value)
+      - Count one value (ns)
+    get_percentile(percent)
+      - Return the value (ns) at or below which percent of values fall
+    reset()
+
+  Instruments(time_function=time.perf_counter_ns)
+    span(name, deadline=None)
+      - Return the Span for name (created on first use); deadline in seconds
+      - span.set_deadline(deadline) changes it, e.g. when a task's period
+        changes
+    wrap(name, function, deadline=None)
+      - Return function timed as span name
+    report()
+      - Return the statistics as printable text
+    reset()
+
+  DumpServer(instruments, path=SOCKET_PATH, mode=SOCKET_MODE)
+    start() / stop()
+      - The socket is given permissions mode; start() raises OSError if
+        it cannot be created (e.g. /run when not root)
+
+"""
+import os
+import socket
+import threading
+import time
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+SUB_BUCKET_BITS       = 4
+SUB_BUCKETS           = 1 << SUB_BUCKET_BITS
+MAX_VALUE_BITS        = 40                # Values up to ~18 minutes in ns
+PERCENTILES           = (50.0, 90.0, 99.0, 99.9)
+SOCKET_PATH           = os.path.join(os.environ.get("XDG_RUNTIME_DIR", "/run"),
+                                     "coffee_heater.sock")
+SOCKET_MODE           = 0o600             # Owner read / write only
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+def bucket_index(value):
+    """ Return the histogram bucket of a value """
+    if value < 2 * SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return SUB_BUCKETS * (shift + 1) + (value >> shift) - SUB_BUCKETS
+
+# End def
+
+
+def bucket_limit(index):
+    """ Return the highest value counted in a bucket """
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    low   = (index % SUB_BUCKETS + SUB_BUCKETS) << shift
+    return low + (1 << shift) - 1
+
+# End def
+
+
+class LatencyHistogram():
+    """ Log-linear histogram of ns values """
+    count                         = None
+    total                         = None
+    max                           = None
+    _counts                       = None
+
+    def __init__(self):
+        """ Initialize variables """
+        self._counts = [0] * (bucket_index((1 << MAX_VALUE_BITS) - 1) + 1)
+        self.reset()
+
+    # End def
+
+
+    def reset(self):
+        """ Clear all counts """
+        for i in range(len(self._counts)):
+            self._counts[i] = 0
+        self.count = 0
+        self.total = 0
+        self.max   = 0
+
+    # End def
+
+
+    def record(self, value):
+        """ Count one value (ns) """
+        index = bucket_index(value)
+        if index >= len(self._counts):
+            index = len(self._counts) - 1
+        self._counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    # End def
+
+
+    def get_percentile(self, percent):
+        """ Return the value at or below which percent of values fall """
+        if self.count == 0:
+            return 0
+        target = max(1, int(self.count * percent / 100.0 + 0.5))
+        seen   = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if seen >= target:
+                return min(bucket_limit(index), self.max)
+        return self.max
+
+    # End def
+
+# End class
+
+
+class Span():
+    """ Reusable timer for one named span """
+    name                          = None
+    deadline                      = None
+    misses                        = None
+    histogram                     = None
+    time_function                 = None
+    _start                        = None
+
+    def __init__(self, name, deadline=None, time_function=time.perf_counter_ns):
+        """ Initialize variables """
+        self.name          = name
+        self.time_function = time_function
+        self.histogram     = LatencyHistogram()
+        self.misses        = 0
+        self.set_deadline(deadline)
+
+    # End def
+
+
+    def set_deadline(self, deadline):
+        """ Set the deadline in seconds (None: no deadline) """
+        self.deadline = None if deadline is None else int(deadline * 1e9)
+
+    # End def
+
+
+    def __enter__(self):
+        self._start = self.time_function()
+        return self
+
+    # End def
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.record(self.time_function() - self._start)
+        return False
+
+    # End def
+
+
+    def record(self, elapsed):
+        """ Count one run of elapsed ns """
+        self.histogram.record(elapsed)
+        if self.deadline is not None and elapsed > self.deadline:
+            self.misses += 1
+
+    # End def
+
+
+    def reset(self):
+        """ Clear the statistics """
+        self.histogram.reset()
+        self.misses = 0
+
+    # End def
+
+# End class
+
+
+class Instruments():
+    """ Named spans and their report """
+    time_function                 = None
+    spans                         = None
+
+    def __init__(self, time_function=time.perf_counter_ns):
+        """ Initialize variables """
+        self.time_function = time_function
+        self.spans         = {}
+
+    # End def
+
+
+    def span(self, name, deadline=None):
+        """ Return the Span for name (created on first use) """
+        if name not in self.spans:
+            self.spans[name] = Span(name, deadline, self.time_function)
+        return self.spans[name]
+
+    # End def
+
+
+    def wrap(self, name, function, deadline=None):
+        """ Return function timed as span name """
+        span = self.span(name, deadline)
+
+        def timed():
+            with span:
+                function()
+
+        return timed
+
+    # End def
+
+
+    def reset(self):
+        """ Clear every span's statistics """
+        for span in list(self.spans.values()):
+            span.reset()
+
+    # End def
+
+
+    def report(self):
+        """ Return the statistics as printable text """
+        header = "{0:<12} {1:>8} {2:>7}".format("span", "count", "misses")
+        for percent in PERCENTILES:
+            header += " {0:>9}".format("p{0:g}".format(percent))
+        lines = [header + " {0:>9}".format("max")]
+        for name, span in list(self.spans.items()):
+            histogram = span.histogram
+            line = "{0:<12} {1:>8} {2:>7}".format(name, histogram.count,
+                                                  span.misses if span.deadline else "-")
+            for percent in PERCENTILES:
+                line += " {0:>7.3f}ms".format(histogram.get_percentile(percent) / 1e6)
+            lines.append(line + " {0:>7.3f}ms".format(histogram.max / 1e6))
+        return "\n".join(lines)
+
+    # End def
+
+# End class
+
+
+class DumpServer():
+    """ Serves Instruments.report() on a unix socket """
+    instruments                   = None
+    path                          = None
+    mode                          = None
+    _socket                       = None
+    _thread                       = None
+
+    def __init__(self, instruments, path=SOCKET_PATH, mode=SOCKET_MODE):
+        """ Initialize variables """
+        self.instruments = instruments
+        self.path        = path
+        self.mode        = mode
+        self._socket     = None
+        self._thread     = None
+
+    # End def
+
+
+    def start(self):
+        """ Listen on the socket from a daemon thread """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # chmod before listen(): nobody can connect until it is restricted
+        # (the umask is process-wide, so it is not changed here)
+        try:
+            self._socket.bind(self.path)
+            os.chmod(self.path, self.mode)
+            self._socket.listen(1)
+        except OSError:
+            self._socket.close()
+            self._socket = None
+            raise
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    # End def
+
+
+    def _serve(self):
+        """ Send the report to every client that connects """
+        while True:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                return        # Socket closed by stop()
+            with connection:
+                try:
+                    connection.sendall((self.instruments.report() + "\n").encode())
+                except OSError:
+                    pass
+
+    # End def
+
+
+    def stop(self):
+        """ Close the socket """
+        if self._socket is not None:
+            # Wakes the thread blocked in accept()
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._socket.close()
+            self._socket = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import sys
+
+    # Print the report of a running program
+    path = sys.argv[1] if len(sys.argv) > 1 else SOCKET_PATH
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(path)
+    chunks = []
+    while True:
+        chunk = client.recv(4096)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    client.close()
+    print(b"".join(chunks).decode(), end="")
@@ -0,0 +1,295 @@
+"""
+--------------------------------------------------------------------------
+Memory-Mapped GPIO Backend
+--------------------------------------------------------------------------
+License:
+Copyright 2025 - Emma Berdou
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+2. Redistributions   in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors
+may be used to endorse or promote products derived from this software without
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Memory-Mapped GPIO
+
+  Drives the AM335x GPIO banks directly through /dev/mem, the same way
+classwork/mmap/devmem2.c reads and writes registers.  Every bank has
+SETDATAOUT / CLEARDATAOUT registers, so any set of pins in one bank can be
+changed with one store to each register instead of one library call per pin.
+
+  The first setup() of a pin still goes through Adafruit_BBIO.GPIO so the
+pin is exported and muxed as a GPIO (see configure_pins.sh); after that
+direction changes, reads and writes go straight to the registers.
+
+  Needs root (for /dev/mem).  Use get_gpio() to fall back to
+Adafruit_BBIO.GPIO when /dev/mem cannot be opened.
+
+Software API:
+
+  MmapGPIO()
+    - Same interface as Adafruit_BBIO.GPIO:
+        HIGH, LOW, IN, OUT, setup(pin, direction), output(pin, value),
+        input(pin), cleanup()
+    - Pins are header names ("P2_18"), "GPIOx_y" names or GPIO numbers
+
+    pin_group(pins)
+      - Return a PinGroup for writing several pins at once
+
+  PinGroup
+    write(bits)
+      - Bit i of bits sets pins[i]; one SETDATAOUT and one CLEARDATAOUT
+        store per bank touched
+
+  get_gpio(use_mmap=True)
+    - Return a MmapGPIO if /dev/mem is available, else Adafruit_BBIO.GPIO
+
+"""
+import mmap
+import os
+
+import Adafruit_BBIO.GPIO as GPIO
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+HIGH                  = GPIO.HIGH
+LOW                   = GPIO.LOW
+IN                    = GPIO.IN
+OUT                   = GPIO.OUT
+
+# AM335x TRM, chapter 2 (memory map) and 25.4 (GPIO registers)
+GPIO_BANK_BASES       = [0x44E07000, 0x4804C000, 0x481AC000, 0x481AE000]
+GPIO_BANK_SIZE        = 0x1000
+
+GPIO_OE               = 0x134
+GPIO_DATAIN           = 0x138
+GPIO_DATAOUT          = 0x13C
+GPIO_CLEARDATAOUT     = 0x190
+GPIO_SETDATAOUT       = 0x194
+
+# PocketBeagle header pin -> GPIO number (32 * bank + bit)
+PIN_TO_GPIO = {
+    "P1_2"  : 87,  "P1_4"  : 89,  "P1_6"  : 5,   "P1_8"  : 2,
+    "P1_10" : 3,   "P1_12" : 4,   "P1_20" : 20,  "P1_26" : 12,
+    "P1_28" : 13,  "P1_29" : 117, "P1_30" : 43,  "P1_31" : 114,
+    "P1_32" : 42,  "P1_33" : 111, "P1_34" : 26,  "P1_35" : 88,
+    "P1_36" : 110,
+    "P2_1"  : 50,  "P2_2"  : 59,  "P2_3"  : 23,  "P2_4"  : 58,
+    "P2_5"  : 30,  "P2_6"  : 57,  "P2_7"  : 31,  "P2_8"  : 60,
+    "P2_9"  : 15,  "P2_10" : 52,  "P2_11" : 14,  "P2_17" : 65,
+    "P2_18" : 47,  "P2_19" : 27,  "P2_20" : 64,  "P2_22" : 46,
+    "P2_24" : 44,  "P2_25" : 41,  "P2_27" : 40,  "P2_28" : 116,
+    "P2_29" : 7,   "P2_30" : 113, "P2_31" : 19,  "P2_32" : 112,
+    "P2_33" : 45,  "P2_34" : 115, "P2_35" : 86,
+}
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+def pin_to_gpio(pin):
+    """ Return (bank, bit) for a header name, "GPIOx_y" name or GPIO number """
+    if isinstance(pin, int):
+        number = pin
+    elif pin in PIN_TO_GPIO:
+        number = PIN_TO_GPIO[pin]
+    elif pin.upper().startswith("GPIO") and "_" in pin:
+        bank, bit = pin[4:].split("_")
+        number = int(bank) * 32 + int(bit)
+    else:
+        raise ValueError("Unknown pin: {0}".format(pin))
+    return (number // 32, number % 32)
+
+# End def
+
+
+class PinGroup():
+    """ Several pins written together """
+    pins                          = None
+    _table                        = None
+
+    def __init__(self, gpio, pins):
+        """ Precompute the register stores for every value of the group """
+        self.pins = list(pins)
+        locations = [pin_to_gpio(p) for p in self.pins]
+        banks     = sorted(set(bank for bank, _ in locations))
+
+        # _table[bits] = [(register view, set mask, clear mask), ...]
+        self._table = []
+        for bits in range(1 << len(self.pins)):
+            stores = []
+            for bank in banks:
+                set_mask   = 0
+                clear_mask = 0
+                for i, (b, bit) in enumerate(locations):
+                    if b != bank:
+                        continue
+                    if bits & (1 << i):
+                        set_mask   |= (1 << bit)
+                    else:
+                        clear_mask |= (1 << bit)
+                stores.append((gpio._get_bank(bank), set_mask, clear_mask))
+            self._table.append(stores)
+
+    # End def
+
+
+    def write(self, bits):
+        """ Bit i of bits sets pins[i] """
+        for regs, set_mask, clear_mask in self._table[bits]:
+            if set_mask:
+                regs[GPIO_SETDATAOUT >> 2]   = set_mask
+            if clear_mask:
+                regs[GPIO_CLEARDATAOUT >> 2] = clear_mask
+
+    # End def
+
+# End class
+
+
+class MmapGPIO():
+    """ MmapGPIO Class """
+    HIGH                          = HIGH
+    LOW                           = LOW
+    IN                            = IN
+    OUT                           = OUT
+
+    _fd                           = None
+    _maps                         = None
+    _banks                        = None
+    _pins                         = None
+    _exported                     = None
+
+    def __init__(self):
+        """ Open /dev/mem (raises OSError without root) """
+        self._fd       = os.open("/dev/mem", os.O_RDWR | os.O_SYNC)
+        self._maps     = {}
+        self._banks    = {}
+        self._pins     = {}
+        self._exported = set()
+
+    # End def
+
+
+    def _get_bank(self, bank):
+        """ Return a 32-bit register view of a GPIO bank, mapping it if needed """
+        regs = self._banks.get(bank)
+        if regs is None:
+            m = mmap.mmap(self._fd, GPIO_BANK_SIZE, mmap.MAP_SHARED,
+                          mmap.PROT_READ | mmap.PROT_WRITE,
+                          offset=GPIO_BANK_BASES[bank])
+            # Item assignment on an "I" view is a single 32-bit store
+            regs = memoryview(m).cast("I")
+            self._maps[bank]  = m
+            self._banks[bank] = regs
+        return regs
+
+    # End def
+
+
+    def _get_pin(self, pin):
+        """ Return (register view, bit mask) for a pin """
+        location = self._pins.get(pin)
+        if location is None:
+            bank, bit = pin_to_gpio(pin)
+            location = (self._get_bank(bank), 1 << bit)
+            self._pins[pin] = location
+        return location
+
+    # End def
+
+
+    def setup(self, pin, direction):
+        """ Set a pin as an input or output """
+        if pin not in self._exported:
+            # Let the library export / mux the pin the first time
+            GPIO.setup(pin, direction)
+            self._exported.add(pin)
+        regs, mask = self._get_pin(pin)
+        oe = regs[GPIO_OE >> 2]
+        if direction == OUT:
+            regs[GPIO_OE >> 2] = oe & ~mask
+        else:
+            regs[GPIO_OE >> 2] = oe | mask
+
+    # End def
+
+
+    def output(self, pin, value):
+        """ Drive a pin high or low """
+        regs, mask = self._get_pin(pin)
+        if value:
+            regs[GPIO_SETDATAOUT >> 2]   = mask
+        else:
+            regs[GPIO_CLEARDATAOUT >> 2] = mask
+
+    # End def
+
+
+    def input(self, pin):
+        """ Read a pin """
+        regs, mask = self._get_pin(pin)
+        return HIGH if (regs[GPIO_DATAIN >> 2] & mask) else LOW
+
+    # End def
+
+
+    def pin_group(self, pins):
+        """ Return a PinGroup for writing several pins at once """
+        return PinGroup(self, pins)
+
+    # End def
+
+
+    def cleanup(self):
+        """ Release the mappings and the pins """
+        for regs in self._banks.values():
+            regs.release()
+        for m in self._maps.values():
+            m.close()
+        self._banks = {}
+        self._maps  = {}
+        self._pins  = {}
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        GPIO.cleanup()
+
+    # End def
+
+# End class
+
+
+def get_gpio(use_mmap=True):
+    """ Return a MmapGPIO if possible, else Adafruit_BBIO.GPIO """
+    if use_mmap:
+        try:
+            return MmapGPIO()
+        except OSError as e:
+            print("MmapGPIO unavailable ({0}); using Adafruit_BBIO.GPIO".format(e))
+    return GPIO
+
+# End def
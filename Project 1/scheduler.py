@@ -0,0 +1,273 @@
+"""
+--------------------------------------------------------------------------
+Cooperative Task Scheduler
+--------------------------------------------------------------------------
+License:
+Copyright 2025 - Emma Berdou
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+2. Redistributions   in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors
+may be used to endorse or promote products derived from this software without
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Cooperative Scheduler
+
+  Runs several periodic tasks on one thread.  Each task has its own period
+and deadline, so a slow task no longer sets the rate for every other task.
+Tasks are kept in a heap ordered by their next release time; the scheduler
+sleeps until the earliest one is due, runs it, and schedules its next
+release one period later (releases that were missed entirely are skipped
+and counted, rather than run back to back).
+
+  For every task the scheduler records:
+    - jitter:    how late the task started relative to its release time
+    - runtime:   how long the task function took
+    - overruns:  runs that finished after release time + deadline, plus
+                 releases that were skipped because the task fell behind
+
+  Tasks must not block; anything slow (e.g. a 1-Wire conversion) belongs on
+its own thread with the task only picking up the result.
+
+Software API:
+
+  Scheduler(time_function=time.monotonic, sleep_function=time.sleep)
+    - The clock and sleep functions can be replaced for testing
+
+    add_task(name, period, function, deadline=None, offset=0.0)
+      - Run function() every period seconds; deadline defaults to period
+      - Return the Task (its period can be changed while running)
+
+    run(duration=None)
+      - Run tasks until stop() is called (or for duration seconds)
+
+    stop()
+      - Make run() return after the current task
+
+    get_stats()
+      - Return {task name: dict of statistics}
+
+    report()
+      - Return the statistics as printable text
+
+"""
+import heapq
+import time
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class Task():
+    """ Task Class """
+    name                          = None
+    period                        = None
+    deadline                      = None
+    function                      = None
+
+    next_release                  = None
+
+    runs                          = None
+    overruns                      = None
+    skipped                       = None
+    jitter_total                  = None
+    jitter_max                    = None
+    runtime_total                 = None
+    runtime_max                   = None
+
+    def __init__(self, name, period, function, deadline=None):
+        """ Initialize variables """
+        if period <= 0:
+            raise ValueError("Task period must be > 0")
+        self.name          = name
+        self.period        = period
+        self.deadline      = deadline
+        self.function      = function
+
+        self.next_release  = 0.0
+
+        self.runs          = 0
+        self.overruns      = 0
+        self.skipped       = 0
+        self.jitter_total  = 0.0
+        self.jitter_max    = 0.0
+        self.runtime_total = 0.0
+        self.runtime_max   = 0.0
+
+    # End def
+
+
+    def get_stats(self):
+        """ Return a dict of statistics """
+        runs = max(self.runs, 1)
+        return {
+            "period"          : self.period,
+            "runs"            : self.runs,
+            "overruns"        : self.overruns,
+            "skipped"         : self.skipped,
+            "jitter_mean"     : self.jitter_total / runs,
+            "jitter_max"      : self.jitter_max,
+            "runtime_mean"    : self.runtime_total / runs,
+            "runtime_max"     : self.runtime_max,
+        }
+
+    # End def
+
+# End class
+
+
+class Scheduler():
+    """ Scheduler Class """
+    time_function                 = None
+    sleep_function                = None
+
+    tasks                         = None
+    _heap                         = None
+    _sequence                     = None
+    _running                      = None
+
+    def __init__(self, time_function=time.monotonic, sleep_function=time.sleep):
+        """ Initialize variables """
+        self.time_function  = time_function
+        self.sleep_function = sleep_function
+        self.tasks          = []
+        self._heap          = []
+        self._sequence      = 0
+        self._running       = False
+
+    # End def
+
+
+    def add_task(self, name, period, function, deadline=None, offset=0.0):
+        """ Add a periodic task; the first release is offset seconds from now """
+        task = Task(name, period, function, deadline)
+        task.next_release = self.time_function() + offset
+        self.tasks.append(task)
+        self._push(task)
+        return task
+
+    # End def
+
+
+    def _push(self, task):
+        """ Queue a task at its next release time """
+        # The sequence number keeps equal release times in FIFO order and
+        # means Task objects are never compared
+        self._sequence += 1
+        heapq.heappush(self._heap, (task.next_release, self._sequence, task))
+
+    # End def
+
+
+    def stop(self):
+        """ Make run() return after the current task """
+        self._running = False
+
+    # End def
+
+
+    def run(self, duration=None):
+        """ Run tasks until stop() is called (or for duration seconds) """
+        now  = self.time_function()
+        end  = None if duration is None else now + duration
+        self._running = True
+
+        while self._running and self._heap:
+            (release, _, task) = self._heap[0]
+            if (end is not None) and (release >= end):
+                break
+
+            # Sleep until the earliest task is due
+            now = self.time_function()
+            if release > now:
+                self.sleep_function(release - now)
+                continue
+
+            heapq.heappop(self._heap)
+            self._run_task(task, release, now)
+            self._push(task)
+
+    # End def
+
+
+    def _run_task(self, task, release, start):
+        """ Run one release of a task and update its statistics """
+        task.function()
+        finish = self.time_function()
+
+        jitter  = start - release
+        runtime = finish - start
+        task.runs          += 1
+        task.jitter_total  += jitter
+        task.runtime_total += runtime
+        if jitter > task.jitter_max:
+            task.jitter_max = jitter
+        if runtime > task.runtime_max:
+            task.runtime_max = runtime
+
+        deadline = task.deadline if task.deadline is not None else task.period
+        if finish > release + deadline:
+            task.overruns += 1
+
+        # Next release one period on; releases already in the past are
+        # skipped rather than run back to back
+        next_release = release + task.period
+        if next_release <= finish:
+            missed = int((finish - next_release) // task.period) + 1
+            task.skipped  += missed
+            task.overruns += missed
+            next_release  += missed * task.period
+        task.next_release = next_release
+
+    # End def
+
+
+    def get_stats(self):
+        """ Return {task name: dict of statistics} """
+        return {task.name: task.get_stats() for task in self.tasks}
+
+    # End def
+
+
+    def report(self):
+        """ Return the statistics as printable text """
+        lines = ["{0:<10} {1:>8} {2:>8} {3:>9} {4:>9} {5:>9} {6:>9}".format(
+                 "task", "period", "runs", "overruns", "jit avg", "jit max", "run max")]
+        for task in self.tasks:
+            stats = task.get_stats()
+            lines.append("{0:<10} {1:>7.3f}s {2:>8} {3:>9} {4:>7.2f}ms {5:>7.2f}ms {6:>7.2f}ms".format(
+                         task.name, stats["period"], stats["runs"], stats["overruns"],
+                         stats["jitter_mean"] * 1000, stats["jitter_max"] * 1000,
+                         stats["runtime_max"] * 1000))
+        return "\n".join(lines)
+
+    # End def
+
+# End class
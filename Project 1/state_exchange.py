@@ -0,0 +1,151 @@
+"""
+--------------------------------------------------------------------------
+Thread State Exchange
+--------------------------------------------------------------------------
+License:
+Copyright 2025 - Emma Berdou
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+2. Redistributions   in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors
+may be used to endorse or promote products derived from this software without
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+State Exchange
+
+  Moves state between the control thread and other threads (user input,
+button callbacks, display) without locks in the control loop.  The control
+thread owns the state:
+
+    - Other threads never change control state directly; they send commands
+      on a CommandChannel (a queue.SimpleQueue), and the control thread
+      drains and applies them at the start of its tick.
+
+    - The control thread publishes what it wants others to see as an
+      immutable snapshot (a namedtuple) in a Snapshot.  Publishing swaps
+      one reference, which is atomic in CPython, so readers always get a
+      complete, consistent snapshot:  the same guarantee a seqlock gives,
+      with no retry loop.
+
+  Only one thread may publish to a given Snapshot.
+
+Software API:
+
+  CommandChannel()
+    send(command, value=None)
+      - Queue a command from any thread (never blocks)
+    drain()
+      - Return the queued (command, value) pairs, oldest first (never blocks)
+
+  Snapshot(initial)
+    get()
+      - Return the current snapshot
+    publish(value)
+      - Replace the snapshot (owner thread only)
+    update(**changes)
+      - Publish the current snapshot with some fields replaced
+    version
+      - Number of snapshots published; readers can use it to skip work when
+        nothing changed
+
+"""
+import queue
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+# None
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class CommandChannel():
+    """ Commands from any thread to the control thread """
+    _queue                        = None
+
+    def __init__(self):
+        """ Initialize variables """
+        self._queue = queue.SimpleQueue()
+
+    # End def
+
+
+    def send(self, command, value=None):
+        """ Queue a command """
+        self._queue.put((command, value))
+
+    # End def
+
+
+    def drain(self):
+        """ Return all queued (command, value) pairs """
+        commands = []
+        while True:
+            try:
+                commands.append(self._queue.get_nowait())
+            except queue.Empty:
+                return commands
+
+    # End def
+
+# End class
+
+
+class Snapshot():
+    """ Single-writer immutable snapshot """
+    version                       = None
+    _value                        = None
+
+    def __init__(self, initial):
+        """ Initialize variables """
+        self._value  = initial
+        self.version = 0
+
+    # End def
+
+
+    def get(self):
+        """ Return the current snapshot """
+        return self._value
+
+    # End def
+
+
+    def publish(self, value):
+        """ Replace the snapshot (owner thread only) """
+        self._value   = value
+        self.version += 1
+
+    # End def
+
+
+    def update(self, **changes):
+        """ Publish the current snapshot with some fields replaced """
+        self.publish(self._value._replace(**changes))
+
+    # End def
+
+# End class
@@ -0,0 +1,277 @@
+"""
+--------------------------------------------------------------------------
+Telemetry Logger
+--------------------------------------------------------------------------
+License:
+Copyright 2025 - Emma Berdou
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+2. Redistributions   in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors
+may be used to endorse or promote products derived from this software without
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Telemetry Logger
+
+  Records one sample per control tick (time, setpoint, temperature, relay
+state and loop latency) without formatting or writing anything in the
+control path:  record() packs the sample with struct.pack_into() into a
+preallocated ring of fixed-size binary records.
+
+  flush() (from a slow task) writes everything recorded since the last flush
+as one columnar block:  a header, then all the times, then all the
+setpoints, and so on, each column a packed little-endian array.  Columns of
+similar values compress well and can be loaded straight into arrays;
+read_blocks() reads a file back.  If the ring fills before a flush, the
+oldest samples are dropped and counted.  Each flushed block can also be
+handed to on_flush (e.g. tsdb.TimeSeriesDB.add_columns); with a path of
+None only on_flush gets it.
+
+  The level can be changed at run time (e.g. from a signal handler):
+    LOG_OFF      - record nothing
+    LOG_RECORD   - record samples to the file
+    LOG_VERBOSE  - also print a status line (see format_sample())
+
+Software API:
+
+  Telemetry(path=TELEMETRY_FILE, capacity=4096, level=LOG_RECORD, on_flush=None)
+    record(now, setpoint, temperature, relay, latency)
+      - Store one sample (no I/O)
+    flush()
+      - Append the unflushed samples as one block (and pass it to
+        on_flush); return how many
+    get_latest()
+      - Return the newest Sample, or None
+    set_level(level) / cycle_level()
+      - Change the level; cycle_level() steps to the next one and returns it
+    dropped
+      - Samples overwritten before they were flushed
+
+  read_blocks(path)
+    - Yield {column name: array} for each block in a file
+
+  format_sample(sample)
+    - Return a sample as one line of text
+
+"""
+import array
+import os
+import struct
+import sys
+from collections import namedtuple
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+TELEMETRY_FILE        = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                     "telemetry.tlm")
+
+LOG_OFF               = 0
+LOG_RECORD            = 1
+LOG_VERBOSE           = 2
+LOG_LEVEL_NAMES       = {LOG_OFF: "off", LOG_RECORD: "record", LOG_VERBOSE: "verbose"}
+
+# Column name, array / struct type code
+COLUMNS = (
+    ("time",        "d"),    # Seconds since the epoch
+    ("setpoint",    "f"),    # C
+    ("temperature", "f"),    # C
+    ("relay",       "B"),    # 1 if the relays are on
+    ("latency",     "f"),    # Seconds from the tick's release to the sample
+)
+
+RECORD                = struct.Struct("<" + "".join(code for _, code in COLUMNS))
+BLOCK_HEADER          = struct.Struct("<4sI")   # Magic, number of samples
+BLOCK_MAGIC           = b"TLM1"
+
+Sample = namedtuple("Sample", [name for name, _ in COLUMNS])
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+def _column_bytes(code, values):
+    """ Return values packed as a little-endian array """
+    column = array.array(code, values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column.tobytes()
+
+# End def
+
+
+def read_blocks(path):
+    """ Yield {column name: array} for each block in a file """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    offset = 0
+    while offset + BLOCK_HEADER.size <= len(data):
+        magic, count = BLOCK_HEADER.unpack_from(data, offset)
+        if magic != BLOCK_MAGIC:
+            raise ValueError("Bad telemetry block at byte {0}".format(offset))
+        offset += BLOCK_HEADER.size
+
+        block = {}
+        for name, code in COLUMNS:
+            column = array.array(code)
+            size   = count * column.itemsize
+            if offset + size > len(data):
+                return    # Block cut short (e.g. power loss mid-write)
+            column.frombytes(data[offset:offset + size])
+            if sys.byteorder != "little":
+                column.byteswap()
+            block[name] = column
+            offset += size
+        yield block
+
+# End def
+
+
+def format_sample(sample):
+    """ Return a sample as one line of text """
+    return "set={0:.0f}C now={1:.2f}C relay={2} latency={3:.1f}ms".format(
+           sample.setpoint, sample.temperature, "ON" if sample.relay else "OFF",
+           sample.latency * 1000)
+
+# End def
+
+
+class Telemetry():
+    """ Binary ring of samples flushed as columnar blocks """
+    path                          = None
+    on_flush                      = None
+    capacity                      = None
+    level                         = None
+    dropped                       = None
+
+    _buffer                       = None
+    _written                      = None
+    _flushed                      = None
+
+    def __init__(self, path=TELEMETRY_FILE, capacity=4096, level=LOG_RECORD, on_flush=None):
+        """ Initialize variables """
+        self.path     = path
+        self.on_flush = on_flush
+        self.capacity = capacity
+        self.level    = level
+        self.dropped  = 0
+
+        self._buffer  = bytearray(capacity * RECORD.size)
+        self._written = 0       # Samples recorded since start
+        self._flushed = 0       # Samples written to the file (or dropped)
+
+    # End def
+
+
+    def record(self, now, setpoint, temperature, relay, latency):
+        """ Store one sample """
+        if self.level < LOG_RECORD:
+            return
+        slot = self._written % self.capacity
+        RECORD.pack_into(self._buffer, slot * RECORD.size,
+                         now, setpoint, temperature, relay, latency)
+        self._written += 1
+
+        # Overwrote a sample that was never flushed
+        if self._written - self._flushed > self.capacity:
+            self._flushed += 1
+            self.dropped  += 1
+
+    # End def
+
+
+    def get_latest(self):
+        """ Return the newest Sample, or None """
+        if self._written == 0:
+            return None
+        slot = (self._written - 1) % self.capacity
+        return Sample._make(RECORD.unpack_from(self._buffer, slot * RECORD.size))
+
+    # End def
+
+
+    def flush(self):
+        """ Append the unflushed samples as one block; return how many """
+        count = self._written - self._flushed
+        if count == 0:
+            return 0
+
+        # Unflushed samples are at most two runs of the ring
+        start = (self._flushed % self.capacity) * RECORD.size
+        end   = start + count * RECORD.size
+        view  = memoryview(self._buffer)
+        runs  = [view[start:min(end, len(view))]]
+        if end > len(view):
+            runs.append(view[:end - len(view)])
+        rows  = [row for run in runs for row in RECORD.iter_unpack(run)]
+
+        columns = dict(zip((name for name, _ in COLUMNS), zip(*rows)))
+        if self.path is not None:
+            chunks = [BLOCK_HEADER.pack(BLOCK_MAGIC, count)]
+            for name, code in COLUMNS:
+                chunks.append(_column_bytes(code, columns[name]))
+            with open(self.path, "ab") as f:
+                f.write(b"".join(chunks))
+        if self.on_flush is not None:
+            self.on_flush(columns)
+
+        self._flushed += count
+        return count
+
+    # End def
+
+
+    def set_level(self, level):
+        """ Change the level """
+        if level not in LOG_LEVEL_NAMES:
+            raise ValueError("Unknown telemetry level: {0}".format(level))
+        self.level = level
+
+    # End def
+
+
+    def cycle_level(self):
+        """ Step to the next level; return it """
+        self.set_level((self.level + 1) % len(LOG_LEVEL_NAMES))
+        return self.level
+
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    # Print a telemetry file as CSV
+    path = sys.argv[1] if len(sys.argv) > 1 else TELEMETRY_FILE
+    names = [name for name, _ in COLUMNS]
+    print(",".join(names))
+    for block in read_blocks(path):
+        for row in zip(*(block[name] for name in names)):
+            print(",".join(str(value) for value in row))
@@ -3,27 +3,45 @@
 # Based on the Adafruit example: https://github.com/adafruit/Adafruit_Learning_System_Guides/blob/main/Raspberry_Pi_DS18B20_Temperature_Sensing/code.py
 
 import os
-import glob
 import time
  
 #os.system('modprobe w1-gpio')
 #os.system('modprobe w1-therm')
  
-base_dir = '/sys/bus/w1/devices/'
-device_folder = glob.glob(base_dir + '28*')[0]
-device_file = device_folder + '/w1_slave'
+from w1_bus import SensorDiscovery
+
+# Probes are looked up on every read (the cache rescans at most once a
+# second), so the script waits for a probe instead of crashing without one
+discovery = SensorDiscovery(rescan_interval=1.0)
+
+def get_device_file():
+    paths = discovery.get_paths()
+    if not paths:
+        return None
+    return paths[sorted(paths)[0]]
 
 def read_temp_raw():
-    f = open(device_file, 'r')
-    lines = f.readlines()
-    f.close()
+    device_file = get_device_file()
+    if device_file is None:
+        return None
+    try:
+        f = open(device_file, 'r')
+        lines = f.readlines()
+        f.close()
+    except OSError:
+        discovery.invalidate()
+        return None
     return lines
 
 def read_temp():
     lines = read_temp_raw()
+    if lines is None:
+        return None
     while lines[0].strip()[-3:] != 'YES':
         time.sleep(0.2)
         lines = read_temp_raw()
+        if lines is None:
+            return None
     equals_pos = lines[1].find('t=')
     if equals_pos != -1:
         temp_string = lines[1][equals_pos+2:]
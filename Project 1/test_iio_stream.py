@@ -0,0 +1,176 @@
+#!/usr/bin/env python3.11
+"""
+--------------------------------------------------------------------------
+IIO Streaming Capture Check
+--------------------------------------------------------------------------
+License:
+Copyright 2025 - Emma Berdou
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+2. Redistributions   in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors
+may be used to endorse or promote products derived from this software without
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+Runs IIOStream against a fake IIO device:  a temporary directory with the
+scan_elements/ and buffer/ attribute files, and a regular file of scans in
+place of /dev/iio:device0.  Checks that start() enables the requested
+channels, that poll() reads the scans into the ring (including across its
+end), and the values returned by latest(), get_rms() and channel().
+
+  python3 test_iio_stream.py
+
+Prints "OK" or stops at the first failed assert.
+--------------------------------------------------------------------------
+"""
+import os
+import tempfile
+
+import numpy as np
+
+from iio_stream import IIOStream, ADC_MAX, ADC_VREF, SAMPLE_DTYPE
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+ADC_CHANNELS    = 8                     # in_voltage0 .. in_voltage7
+CHANNELS        = [2, 0]                # Stored in channel order: 0, 2
+RING_SCANS      = 8
+
+# ------------------------------------------------------------------------
+# Functions
+# ------------------------------------------------------------------------
+
+def read_attribute(path):
+    """ Read a fake sysfs attribute """
+    with open(path) as f:
+        return f.read().strip()
+
+# End def
+
+
+def make_fake_device(root):
+    """ Create the fake sysfs and dev directories; return (sysfs_dir, dev_dir) """
+    sysfs_dir  = os.path.join(root, "sys")
+    dev_dir    = os.path.join(root, "dev")
+    device_dir = os.path.join(sysfs_dir, "iio:device0")
+    os.makedirs(os.path.join(device_dir, "scan_elements"))
+    os.makedirs(os.path.join(device_dir, "buffer"))
+    os.makedirs(dev_dir)
+
+    names = ["in_voltage{0}_en".format(ain) for ain in range(ADC_CHANNELS)]
+    for name in names + ["in_timestamp_en"]:
+        with open(os.path.join(device_dir, "scan_elements", name), "w") as f:
+            f.write("1")
+    for name in ("enable", "length"):
+        with open(os.path.join(device_dir, "buffer", name), "w") as f:
+            f.write("0")
+    open(os.path.join(device_dir, "sampling_frequency"), "w").close()
+    open(os.path.join(dev_dir, "iio:device0"), "wb").close()
+    return (sysfs_dir, dev_dir)
+
+# End def
+
+
+def write_scans(dev_dir, scans):
+    """ Append scans (one row per scan, channels in order) to the fake device """
+    with open(os.path.join(dev_dir, "iio:device0"), "ab") as f:
+        f.write(np.asarray(scans, dtype=SAMPLE_DTYPE).tobytes())
+
+# End def
+
+
+def check_start(sysfs_dir):
+    """ start() enables exactly the requested channels and the buffer """
+    device_dir = os.path.join(sysfs_dir, "iio:device0")
+    for ain in range(ADC_CHANNELS):
+        path = os.path.join(device_dir, "scan_elements", "in_voltage{0}_en".format(ain))
+        assert read_attribute(path) == str(int(ain in CHANNELS)), path
+    assert read_attribute(os.path.join(device_dir, "scan_elements", "in_timestamp_en")) == "0"
+    assert read_attribute(os.path.join(device_dir, "buffer", "length")) == "64"
+    assert read_attribute(os.path.join(device_dir, "sampling_frequency")) == "1000"
+    assert read_attribute(os.path.join(device_dir, "buffer", "enable")) == "1"
+
+# End def
+
+
+def check_poll(stream, dev_dir):
+    """ poll() reads new scans into the ring, also across its end """
+    assert stream.poll() == 0
+    assert len(stream.latest(4)) == 0
+
+    first = [[i, 1000 + i] for i in range(5)]
+    write_scans(dev_dir, first)
+    assert stream.poll() == 5
+    assert stream.poll() == 0
+    assert stream.latest(3).tolist() == first[2:]
+
+    # 5 + 6 scans in a ring of 8: the newest ones wrap around
+    second = [[i, 1000 + i] for i in range(5, 11)]
+    write_scans(dev_dir, second)
+    assert stream.poll() == 6
+    assert stream.get_scan_count() == 11
+    assert stream.latest(4).tolist() == second[-4:]
+    # At most RING_SCANS - 1 scans are complete in the ring
+    assert len(stream.latest(100)) == RING_SCANS - 1
+
+# End def
+
+
+def check_values(stream, dev_dir):
+    """ latest(), get_rms() and channel() on known samples """
+    scans = [[0, ADC_MAX], [ADC_MAX, ADC_MAX], [0, ADC_MAX], [ADC_MAX, ADC_MAX]]
+    write_scans(dev_dir, scans)
+    stream.poll()
+
+    assert stream.latest(4).tolist() == scans
+    # AIN0 alternates 0 V / ADC_VREF: RMS ADC_VREF / sqrt(2), or half of
+    # ADC_VREF from ADC_VREF / 2; AIN2 is at ADC_VREF throughout
+    assert abs(stream.get_rms(0, 4) - ADC_VREF / np.sqrt(2)) < 1e-9
+    assert abs(stream.get_rms(0, 4, offset=ADC_VREF / 2) - ADC_VREF / 2) < 1e-9
+    assert abs(stream.get_rms(2, 4) - ADC_VREF) < 1e-9
+    assert stream.channel(0).read_burst(2) == [0, ADC_MAX]
+    assert stream.channel(2).read_burst(2) == [ADC_MAX, ADC_MAX]
+
+# End def
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as root:
+        (sysfs_dir, dev_dir) = make_fake_device(root)
+        stream = IIOStream(CHANNELS, buffer_length=64, ring_scans=RING_SCANS,
+                           sample_rate=1000, sysfs_dir=sysfs_dir, dev_dir=dev_dir)
+        stream.start()
+        check_start(sysfs_dir)
+        check_poll(stream, dev_dir)
+        check_values(stream, dev_dir)
+        stream.stop()
+        assert read_attribute(os.path.join(sysfs_dir, "iio:device0", "buffer", "enable")) == "0"
+
+    print("OK")
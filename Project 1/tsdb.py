@@ -0,0 +1,547 @@
+"""
+--------------------------------------------------------------------------
+Heater History Store
+--------------------------------------------------------------------------
+License:
+Copyright 2025 - Emma Berdou
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+2. Redistributions   in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors
+may be used to endorse or promote products derived from this software without
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+
+Heater History Store
+
+  Keeps months of temperature and relay history on a small SD card.  Samples
+are downsampled into three tiers, each a bucket width with min / mean / max
+temperature, the last setpoint and the relay duty over the bucket:
+
+    "1s"  - 1 second buckets      (from the raw control ticks)
+    "1m"  - 1 minute buckets      (from the 1s tier)
+    "1h"  - 1 hour buckets        (from the 1m tier)
+
+  Each tier is stored as a series of segment files, one per span of time
+(TIERS); once a tier has more than its number of segments, the oldest is
+deleted.  A segment is two append-only files:
+
+    <start>.dat  - blocks of up to block_records records.  A block stores
+                   each column in turn as the first value then the deltas,
+                   zigzag varint encoded:  a record of 1 s data takes about
+                   8 bytes instead of 40.
+    <start>.idx  - one fixed-width entry per block:  first time, last time,
+                   offset, length, record count
+
+  query() maps a segment's index with mmap, bisects it for the first block
+in range and decodes only the blocks it needs, so a whole file is never
+read into memory.  Records still waiting in memory for a block are
+included.
+
+  close() stores the buckets that are still open, so after a restart the
+same bucket can be stored twice (part before, part after).  Files are
+append-only, so query() merges rows with the same time instead:  every raw
+sample is in exactly one of them, so the merged row is exact.
+
+  Temperatures are stored in 1/16 C (DS18B20 resolution), duty in 1/1000.
+
+Software API:
+
+  TimeSeriesDB(root=TSDB_DIR, tiers=TIERS, block_records=256)
+    add_sample(now, temperature, setpoint, relay)
+      - Add one raw sample (now in seconds since the epoch); samples with
+        a NaN temperature (no reading) are skipped
+    add_columns(columns)
+      - Add a telemetry block ({column name: values}, see telemetry.py)
+    query(tier, start, end)
+      - Yield the Records of a tier with start <= time < end
+    flush()
+      - Write the records waiting in memory as (short) blocks
+    close()
+      - Close the open buckets, flush and close the files
+
+  Record(time, count, temp_min, temp_mean, temp_max, setpoint, duty)
+    - time is the start of the bucket, count the raw samples in it
+
+"""
+import bisect
+import math
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+TSDB_DIR              = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                     "history")
+
+# Name, bucket width (s), segment span (s), segments kept
+TIERS = (
+    ("1s",   1,     86400,       7),     # A week of 1 s data
+    ("1m",   60,    30 * 86400,  13),    # A year of 1 min data
+    ("1h",   3600,  365 * 86400, 10),    # Ten years of 1 h data
+)
+
+TEMP_SCALE            = 16                # Stored units per C
+DUTY_SCALE            = 1000              # Stored units per full duty
+
+INDEX_ENTRY           = struct.Struct("<qqIII")   # first, last, offset, length, count
+
+Record = namedtuple("Record", ["time", "count", "temp_min", "temp_mean", "temp_max",
+                               "setpoint", "duty"])
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+def encode_column(values, out):
+    """ Append values to out as zigzag varint deltas """
+    previous = 0
+    for value in values:
+        delta    = value - previous
+        previous = value
+        zigzag   = (delta << 1) ^ (delta >> 63)
+        while zigzag >= 0x80:
+            out.append((zigzag & 0x7F) | 0x80)
+            zigzag >>= 7
+        out.append(zigzag)
+
+# End def
+
+
+def decode_column(data, offset, count):
+    """ Return (values, next offset) for count zigzag varint deltas """
+    values   = []
+    previous = 0
+    for _ in range(count):
+        zigzag = 0
+        shift  = 0
+        while True:
+            byte    = data[offset]
+            offset += 1
+            zigzag |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        previous += (zigzag >> 1) ^ -(zigzag & 1)
+        values.append(previous)
+    return values, offset
+
+# End def
+
+
+def encode_block(rows):
+    """ Return a block of stored (integer) rows """
+    out = bytearray()
+    for column in zip(*rows):
+        encode_column(column, out)
+    return bytes(out)
+
+# End def
+
+
+def decode_block(data, count):
+    """ Return the stored (integer) rows of a block """
+    columns = []
+    offset  = 0
+    for _ in Record._fields:
+        values, offset = decode_column(data, offset, count)
+        columns.append(values)
+    return list(zip(*columns))
+
+# End def
+
+
+def to_record(row):
+    """ Return the Record for a stored row """
+    (time, count, temp_min, temp_mean, temp_max, setpoint, duty) = row
+    return Record(time, count, temp_min / TEMP_SCALE, temp_mean / TEMP_SCALE,
+                  temp_max / TEMP_SCALE, setpoint, duty / DUTY_SCALE)
+
+# End def
+
+
+class _IndexTimes():
+    """ Last-time column of a mapped index, as a sequence for bisect """
+    _map                          = None
+
+    def __init__(self, index_map):
+        """ Initialize variables """
+        self._map = index_map
+
+    # End def
+
+
+    def __len__(self):
+        return len(self._map) // INDEX_ENTRY.size
+
+    # End def
+
+
+    def __getitem__(self, i):
+        return INDEX_ENTRY.unpack_from(self._map, i * INDEX_ENTRY.size)[1]
+
+    # End def
+
+# End class
+
+
+class Bucket():
+    """ Running min / mean / max of one bucket """
+    time                          = None
+    count                         = None
+    temp_min                      = None
+    temp_sum                      = None
+    temp_max                      = None
+    setpoint                      = None
+    duty_sum                      = None
+
+    def __init__(self, time):
+        """ Initialize variables """
+        self.time     = time
+        self.count    = 0
+        self.temp_min = None
+        self.temp_sum = 0
+        self.temp_max = None
+        self.setpoint = 0
+        self.duty_sum = 0
+
+    # End def
+
+
+    def add(self, count, temp_min, temp_mean, temp_max, setpoint, duty):
+        """ Add count samples (or a finer bucket) """
+        if self.temp_min is None or temp_min < self.temp_min:
+            self.temp_min = temp_min
+        if self.temp_max is None or temp_max > self.temp_max:
+            self.temp_max = temp_max
+        self.count    += count
+        self.temp_sum += temp_mean * count
+        self.duty_sum += duty * count
+        self.setpoint  = setpoint
+
+    # End def
+
+
+    def get_row(self):
+        """ Return the bucket as a stored row """
+        return (self.time, self.count, self.temp_min,
+                int(round(self.temp_sum / self.count)), self.temp_max,
+                self.setpoint, int(round(self.duty_sum / self.count)))
+
+    # End def
+
+# End class
+
+
+class Tier():
+    """ One downsampling tier and its segment files """
+    name                          = None
+    width                         = None
+    span                          = None
+    keep                          = None
+    directory                     = None
+    block_records                 = None
+
+    bucket                        = None
+    pending                       = None
+    _segment                      = None
+    _data                         = None
+    _index                        = None
+
+    def __init__(self, root, name, width, span, keep, block_records):
+        """ Initialize variables """
+        self.name          = name
+        self.width         = width
+        self.span          = span
+        self.keep          = keep
+        self.directory     = os.path.join(root, name)
+        self.block_records = block_records
+        self.bucket        = None
+        self.pending       = []
+        self._segment      = None
+        self._data         = None
+        self._index        = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    # End def
+
+
+    def add(self, time, *values):
+        """ Add to the bucket holding time; return the row of a closed bucket """
+        start = time - time % self.width
+        row   = None
+        if self.bucket is not None and self.bucket.time != start:
+            row = self.close_bucket()
+        if self.bucket is None:
+            self.bucket = Bucket(start)
+        self.bucket.add(*values)
+        return row
+
+    # End def
+
+
+    def close_bucket(self):
+        """ Store the open bucket; return its row (or None) """
+        if self.bucket is None:
+            return None
+        row = self.bucket.get_row()
+        self.bucket = None
+        self.pending.append(row)
+        if len(self.pending) >= self.block_records:
+            self.write_block()
+        return row
+
+    # End def
+
+
+    def get_segments(self):
+        """ Return the start times of the stored segments, oldest first """
+        starts = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".idx"):
+                starts.append(int(name[:-len(".idx")]))
+        return sorted(starts)
+
+    # End def
+
+
+    def _path(self, start, extension):
+        """ Return the path of a segment file """
+        return os.path.join(self.directory, "{0:010d}{1}".format(start, extension))
+
+    # End def
+
+
+    def _open_segment(self, start):
+        """ Switch to the segment starting at start; drop old segments """
+        self.close_files()
+        self._segment = start
+        self._data    = open(self._path(start, ".dat"), "ab")
+        self._index   = open(self._path(start, ".idx"), "ab")
+        for old in self.get_segments()[:-self.keep]:
+            os.remove(self._path(old, ".idx"))
+            os.remove(self._path(old, ".dat"))
+
+    # End def
+
+
+    def write_block(self):
+        """ Append the pending rows as blocks """
+        while self.pending:
+            # A block never crosses into the next segment
+            segment = self.pending[0][0] - self.pending[0][0] % self.span
+            rows    = [row for row in self.pending[:self.block_records]
+                       if row[0] < segment + self.span]
+            del self.pending[:len(rows)]
+
+            if segment != self._segment:
+                self._open_segment(segment)
+            block  = encode_block(rows)
+            offset = self._data.tell()
+            self._data.write(block)
+            self._data.flush()
+            # Index entry last, so an entry always points at complete data
+            self._index.write(INDEX_ENTRY.pack(rows[0][0], rows[-1][0], offset,
+                                               len(block), len(rows)))
+            self._index.flush()
+
+    # End def
+
+
+    def query(self, start, end):
+        """ Yield the stored rows with start <= time < end """
+        # Rows of the same bucket (split by a restart) are adjacent
+        bucket = None
+        for row in self._query_rows(start, end):
+            if bucket is not None and bucket.time != row[0]:
+                yield bucket.get_row()
+                bucket = None
+            if bucket is None:
+                bucket = Bucket(row[0])
+            bucket.add(*row[1:])
+        if bucket is not None:
+            yield bucket.get_row()
+
+    # End def
+
+
+    def _query_rows(self, start, end):
+        """ Yield the stored rows with start <= time < end, as stored """
+        for segment in self.get_segments():
+            if segment + self.span <= start or segment >= end:
+                continue
+            yield from self._query_segment(segment, start, end)
+        for row in self.pending:
+            if start <= row[0] < end:
+                yield row
+
+    # End def
+
+
+    def _query_segment(self, segment, start, end):
+        """ Yield the rows of one segment with start <= time < end """
+        with open(self._path(segment, ".idx"), "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            size -= size % INDEX_ENTRY.size          # Ignore a torn entry
+            if size == 0:
+                return
+            index = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+        with open(self._path(segment, ".dat"), "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            first = bisect.bisect_left(_IndexTimes(index), start)
+            for i in range(first, size // INDEX_ENTRY.size):
+                (block_first, _, offset, length, count) = INDEX_ENTRY.unpack_from(
+                    index, i * INDEX_ENTRY.size)
+                if block_first >= end:
+                    break
+                for row in decode_block(data[offset:offset + length], count):
+                    if start <= row[0] < end:
+                        yield row
+        finally:
+            index.close()
+            data.close()
+
+    # End def
+
+
+    def close_files(self):
+        """ Close the open segment files """
+        if self._data is not None:
+            self._data.close()
+            self._index.close()
+        self._segment = None
+        self._data    = None
+        self._index   = None
+
+    # End def
+
+# End class
+
+
+class TimeSeriesDB():
+    """ Downsampled, compressed heater history """
+    root                          = None
+    tiers                         = None
+
+    def __init__(self, root=TSDB_DIR, tiers=TIERS, block_records=256):
+        """ Initialize variables """
+        self.root  = root
+        self.tiers = [Tier(root, name, width, span, keep, block_records)
+                      for (name, width, span, keep) in tiers]
+
+    # End def
+
+
+    def _get_tier(self, name):
+        """ Return the tier called name """
+        for tier in self.tiers:
+            if tier.name == name:
+                return tier
+        raise ValueError("Unknown tier: {0}".format(name))
+
+    # End def
+
+
+    def _cascade(self, level, row):
+        """ Feed a closed bucket of one tier into the next ones """
+        while row is not None and level + 1 < len(self.tiers):
+            level += 1
+            (time, count, temp_min, temp_mean, temp_max, setpoint, duty) = row
+            row = self.tiers[level].add(time, count, temp_min, temp_mean, temp_max,
+                                        setpoint, duty)
+
+    # End def
+
+
+    def add_sample(self, now, temperature, setpoint, relay):
+        """ Add one raw sample """
+        if math.isnan(temperature):
+            return                  # No reading from the control probe
+        temp = int(round(temperature * TEMP_SCALE))
+        duty = DUTY_SCALE if relay else 0
+        row  = self.tiers[0].add(int(now), 1, temp, temp, temp, int(round(setpoint)), duty)
+        self._cascade(0, row)
+
+    # End def
+
+
+    def add_columns(self, columns):
+        """ Add a telemetry block ({column name: values}) """
+        for sample in zip(columns["time"], columns["temperature"],
+                          columns["setpoint"], columns["relay"]):
+            self.add_sample(*sample)
+
+    # End def
+
+
+    def query(self, tier, start, end):
+        """ Yield the Records of a tier with start <= time < end """
+        for row in self._get_tier(tier).query(start, end):
+            yield to_record(row)
+
+    # End def
+
+
+    def flush(self):
+        """ Write the records waiting in memory """
+        for tier in self.tiers:
+            tier.write_block()
+
+    # End def
+
+
+    def close(self):
+        """ Close the open buckets, flush and close the files """
+        for level, tier in enumerate(self.tiers):
+            self._cascade(level, tier.close_bucket())
+        self.flush()
+        for tier in self.tiers:
+            tier.close_files()
+
+    # End def
+
+# End class
+
+
+# ------------------------------------------------------------------------
+# Main script
+# ------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    import sys
+    import time
+
+    # tsdb.py [tier [hours]]:  print the last hours of a tier as CSV
+    tier  = sys.argv[1] if len(sys.argv) > 1 else "1m"
+    hours = float(sys.argv[2]) if len(sys.argv) > 2 else 24.0
+    end   = time.time()
+    db    = TimeSeriesDB()
+    print(",".join(Record._fields))
+    for record in db.query(tier, int(end - hours * 3600), int(end) + 1):
+        print("{0},{1},{2:.2f},{3:.2f},{4:.2f},{5},{6:.3f}".format(*record))
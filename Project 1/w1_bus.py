@@ -0,0 +1,329 @@
+"""
+--------------------------------------------------------------------------
+1-Wire Bus Manager
+--------------------------------------------------------------------------
+License:
+Copyright 2025 - Emma Berdou
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+1. Redistributions of source code must retain the above copyright notice,
+this list of conditions and the following disclaimer.
+
+2. Redistributions   in binary form must reproduce the above copyright notice,
+this list of conditions and the following disclaimer in the documentation
+and/or other materials provided with the distribution.
+
+3. Neither the name of the copyright holder nor the names of its contributors
+may be used to endorse or promote products derived from this software without
+specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF
+THE POSSIBILITY OF SUCH DAMAGE.
+--------------------------------------------------------------------------
+
+1-Wire Bus Manager
+
+  Manages every DS18B20 ("28-*" family) probe on one w1 bus master.  Instead
+of reading the probes one after another (one ~750 ms conversion each), a
+sweep writes "trigger" to the bus master's "therm_bulk_read" attribute so all
+probes convert at the same time, waits for that single conversion, and then
+reads the stored result from each probe.  Reading N probes takes about one
+conversion time.
+
+  Kernels without "therm_bulk_read" fall back to reading the probes one at
+a time.
+
+  Probes can be plugged in or pulled out while the program runs.  sysfs does
+not generate inotify events, so SensorDiscovery rescans the devices directory
+at most once every "rescan_interval" seconds (or right away after a probe
+stops answering) and caches the resolved "w1_slave" paths in between, so the
+read path never globs.
+
+Software API:
+
+  SensorDiscovery(devices_dir=W1_DEVICES_DIR, rescan_interval=5.0)
+    - Provide the w1 devices directory and the minimum time between rescans
+
+    get_paths()
+      - Return {probe id: w1_slave path}, rescanning first if it is due
+      - Function consumes no time between rescans
+
+    refresh(force=False)
+      - Rescan if due (or if force); return (added ids, removed ids)
+
+    invalidate()
+      - Make the next get_paths() / refresh() rescan
+
+  W1Bus(bus_master="w1_bus_master1", devices_dir=W1_DEVICES_DIR,
+        rescan_interval=5.0)
+    - Provide the name of the bus master to manage
+    - Probes added / removed later are picked up on the next due rescan
+
+    scan()
+      - Rescan the bus for "28-*" probes now
+
+    list_sensors()
+      - Return the sorted list of probe ids (e.g. "28-20a9d4469694")
+
+    set_resolution(bits)
+      - Set the resolution of every probe (also applied to probes added later)
+
+    get_conversion_time()
+      - Return the time one sweep has to wait for (slowest probe)
+
+    read_all()
+      - Convert all probes together and return {probe id: temp in C}
+      - Probes that failed the CRC check map to None
+      - Function consumes time (about one conversion)
+
+"""
+import os
+import time
+
+from ds18b20 import DS18B20, W1_DEVICES_DIR, CONVERSION_TIMES, DEFAULT_RESOLUTION
+
+# ------------------------------------------------------------------------
+# Constants
+# ------------------------------------------------------------------------
+
+DS18B20_FAMILY          = "28-"
+
+# Extra time allowed past the datasheet conversion time
+CONVERSION_MARGIN       = 0.75
+BULK_POLL_TIME          = 0.01
+
+RESCAN_INTERVAL         = 5.0
+
+# ------------------------------------------------------------------------
+# Functions / Classes
+# ------------------------------------------------------------------------
+
+class SensorDiscovery():
+    """ Rate-limited, cached discovery of DS18B20 probes """
+    devices_dir                   = None
+    rescan_interval               = None
+
+    paths                         = None
+    _next_scan                    = None
+
+    def __init__(self, devices_dir=W1_DEVICES_DIR, rescan_interval=RESCAN_INTERVAL):
+        """ Initialize variables and do the first scan """
+        self.devices_dir     = devices_dir
+        self.rescan_interval = rescan_interval
+        self.paths           = {}
+        self._next_scan      = None
+
+        self.refresh(force=True)
+
+    # End def
+
+
+    def _scan(self):
+        """ Return {probe id: w1_slave path} for the probes present now """
+        try:
+            names = os.listdir(self.devices_dir)
+        except OSError:
+            return {}
+        return {name: os.path.join(self.devices_dir, name, "w1_slave")
+                for name in names if name.startswith(DS18B20_FAMILY)}
+
+    # End def
+
+
+    def refresh(self, force=False):
+        """ Rescan if due and return (added ids, removed ids) """
+        now = time.monotonic()
+        if (not force) and (self._next_scan is not None) and (now < self._next_scan):
+            return ([], [])
+        self._next_scan = now + self.rescan_interval
+
+        paths   = self._scan()
+        added   = sorted(set(paths) - set(self.paths))
+        removed = sorted(set(self.paths) - set(paths))
+        if added or removed:
+            self.paths = paths
+        return (added, removed)
+
+    # End def
+
+
+    def invalidate(self):
+        """ Make the next lookup rescan """
+        self._next_scan = None
+
+    # End def
+
+
+    def get_paths(self):
+        """ Return {probe id: w1_slave path} """
+        self.refresh()
+        return self.paths
+
+    # End def
+
+# End class
+
+
+class W1Bus():
+    """ W1Bus Class """
+    bus_master                    = None
+    devices_dir                   = None
+    bulk_read_file                = None
+
+    discovery                     = None
+    sensors                       = None
+    resolution                    = None
+
+    def __init__(self, bus_master="w1_bus_master1", devices_dir=W1_DEVICES_DIR,
+                 rescan_interval=RESCAN_INTERVAL):
+        """ Initialize variables and enumerate the probes """
+        self.bus_master     = bus_master
+        self.devices_dir    = devices_dir
+        self.bulk_read_file = os.path.join(devices_dir, bus_master, "therm_bulk_read")
+        self.discovery      = SensorDiscovery(devices_dir, rescan_interval)
+        self.sensors        = {}
+        self.resolution     = None
+
+        self._update_sensors()
+
+    # End def
+
+
+    def _update_sensors(self):
+        """ Sync the probe objects with the discovery cache """
+        paths = self.discovery.get_paths()
+        if paths.keys() == self.sensors.keys():
+            return
+        sensors = {}
+        for sensor_id, path in paths.items():
+            sensor = self.sensors.get(sensor_id)
+            if sensor is None:
+                sensor = DS18B20(path)
+                if self.resolution is not None:
+                    sensor.set_resolution(self.resolution)
+            sensors[sensor_id] = sensor
+        for sensor_id in self.sensors.keys() - paths.keys():
+            self.sensors[sensor_id].close()
+            print("W1Bus: probe {0} removed".format(sensor_id))
+        for sensor_id in paths.keys() - self.sensors.keys():
+            print("W1Bus: probe {0} added".format(sensor_id))
+        self.sensors = sensors
+
+    # End def
+
+
+    def scan(self):
+        """ Rescan the bus for DS18B20 probes now """
+        self.discovery.invalidate()
+        self._update_sensors()
+
+    # End def
+
+
+    def list_sensors(self):
+        """ Return the sorted list of probe ids """
+        return sorted(self.sensors)
+
+    # End def
+
+
+    def set_resolution(self, bits):
+        """ Set the resolution of every probe on the bus.
+
+            Returns:  True if every probe accepted it
+        """
+        self.resolution = bits
+        ok = True
+        for sensor in self.sensors.values():
+            ok = sensor.set_resolution(bits) and ok
+        return ok
+
+    # End def
+
+
+    def get_conversion_time(self):
+        """ Return the conversion time of the slowest probe """
+        if not self.sensors:
+            return CONVERSION_TIMES[self.resolution or DEFAULT_RESOLUTION]
+        return max(sensor.get_conversion_time() for sensor in self.sensors.values())
+
+    # End def
+
+
+    def has_bulk_read(self):
+        """ Does the bus master support simultaneous conversions? """
+        return os.path.exists(self.bulk_read_file)
+
+    # End def
+
+
+    def trigger_conversion(self):
+        """ Start a conversion on every probe on the bus.
+
+            Returns:  True  - Conversion started
+                      False - Bulk conversion not supported / failed
+        """
+        try:
+            with open(self.bulk_read_file, 'w') as f:
+                f.write("trigger\n")
+        except OSError:
+            return False
+        return True
+
+    # End def
+
+
+    def wait_for_conversion(self):
+        """ Wait for a triggered conversion to finish.
+
+            "therm_bulk_read" reads -1 while any probe is still converting.
+        """
+        # Nothing is ready before the conversion time for this resolution
+        conversion_time = self.get_conversion_time()
+        time.sleep(conversion_time)
+        end = time.monotonic() + CONVERSION_MARGIN
+        while time.monotonic() < end:
+            try:
+                with open(self.bulk_read_file, 'r') as f:
+                    if int(f.read().strip()) != -1:
+                        return
+            except (OSError, ValueError):
+                return
+            time.sleep(BULK_POLL_TIME)
+
+    # End def
+
+
+    def read_all(self):
+        """ Convert all probes together and return {probe id: temp in C} """
+        self._update_sensors()
+        sensors = self.sensors
+        if not sensors:
+            return {}
+
+        # After a bulk conversion each w1_slave read returns the stored
+        # result instead of starting a new conversion
+        if (len(sensors) > 1) and self.trigger_conversion():
+            self.wait_for_conversion()
+
+        temps = {sensor_id: sensor.read_temp() for sensor_id, sensor in sensors.items()}
+
+        # A probe that stops answering may have been unplugged
+        if None in temps.values():
+            self.discovery.invalidate()
+        return temps
+
+    # End def
+
+# End class
@@ -44,11 +44,31 @@ button is not pressed) and will be connected to power when the button is pressed
   To select the pull up configuration, press_low=True.  To select the pull down
 configuration, press_low=False.
 
+  By default the button is polled every "sleep_time" seconds, so presses
+shorter than that can be missed.  With use_interrupts=True the driver uses
+GPIO edge interrupts (GPIO.add_event_detect) instead:  every transition is
+timestamped with time.monotonic() in the interrupt callback and queued, and
+wait_for_press() sleeps until an edge arrives instead of polling.  The
+pressed / unpressed callbacks are still executed every "sleep_time" while
+waiting, and the press duration is measured between the edge timestamps.
+
+  The edge direction is not read back from the pin in the callback (after
+a short press the pin is already released by then):  edges alternate, so
+each one flips the last known level.  bouncetime (default 20 ms) keeps
+contact bounce from producing extra edges, but it also swallows a real
+transition that comes within bouncetime of the last one, so the pin is read
+back "bouncetime" after the last edge:  if it no longer matches, the missing
+edge is queued (and passed to the edge callback) with the time of the
+read-back.  The level is also re-read whenever wait_for_press() starts.
+
 
 Software API:
 
-  Button(pin, press_low)
+  Button(pin, press_low, sleep_time=0.1, use_interrupts=False,
+         bouncetime=DEFAULT_BOUNCETIME)
     - Provide pin that the button monitors
+    - use_interrupts selects edge-triggered mode; bouncetime (ms) is passed
+      to GPIO.add_event_detect
     
     wait_for_press()
       - Wait for the button to be pressed 
@@ -77,6 +97,9 @@ Software API:
         - Executed once when the button is pressed
       - set_on_release_callback(function)
         - Executed once when the button is released
+      - set_edge_callback(function)
+        - Interrupt mode only:  executed from the interrupt thread on every
+          edge as function(timestamp, pressed)
       
       - get_pressed_callback_value()
       - get_unpressed_callback_value()
@@ -85,6 +108,8 @@ Software API:
 
 
 """
+import queue
+import threading
 import time
 
 import Adafruit_BBIO.GPIO as GPIO
@@ -96,6 +121,8 @@ import Adafruit_BBIO.GPIO as GPIO
 HIGH          = GPIO.HIGH
 LOW           = GPIO.LOW
 
+DEFAULT_BOUNCETIME = 20    # ms
+
 # ------------------------------------------------------------------------
 # Global variables
 # ------------------------------------------------------------------------
@@ -124,9 +151,19 @@ class Button():
     on_press_callback_value       = None
     on_release_callback           = None
     on_release_callback_value     = None
+    edge_callback                 = None
     
+    use_interrupts                = None
+    bouncetime                    = None
+    edges                         = None
+    edge_pressed                  = None
+    edge_lock                     = None
+    resync_timer                  = None
+    resync_time                   = None
     
-    def __init__(self, pin=None, press_low=True, sleep_time=0.1):
+    
+    def __init__(self, pin=None, press_low=True, sleep_time=0.1,
+                 use_interrupts=False, bouncetime=DEFAULT_BOUNCETIME):
         """ Initialize variables and set up the button """
         if (pin == None):
             raise ValueError("Pin not provided for Button()")
@@ -146,6 +183,13 @@ class Button():
         self.sleep_time      = sleep_time
         self.press_duration  = 0.0        
 
+        # Interrupt mode: (timestamp, pressed) for every edge
+        self.use_interrupts  = use_interrupts
+        self.bouncetime      = bouncetime
+        self.edges           = queue.SimpleQueue()
+        self.edge_lock       = threading.Lock()
+        self.resync_time     = None
+
         # Initialize the hardware components        
         self._setup()
     
@@ -158,6 +202,65 @@ class Button():
         # HW#4 TODO: (one line of code)
         #   Remove "pass" and use the Adafruit_BBIO.GPIO library to set up the button
         GPIO.setup(self.pin,GPIO.IN)
+        
+        if self.use_interrupts:
+            self.edge_pressed = self.is_pressed()
+            GPIO.add_event_detect(self.pin, GPIO.BOTH,
+                                  callback=self._edge_detected,
+                                  bouncetime=self.bouncetime)
+
+    # End def
+
+
+    def _edge_detected(self, channel):
+        """ Interrupt callback: timestamp and queue the edge """
+        timestamp = time.monotonic()
+        with self.edge_lock:
+            self._start_resync_timer()
+            # The read-back may have reported this edge already
+            if ((self.resync_time is not None) and
+                (timestamp - self.resync_time < self.bouncetime / 1000.0)):
+                return
+            # Every edge is a transition from the last known level
+            pressed   = not self.edge_pressed
+            self.edge_pressed = pressed
+        self._queue_edge(timestamp, pressed)
+
+    # End def
+
+
+    def _resync_edge(self):
+        """ Timer callback: compare the pin with the last known level """
+        with self.edge_lock:
+            pressed = self.is_pressed()
+            if pressed == self.edge_pressed:
+                return
+            # An edge was lost (e.g. within bouncetime of the previous one)
+            timestamp         = time.monotonic()
+            self.edge_pressed = pressed
+            self.resync_time  = timestamp
+        self._queue_edge(timestamp, pressed)
+
+    # End def
+
+
+    def _start_resync_timer(self):
+        """ Read the pin back "bouncetime" after the latest edge """
+        if self.resync_timer is not None:
+            self.resync_timer.cancel()
+        self.resync_timer = threading.Timer(self.bouncetime / 1000.0, self._resync_edge)
+        self.resync_timer.daemon = True
+        self.resync_timer.start()
+
+    # End def
+
+
+    def _queue_edge(self, timestamp, pressed):
+        """ Queue an edge and pass it to the edge callback """
+        self.edges.put((timestamp, pressed))
+        
+        if self.edge_callback is not None:
+            self.edge_callback(timestamp, pressed)
 
     # End def
 
@@ -188,6 +291,10 @@ class Button():
            Arguments:  None
            Returns:    None
         """
+        if self.use_interrupts:
+            self._wait_for_press_edges()
+            return
+        
         button_press_time = None
         
         # Wait for button press
@@ -239,6 +346,58 @@ class Button():
     # End def
 
     
+    def _wait_for_edge(self, pressed, callback_name):
+        """ Sleep until an edge to the "pressed" state, executing the given
+           callback every "sleep_time" while waiting.
+           
+           Returns:  time.monotonic() timestamp of the edge
+        """
+        while True:
+            try:
+                (timestamp, edge_pressed) = self.edges.get(timeout=self.sleep_time)
+            except queue.Empty:
+                callback = getattr(self, callback_name)
+                if callback is not None:
+                    setattr(self, callback_name + "_value", callback())
+                continue
+            
+            if edge_pressed == pressed:
+                return timestamp
+
+    # End def
+
+
+    def _wait_for_press_edges(self):
+        """ wait_for_press() using edge interrupts instead of polling """
+        # Drop edges from before the call, and resynchronize the level
+        with self.edge_lock:
+            while not self.edges.empty():
+                self.edges.get_nowait()
+            self.edge_pressed = self.is_pressed()
+        
+        # Wait for button press (unless it is already pressed)
+        if self.is_pressed():
+            button_press_time = time.monotonic()
+        else:
+            button_press_time = self._wait_for_edge(True, "unpressed_callback")
+        
+        # Executed the on press callback function
+        if self.on_press_callback is not None:
+            self.on_press_callback_value = self.on_press_callback()
+        
+        # Wait for button release
+        button_release_time = self._wait_for_edge(False, "pressed_callback")
+        
+        # Record the press duration from the edge timestamps
+        self.press_duration = button_release_time - button_press_time
+
+        # Executed the on release callback function
+        if self.on_release_callback is not None:
+            self.on_release_callback_value = self.on_release_callback()
+
+    # End def
+
+
     def get_last_press_duration(self):
         """ Return the last press duration """
         return self.press_duration
@@ -248,8 +407,10 @@ class Button():
     
     def cleanup(self):
         """ Clean up the button hardware. """
-        # Nothing to do for GPIO
-        pass
+        if self.use_interrupts:
+            GPIO.remove_event_detect(self.pin)
+            if self.resync_timer is not None:
+                self.resync_timer.cancel()
     
     # End def
     
@@ -305,6 +466,12 @@ class Button():
         return self.on_release_callback_value
     
     # End def    
+
+    def set_edge_callback(self, function):
+        """ Function executed on every edge (interrupt mode only) """
+        self.edge_callback = function
+    
+    # End def
     
 # End class
 
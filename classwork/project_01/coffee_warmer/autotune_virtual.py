@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# autotune_virtual.py - Runs the relay auto-tuner against the virtual hardware
+import os
+import sys
+
+import project_path
+project_path.add()  # Shared control code lives in "Project 1"
+import virtual_hardware
+from virtual_hardware import gpio, temp_sensor
+from autotune import RelayAutotuner, save_gains
+from clock import SimClock
+
+# Configuration
+HEATER_PIN = "P2_24"
+SETPOINT = 60.0
+UPDATE_INTERVAL = 1.0  # seconds
+DEVICE_ID = "virtual"
+GAINS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "virtual_pid_gains.json")
+
+def run_autotune(setpoint=SETPOINT):
+    """Run the relay experiment; return the AutotuneResult or None"""
+    clock = virtual_hardware.clock
+    gpio.setup(HEATER_PIN, "output")
+    tuner = RelayAutotuner(setpoint)
+    while not tuner.is_done():
+        temp = temp_sensor.read_temp()
+        on = tuner.update(temp, clock.monotonic())
+        gpio.output(HEATER_PIN, 1 if on else 0)
+        clock.sleep(UPDATE_INTERVAL)
+    gpio.output(HEATER_PIN, 0)
+    if tuner.get_result() is None:
+        print(f"Auto-tune failed: {tuner.get_error()}")
+    return tuner.get_result()
+
+if __name__ == '__main__':
+    # "--realtime" runs on the wall clock instead of simulated time
+    if "--realtime" not in sys.argv:
+        virtual_hardware.set_clock(SimClock())
+    try:
+        result = run_autotune()
+        if result is not None:
+            print(f"Ku={result.ku:.3f} Pu={result.pu:.1f}s amplitude={result.amplitude:.2f}C")
+            print(f"kp={result.kp:.4f} ki={result.ki:.5f} kd={result.kd:.3f} ({result.rule})")
+            save_gains(DEVICE_ID, result, GAINS_FILE)
+            print(f"Gains saved to {GAINS_FILE}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        gpio.cleanup()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# batch_sim.py - Steps thousands of virtual heaters at once with NumPy
+#
+# Same model and controllers as virtual_hardware.ThermalPlant and
+# "Project 1"/controller.py, but every value is an array with one entry per
+# run, so a whole grid of setpoints / gains / rooms is stepped in lockstep.
+# Any plant or controller parameter can be a scalar or a per-run array.
+#
+#   python batch_sim.py           - search PID gains against bang-bang (this
+#                                   chose the defaults in controller.py)
+#   python batch_sim.py --check   - compare against the scalar simulator
+import itertools
+import sys
+import time
+
+import numpy as np
+
+import project_path
+project_path.add()  # Shared control code lives in "Project 1"
+from virtual_hardware import ThermalPlant, step_response_metrics
+import controller
+from controller import PIDRelayController
+
+# Configuration
+SETPOINT = 60.0
+DURATION = 4 * 3600.0  # simulated seconds
+CONTROL_PERIOD = 1.0   # seconds between controller updates
+SETTLE_BAND = 0.5      # C
+
+# Gain search: every candidate runs from cold in every room / setpoint below
+SEARCH_RUNS = 2000
+SEARCH_SEED = 0
+SEARCH_AMBIENTS = [15.0, 20.0, 25.0, 30.0]
+SEARCH_SETPOINTS = [50.0, 60.0, 70.0]
+
+class BatchPlant:
+    """N copies of ThermalPlant stepped together"""
+    MAX_STEP = ThermalPlant.MAX_STEP
+
+    def __init__(self, n, ambient=20.0, heater_power=40.0, plate_capacity=150.0,
+                 coffee_capacity=1000.0, k_plate_coffee=1.5, k_plate_ambient=0.15,
+                 k_coffee_ambient=0.35, sensor_tau=10.0, dead_time=2.0,
+                 quantization=0.0625):
+        self.n = n
+        full = lambda value: np.broadcast_to(np.asarray(value, dtype=float), (n,)).copy()
+        self.ambient = full(ambient)
+        self.heater_power = full(heater_power)
+        self.plate_capacity = full(plate_capacity)
+        self.coffee_capacity = full(coffee_capacity)
+        self.k_plate_coffee = full(k_plate_coffee)
+        self.k_plate_ambient = full(k_plate_ambient)
+        self.k_coffee_ambient = full(k_coffee_ambient)
+        self.sensor_tau = full(sensor_tau)
+        self.dead_time = full(dead_time)
+        self.quantization = quantization
+
+        self.time = 0.0
+        self.duty = np.zeros(n)
+        self.energy = np.zeros(n)
+        self._runs = np.arange(n)
+        # Coffee temperature history for the dead time: shared times, one
+        # column per run
+        self._capacity = int(np.ceil(self.dead_time.max() / self.MAX_STEP)) * 4 + 16
+        self._hist_t = np.zeros(self._capacity)
+        self._hist_temp = np.zeros((self._capacity, n))
+        self._hist_len = 0
+        self.set_temperature(self.ambient)
+
+    def set_temperature(self, temp):
+        temp = np.broadcast_to(np.asarray(temp, dtype=float), (self.n,))
+        self.plate_temp = temp.copy()
+        self.coffee_temp = temp.copy()
+        self.sensor_temp = temp.copy()
+        self._hist_t[0] = self.time
+        self._hist_temp[0] = temp
+        self._hist_len = 1
+
+    def set_heater(self, duty):
+        self.duty = np.clip(np.asarray(duty, dtype=float), 0.0, 1.0)
+
+    def _record(self):
+        if self._hist_len == self._capacity:
+            # Drop history older than the longest dead time needs
+            keep = np.searchsorted(self._hist_t[:self._hist_len],
+                                   self.time - self.dead_time.max(), side="right") - 1
+            keep = max(keep, 0)
+            count = self._hist_len - keep
+            self._hist_t[:count] = self._hist_t[keep:self._hist_len]
+            self._hist_temp[:count] = self._hist_temp[keep:self._hist_len]
+            self._hist_len = count
+        self._hist_t[self._hist_len] = self.time
+        self._hist_temp[self._hist_len] = self.coffee_temp
+        self._hist_len += 1
+
+    def step(self, dt):
+        while dt > 0:
+            h = min(dt, self.MAX_STEP)
+            power = self.heater_power * self.duty
+            to_coffee = self.k_plate_coffee * (self.plate_temp - self.coffee_temp)
+            plate_loss = self.k_plate_ambient * (self.plate_temp - self.ambient)
+            coffee_loss = self.k_coffee_ambient * (self.coffee_temp - self.ambient)
+
+            self.plate_temp += h * (power - to_coffee - plate_loss) / self.plate_capacity
+            self.coffee_temp += h * (to_coffee - coffee_loss) / self.coffee_capacity
+            self.energy += h * power
+            self.time += h
+
+            # The sensor follows the coffee temperature from dead_time ago
+            self._record()
+            index = np.searchsorted(self._hist_t[:self._hist_len],
+                                    self.time - self.dead_time, side="right") - 1
+            delayed = self._hist_temp[np.maximum(index, 0), self._runs]
+            self.sensor_temp += (delayed - self.sensor_temp) * h / (self.sensor_tau + h)
+            dt -= h
+
+    def read_sensor(self):
+        temp = self.sensor_temp
+        if self.quantization:
+            temp = np.round(temp / self.quantization) * self.quantization
+        return temp
+
+class BatchBangBang:
+    """N copies of controller.BangBangController"""
+    def __init__(self, n, hysteresis=0.0):
+        self.hysteresis = np.broadcast_to(np.asarray(hysteresis, dtype=float), (n,))
+        self._on = np.zeros(n, dtype=bool)
+
+    def update(self, setpoint, measurement, now):
+        self._on = np.where(measurement < setpoint - self.hysteresis, True,
+                            np.where(measurement >= setpoint, False, self._on))
+        return self._on
+
+class BatchPIDRelay:
+    """N copies of controller.PIDRelayController (window=None: pulse density)"""
+    def __init__(self, n, kp, ki, kd, window=10.0, min_pulse=0.5, d_filter=5.0,
+                 out_min=0.0, out_max=1.0):
+        full = lambda value: np.broadcast_to(np.asarray(value, dtype=float), (n,))
+        self.kp, self.ki, self.kd = full(kp), full(ki), full(kd)
+        self.window = None if window is None else full(window)
+        self.min_pulse, self.d_filter = full(min_pulse), full(d_filter)
+        self.out_min, self.out_max = out_min, out_max
+
+        self._integral = np.zeros(n)
+        self._derivative = np.zeros(n)
+        self._last_measurement = None
+        self._last_time = None
+        self._output = np.full(n, float(out_min))
+        self._window_start = None
+        self._on_time = np.zeros(n)
+        self._on = np.zeros(n, dtype=bool)
+        self._error = np.zeros(n)
+
+    def update(self, setpoint, measurement, now):
+        # PID (see PIDController.compute)
+        error = setpoint - measurement
+        dt = 0.0 if self._last_time is None else now - self._last_time
+        if dt > 0 and self._last_measurement is not None:
+            raw = -(measurement - self._last_measurement) / dt
+            self._derivative += (raw - self._derivative) * dt / (self.d_filter + dt)
+        if dt > 0:
+            saturated = (((self._output >= self.out_max) & (error > 0)) |
+                         ((self._output <= self.out_min) & (error < 0)))
+            integral = np.clip(self._integral + self.ki * error * dt, self.out_min, self.out_max)
+            self._integral = np.where(saturated, self._integral, integral)
+        output = self.kp * error + self._integral + self.kd * self._derivative
+        self._output = np.clip(output, self.out_min, self.out_max)
+        self._last_measurement = measurement
+        first = self._last_time is None
+        self._last_time = now
+
+        if self.window is None:
+            # Pulse density relay (see PulseDensityOutput.update)
+            duty = np.clip(self._output, 0.0, 1.0)
+            if first:
+                self._on = duty >= 0.5
+            else:
+                limit = self.min_pulse / 2.0
+                self._error = np.clip(self._error + (duty - self._on) * dt, -limit, limit)
+                self._on = np.where(self._error >= limit, True,
+                                    np.where(self._error <= -limit, False, self._on))
+            return self._on.copy()
+
+        # Time-proportioned relay (see TimeProportionalOutput.update)
+        if self._window_start is None:
+            new_window = np.ones(len(error), dtype=bool)
+            self._window_start = np.full(len(error), now)
+        else:
+            new_window = now - self._window_start >= self.window
+        on_time = np.clip(self._output, 0.0, 1.0) * self.window
+        on_time = np.where(on_time < self.min_pulse, 0.0,
+                           np.where(on_time > self.window - self.min_pulse, self.window, on_time))
+        self._window_start = np.where(new_window, now, self._window_start)
+        self._on_time = np.where(new_window, on_time, self._on_time)
+        return (now - self._window_start) < self._on_time
+
+def simulate(plant, controller, setpoint=SETPOINT, duration=DURATION, dt=CONTROL_PERIOD,
+             band=SETTLE_BAND):
+    """Run every plant from its current state; return a dict of per-run metric arrays
+
+    Same loop and metrics as controller_benchmark.simulate() /
+    virtual_hardware.step_response_metrics(); times with no value are NaN.
+    """
+    n = plant.n
+    setpoint = np.broadcast_to(np.asarray(setpoint, dtype=float), (n,))
+    heater_on = np.zeros(n, dtype=bool)
+    actuations = np.zeros(n, dtype=np.int64)
+    peak = np.full(n, -np.inf)
+    rise_time = np.full(n, np.nan)
+    settling_time = np.full(n, np.nan)
+    start_energy = plant.energy.copy()
+
+    steps = int(np.ceil(duration / dt))
+    t = 0.0
+    for _ in range(steps):
+        on = controller.update(setpoint, plant.read_sensor(), t)
+        actuations += on != heater_on
+        heater_on = on
+        plant.set_heater(on)
+        plant.step(dt)
+
+        temp = plant.coffee_temp
+        np.maximum(peak, temp, out=peak)
+        rise_time = np.where(np.isnan(rise_time) & (temp >= setpoint - band), t, rise_time)
+        in_band = np.abs(temp - setpoint) <= band
+        settling_time = np.where(in_band, np.where(np.isnan(settling_time), t, settling_time), np.nan)
+        t += dt
+
+    return {
+        "rise_time": rise_time,
+        "overshoot": np.maximum(0.0, peak - setpoint),
+        "settling_time": settling_time,
+        "final_error": setpoint - plant.coffee_temp,
+        "energy_wh": (plant.energy - start_energy) / 3600.0,
+        "relay_actuations": actuations,
+        "relay_cycles": actuations // 2,
+    }
+
+def grid(**axes):
+    """Cartesian product of parameter lists as {name: array}, one entry per run"""
+    names = list(axes)
+    rows = list(itertools.product(*(axes[name] for name in names)))
+    return {name: np.array([row[i] for row in rows], dtype=float) for i, name in enumerate(names)}
+
+def check_against_scalar(duration=2 * 3600.0, window=5.0, min_pulse=0.5):
+    """Run a few configurations both ways; return the largest metric difference"""
+    configs = grid(kp=[0.15, 0.43], ki=[0.001, 0.0005], ambient=[15.0, 25.0])
+    n = len(configs["kp"])
+    plant = BatchPlant(n, ambient=configs["ambient"])
+    batch = simulate(plant, BatchPIDRelay(n, configs["kp"], configs["ki"], 5.0, window, min_pulse),
+                     duration=duration)
+
+    worst = 0.0
+    for i in range(n):
+        scalar_plant = ThermalPlant(ambient=configs["ambient"][i])
+        pid = PIDRelayController(configs["kp"][i], configs["ki"][i], 5.0, window, min_pulse)
+        times, temps, actuations = [], [], 0
+        on_before = False
+        t = 0.0
+        for _ in range(int(np.ceil(duration / CONTROL_PERIOD))):
+            on = pid.update(SETPOINT, scalar_plant.read_sensor(), t)
+            actuations += on != on_before
+            on_before = on
+            scalar_plant.set_heater(on)
+            scalar_plant.step(CONTROL_PERIOD)
+            times.append(t)
+            temps.append(scalar_plant.coffee_temp)
+            t += CONTROL_PERIOD
+        metrics = step_response_metrics(times, temps, SETPOINT, SETTLE_BAND)
+        metrics["relay_actuations"] = actuations
+        for key, value in metrics.items():
+            other = batch[key][i]
+            if value is None:
+                worst = max(worst, 0.0 if np.isnan(other) else np.inf)
+            else:
+                worst = max(worst, abs(value - other))
+    return worst
+
+def search_gains(runs=SEARCH_RUNS, seed=SEARCH_SEED):
+    """Score random pulse-density PID gains against bang-bang in every room /
+    setpoint of the search; return (candidates, bang-bang metrics, per-candidate metrics)
+
+    Each metric array has one row per candidate (plus the shipped defaults as
+    the last row) and one column per condition.
+    """
+    rng = np.random.default_rng(seed)
+    candidates = np.column_stack([
+        10 ** rng.uniform(-0.5, 0.4, runs),    # kp
+        10 ** rng.uniform(-3.0, -1.6, runs),   # ki
+        rng.uniform(0.0, 60.0, runs),          # kd
+        rng.uniform(16.0, 80.0, runs),         # min_pulse
+        rng.uniform(2.0, 20.0, runs),          # d_filter
+    ])
+    shipped = [controller.PID_KP, controller.PID_KI, controller.PID_KD,
+               controller.RELAY_MIN_PULSE, controller.PID_D_FILTER]
+    candidates = np.vstack([candidates, shipped])
+
+    conditions = grid(ambient=SEARCH_AMBIENTS, setpoint=SEARCH_SETPOINTS)
+    m = len(conditions["ambient"])
+    bangbang = simulate(BatchPlant(m, ambient=conditions["ambient"]), BatchBangBang(m),
+                        conditions["setpoint"])
+
+    n = len(candidates) * m
+    per_run = lambda column: np.repeat(candidates[:, column], m)
+    plant = BatchPlant(n, ambient=np.tile(conditions["ambient"], len(candidates)))
+    pid = BatchPIDRelay(n, per_run(0), per_run(1), per_run(2), None, per_run(3), per_run(4))
+    metrics = simulate(plant, pid, np.tile(conditions["setpoint"], len(candidates)))
+    metrics = {key: value.reshape(len(candidates), m) for key, value in metrics.items()}
+    return candidates, bangbang, metrics
+
+if __name__ == '__main__':
+    if "--check" in sys.argv:
+        print(f"Largest difference from the scalar simulator: {check_against_scalar():.3g} (windowed), "
+              f"{check_against_scalar(window=None, min_pulse=30.0):.3g} (pulse density)")
+        sys.exit(0)
+
+    start = time.perf_counter()
+    candidates, bangbang, metrics = search_gains()
+    runs = metrics["settling_time"].size
+    elapsed = time.perf_counter() - start
+    print(f"{runs} runs of {DURATION / 3600:.1f} h in {elapsed:.1f} s ({runs * 60 / elapsed:.0f} runs/min)")
+
+    # Against bang-bang in the same room / setpoint: settling later (or
+    # never) and switching at least as often both count as a loss
+    never = np.inf
+    settle = np.nan_to_num(metrics["settling_time"], nan=never)
+    bb_settle = np.nan_to_num(bangbang["settling_time"], nan=never)
+    switches = metrics["relay_actuations"] / bangbang["relay_actuations"]
+    losses = (settle > bb_settle).sum(axis=1) + (switches >= 1.0).sum(axis=1)
+    worst_switches = switches.max(axis=1)
+    per_hour = metrics["relay_actuations"].mean(axis=1) * 3600.0 / DURATION
+    print(f"bang-bang: {bangbang['relay_actuations'].mean() * 3600.0 / DURATION:.1f} relay switches/h, "
+          f"overshoot up to {bangbang['overshoot'].max():.2f}C")
+
+    # Best gains: no losses, then the fewest switches in the worst condition
+    order = np.lexsort((worst_switches, losses))
+    print(f"{'kp':>6} {'ki':>8} {'kd':>5} {'pulse':>5} {'dfil':>5} {'losses':>6} "
+          f"{'switch/bb':>9} {'relay/h':>7} {'over':>6}")
+    rows = list(order[:10]) + [len(candidates) - 1]
+    for i in rows:
+        kp, ki, kd, min_pulse, d_filter = candidates[i]
+        label = "  <- controller.py defaults" if i == len(candidates) - 1 else ""
+        print(f"{kp:6.3f} {ki:8.5f} {kd:5.1f} {min_pulse:5.1f} {d_filter:5.1f} {losses[i]:6d} "
+              f"{worst_switches[i]:9.3f} {per_hour[i]:7.1f} {metrics['overshoot'][i].max():5.2f}C{label}")
@@ -1,12 +1,24 @@
 # coffee_heater.py - Now works without physical hardware
+import sys
+from collections import namedtuple
+import project_path
+project_path.add()  # Shared control code lives in "Project 1"
+import virtual_hardware
 from virtual_hardware import gpio, adc, temp_sensor
-import time
+from clock import SimClock
+from state_exchange import CommandChannel, Snapshot
 
 # Configuration
 HEATER_PIN = "P2_24"
 POT_PIN = "P1_19"
 UPDATE_INTERVAL = 1.0  # seconds
 
+# Other threads send commands ("pot", "set_temp", "stop") instead of
+# touching the hardware, and read the state control_loop() publishes
+ControlState = namedtuple("ControlState", ["desired", "current", "status", "heater_on", "running"])
+commands = CommandChannel()
+state = Snapshot(ControlState(0.0, 0.0, "OFF", False, False))
+
 def setup():
     """Initialize virtual hardware"""
     gpio.setup(HEATER_PIN, "output")
@@ -18,10 +30,28 @@ def read_temp():
     """Get simulated temperature"""
     return temp_sensor.read_temp()
 
-def control_loop():
-    """Main control logic"""
+def apply_commands():
+    """Apply queued commands; return False once stopped"""
+    for command, value in commands.drain():
+        if command == "pot":
+            adc.set_pot_value(value)
+        elif command == "set_temp":
+            temp_sensor.set_temp(value)
+        elif command == "stop":
+            return False
+    return True
+
+def control_loop(clock=None, duration=None, verbose=True):
+    """Main control logic; runs until stopped, or for duration seconds of clock time"""
+    if clock is None:
+        clock = virtual_hardware.clock
+    end = None if duration is None else clock.monotonic() + duration
+    state.update(running=True)
     try:
-        while True:
+        while end is None or clock.monotonic() < end:
+            if not apply_commands():
+                break
+
             # Get desired temp from virtual pot (0-100°C)
             desired_temp = round(adc.read(POT_PIN) * 100, 1)
             
@@ -36,16 +66,21 @@ def control_loop():
                 gpio.output(HEATER_PIN, 0)
                 status = "READY "
             
+            heater_on = bool(gpio.pins[HEATER_PIN]['value'])
+            state.publish(ControlState(desired_temp, current_temp, status, heater_on, True))
+
             # Display status
-            print(f"\nSet Temp: {desired_temp}°C")
-            print(f"Cur Temp: {current_temp}°C")
-            print(f"Status: {status}")
-            print(f"Heater: {'ON' if gpio.pins[HEATER_PIN]['value'] else 'OFF'}")
+            if verbose:
+                print(f"\nSet Temp: {desired_temp}°C")
+                print(f"Cur Temp: {current_temp}°C")
+                print(f"Status: {status}")
+                print(f"Heater: {'ON' if heater_on else 'OFF'}")
             
-            time.sleep(UPDATE_INTERVAL)
+            clock.sleep(UPDATE_INTERVAL)
             
     except KeyboardInterrupt:
         pass
+    state.update(running=False)
 
 def cleanup():
     """Clean up virtual hardware"""
@@ -53,8 +88,18 @@ def cleanup():
     print("\nVirtual hardware cleaned up")
 
 if __name__ == '__main__':
+    # "--sim HOURS" runs HOURS of simulated time as fast as possible
+    sim_hours = None
+    if len(sys.argv) > 2 and sys.argv[1] == "--sim":
+        sim_hours = float(sys.argv[2])
+        virtual_hardware.set_clock(SimClock())
     setup()
     try:
-        control_loop()
+        if sim_hours is None:
+            control_loop()
+        else:
+            control_loop(duration=sim_hours * 3600, verbose=False)
+            print(f"Simulated {sim_hours} h: temp {read_temp():.2f}°C, "
+                  f"heater energy {temp_sensor.plant.energy / 3600:.1f} Wh")
     finally:
         cleanup()
\ No newline at end of file
@@ -1,18 +1,26 @@
 #!/usr/bin/env python3
-# coffee_heater_virtual.py - Complete self-contained simulator
+# coffee_heater_virtual.py - Complete simulator (thermal model in virtual_hardware.py)
 
-import time
-import random
 import threading
+from collections import namedtuple
+
+import project_path
+project_path.add()  # Shared control code lives in "Project 1"
+from virtual_hardware import ThermalPlant
+from clock import WallClock
+from state_exchange import CommandChannel, Snapshot
+
+# What the control thread publishes for the other threads
+HeaterState = namedtuple("HeaterState", ["target", "current", "status", "heater_on", "running"])
 
 # ================= VIRTUAL HARDWARE SIMULATION =================
 class VirtualHardware:
-    def __init__(self):
+    def __init__(self, clock=None):
         # Simulated hardware state
+        self.clock = clock or WallClock()
         self.pot_value = 50       # 50% potentiometer
-        self.current_temp = 20.0  # Starting at 20°C
+        self.plant = ThermalPlant(time_function=self.clock.monotonic)  # Starts at 20°C
         self.heater_on = False
-        self.running = True
 
     # ---- Simulated Hardware Methods ----
     def read_potentiometer(self):
@@ -20,16 +28,13 @@ class VirtualHardware:
         return self.pot_value / 100.0
 
     def read_temperature(self):
-        """Returns temperature with small random fluctuations"""
-        self.current_temp += random.uniform(-0.2, 0.2)
-        return round(self.current_temp, 1)
+        """Returns the probe temperature from the thermal model"""
+        return self.plant.read_sensor()
 
     def set_heater(self, state):
         """Turns virtual heater on/off"""
         self.heater_on = state
-        # Temperature rises faster when heater is on
-        if state:
-            self.current_temp += 0.5
+        self.plant.set_heater(state)
 
     # ---- Control Methods ----
     def set_potentiometer(self, value):
@@ -38,18 +43,45 @@ class VirtualHardware:
 
     def set_temperature(self, temp):
         """For testing: manually set temperature"""
-        self.current_temp = temp
+        self.plant.set_temperature(temp)
 
 # ================= COFFEE HEATER LOGIC =================
 class VirtualCoffeeHeater:
-    def __init__(self):
-        self.hw = VirtualHardware()
+    def __init__(self, clock=None):
+        # Pass a clock.SimClock to run faster than real time
+        self.hw = VirtualHardware(clock)
+        self.clock = self.hw.clock
         self.update_interval = 1.0  # seconds
+        self.show_status = True
+
+        # Only the control thread touches self.hw; other threads send
+        # commands and read the published state
+        self.commands = CommandChannel()
+        self.state = Snapshot(HeaterState(0.0, self.hw.read_temperature(), "OFF", False, True))
 
-    def run(self):
-        """Main control loop"""
+    def stop(self):
+        """Ask the control loop to exit (any thread)"""
+        self.commands.send("stop")
+
+    def _apply_commands(self):
+        """Apply queued commands; return False once stopped"""
+        for command, value in self.commands.drain():
+            if command == "pot":
+                self.hw.set_potentiometer(value)
+            elif command == "set_temp":
+                self.hw.set_temperature(value)
+            elif command == "stop":
+                return False
+        return True
+
+    def run(self, duration=None):
+        """Main control loop; runs until stopped, or for duration seconds"""
+        end = None if duration is None else self.clock.monotonic() + duration
         try:
-            while self.hw.running:
+            while end is None or self.clock.monotonic() < end:
+                if not self._apply_commands():
+                    break
+
                 # Get desired temp from virtual pot (0-100°C)
                 desired_temp = round(self.hw.read_potentiometer() * 100, 1)
                 
@@ -64,21 +96,25 @@ class VirtualCoffeeHeater:
                     self.hw.set_heater(False)
                     status = "READY "
                 
-                # Display status
-                self._print_status(desired_temp, current_temp, status)
-                time.sleep(self.update_interval)
+                # Publish, then display status
+                self.state.publish(HeaterState(desired_temp, current_temp, status,
+                                               self.hw.heater_on, True))
+                if self.show_status:
+                    self._print_status(self.state.get())
+                self.clock.sleep(self.update_interval)
                 
         except KeyboardInterrupt:
-            self.hw.running = False
+            pass
+        self.state.update(running=False)
 
-    def _print_status(self, target, current, status):
+    def _print_status(self, state):
         """Clear console and display status"""
         print("\033[H\033[J")  # Clear console
         print("=== VIRTUAL COFFEE HEATER ===")
-        print(f"Target Temp: {target}°C")
-        print(f"Current Temp: {current}°C")
-        print(f"\nStatus: {status}")
-        print(f"Heater: {'ON' if self.hw.heater_on else 'OFF'}")
+        print(f"Target Temp: {state.target}°C")
+        print(f"Current Temp: {state.current}°C")
+        print(f"\nStatus: {state.status}")
+        print(f"Heater: {'ON' if state.heater_on else 'OFF'}")
         print("\nControls:")
         print("1. Adjust Potentiometer")
         print("2. Set Temperature")
@@ -87,17 +123,17 @@ class VirtualCoffeeHeater:
 # ================= INTERACTIVE TEST INTERFACE =================
 def interactive_control(heater):
     """User interface for testing"""
-    while heater.hw.running:
+    while heater.state.get().running:
         choice = input("\nSelect option (1-3): ")
         
         if choice == "1":
             value = int(input("Set potentiometer % (0-100): "))
-            heater.hw.set_potentiometer(value)
+            heater.commands.send("pot", value)
         elif choice == "2":
             temp = float(input("Set temperature (°C): "))
-            heater.hw.set_temperature(temp)
+            heater.commands.send("set_temp", temp)
         elif choice == "3":
-            heater.hw.running = False
+            heater.stop()
             break
 
 # ================= MAIN EXECUTION =================
@@ -63,43 +63,66 @@ device_folder = glob.glob(base_dir + '28*')[0]
 device_file = device_folder + '/w1_slave'
 
 # ================= LCD FUNCTIONS =================
+# Every nibble is sent to the PCF8574 as three output bytes (data, data | E,
+# data).  At 100 kHz each byte takes ~90 us on the wire, which already covers
+# the HD44780 enable pulse and execution times, so whole lines are sent as
+# one I2C transaction with no sleeps in between.
+LCD_ENABLE = 0x04
+I2C_BLOCK_MAX = 32   # SMBus block write limit (plus the leading "command" byte)
+
 def lcd_init():
     """Initialize the LCD"""
     try:
-        lcd_byte(0x33, LCD_CMD)  # Initialize
-        lcd_byte(0x32, LCD_CMD)  # Set to 4-bit mode
-        lcd_byte(0x28, LCD_CMD)  # 2 lines, 5x8 matrix
-        lcd_byte(0x0C, LCD_CMD)  # Display on, cursor off
-        lcd_byte(0x06, LCD_CMD)  # Cursor move direction
-        lcd_byte(0x01, LCD_CMD)  # Clear display
+        for cmd in (0x33,   # Initialize
+                    0x32,   # Set to 4-bit mode
+                    0x28,   # 2 lines, 5x8 matrix
+                    0x0C,   # Display on, cursor off
+                    0x06,   # Cursor move direction
+                    0x01):  # Clear display
+            lcd_byte(cmd, LCD_CMD)
+            time.sleep(0.005)  # Power-on commands need the datasheet delays
         time.sleep(0.2)
     except:
         print("LCD init failed")
 
+def lcd_encode_byte(buf, bits, mode):
+    """Append the PCF8574 output bytes for one LCD byte to buf"""
+    for nibble in (bits & 0xF0, (bits << 4) & 0xF0):
+        data = mode | nibble | LCD_BACKLIGHT
+        buf.append(data)
+        buf.append(data | LCD_ENABLE)
+        buf.append(data & ~LCD_ENABLE)
+
+def lcd_send(buf):
+    """Send PCF8574 output bytes in as few I2C transactions as possible"""
+    if hasattr(bus, "i2c_rdwr"):
+        # smbus2: one transaction of any length
+        from smbus2 import i2c_msg
+        bus.i2c_rdwr(i2c_msg.write(LCD_ADDRESS, bytes(buf)))
+        return
+    # smbus: the "command" byte is just the first byte the PCF8574 outputs
+    step = I2C_BLOCK_MAX + 1
+    for i in range(0, len(buf), step):
+        chunk = buf[i:i + step]
+        if len(chunk) == 1:
+            bus.write_byte(LCD_ADDRESS, chunk[0])
+        else:
+            bus.write_i2c_block_data(LCD_ADDRESS, chunk[0], list(chunk[1:]))
+
 def lcd_byte(bits, mode):
     """Send byte to LCD"""
-    bits_high = mode | (bits & 0xF0) | LCD_BACKLIGHT
-    bits_low = mode | ((bits << 4) & 0xF0) | LCD_BACKLIGHT
-    
-    bus.write_byte(LCD_ADDRESS, bits_high)
-    lcd_toggle_enable(bits_high)
-    bus.write_byte(LCD_ADDRESS, bits_low)
-    lcd_toggle_enable(bits_low)
-
-def lcd_toggle_enable(bits):
-    """Toggle enable pin"""
-    time.sleep(0.0005)
-    bus.write_byte(LCD_ADDRESS, (bits | 0x04))
-    time.sleep(0.0005)
-    bus.write_byte(LCD_ADDRESS, (bits & ~0x04))
-    time.sleep(0.0005)
+    buf = bytearray()
+    lcd_encode_byte(buf, bits, mode)
+    lcd_send(buf)
 
 def lcd_string(message, line):
     """Print string to LCD"""
     message = message.ljust(LCD_WIDTH, " ")
-    lcd_byte(line, LCD_CMD)
+    buf = bytearray()
+    lcd_encode_byte(buf, line, LCD_CMD)
     for char in message:
-        lcd_byte(ord(char), LCD_CHR)
+        lcd_encode_byte(buf, ord(char), LCD_CHR)
+    lcd_send(buf)
 
 # ================= SYSTEM FUNCTIONS =================
 def setup():
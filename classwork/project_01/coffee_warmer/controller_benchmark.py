@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# controller_benchmark.py - Compares heater controllers on the thermal model
+import project_path
+project_path.add()  # Shared control code lives in "Project 1"
+from virtual_hardware import ThermalPlant, step_response_metrics
+import controller
+from controller import BangBangController, PIDRelayController
+from autotune import RelayAutotuner
+
+# Configuration
+SETPOINT = 60.0
+DURATION = 4 * 3600.0  # simulated seconds
+CONTROL_PERIOD = 1.0   # seconds between controller updates
+SETTLE_BAND = 0.5      # C
+RIPPLE_TIME = 3600.0   # ripple is measured over the last hour
+DISTURBANCE_TIME = 2 * 3600.0  # fresh coffee poured in, in a separate run
+DISTURBANCE = -10.0    # C
+
+def autotune_gains(setpoint=SETPOINT, dt=CONTROL_PERIOD, rule="pulse_density"):
+    """Run the relay experiment on a fresh plant; return (kp, ki, kd)"""
+    plant = ThermalPlant()
+    tuner = RelayAutotuner(setpoint, rule=rule)
+    t = 0.0
+    while not tuner.is_done():
+        plant.set_heater(tuner.update(plant.read_sensor(), t))
+        plant.step(dt)
+        t += dt
+    result = tuner.get_result()
+    if result is None:
+        raise RuntimeError(f"Auto-tune failed: {tuner.get_error()}")
+    return (result.kp, result.ki, result.kd)
+
+CONTROLLERS = {
+    "bangbang": lambda: BangBangController(0.0),
+    "bangbang_1C": lambda: BangBangController(1.0),
+    # Defaults shipped in coffee_heater.py
+    "pid": lambda: PIDRelayController(controller.PID_KP, controller.PID_KI, controller.PID_KD,
+                                      controller.RELAY_WINDOW, controller.RELAY_MIN_PULSE,
+                                      controller.PID_D_FILTER),
+    "pid_tuned": lambda: PIDRelayController(*autotune_gains(), controller.RELAY_WINDOW,
+                                            controller.RELAY_MIN_PULSE, controller.PID_D_FILTER),
+}
+
+def simulate(heater_controller, setpoint=SETPOINT, duration=DURATION, dt=CONTROL_PERIOD, plant=None,
+             disturbance_time=None):
+    """Run one controller from cold; return (times, temps, plant, relay actuations)"""
+    if plant is None:
+        plant = ThermalPlant()
+    times, temps = [], []
+    heater_on = False
+    actuations = 0
+    t = 0.0
+    while t < duration:
+        if disturbance_time is not None and t - dt < disturbance_time <= t:
+            plant.coffee_temp += DISTURBANCE
+        temp = plant.read_sensor()
+        on = heater_controller.update(setpoint, temp, t)
+        if on != heater_on:
+            heater_on = on
+            actuations += 1
+        plant.set_heater(on)
+        plant.step(dt)
+        times.append(t)
+        temps.append(plant.coffee_temp)
+        t += dt
+    return times, temps, plant, actuations
+
+def benchmark(setpoint=SETPOINT, duration=DURATION):
+    """Return {controller name: metrics dict}"""
+    results = {}
+    for name, make in CONTROLLERS.items():
+        times, temps, plant, actuations = simulate(make(), setpoint, duration)
+        metrics = step_response_metrics(times, temps, setpoint, SETTLE_BAND)
+        metrics["relay_per_hour"] = actuations * 3600.0 / duration
+        metrics["energy_wh"] = plant.energy / 3600.0
+        last_hour = [temp for t, temp in zip(times, temps) if t >= duration - RIPPLE_TIME]
+        metrics["ripple"] = max(last_hour) - min(last_hour)
+
+        # Recovery from fresh coffee:  time back within the band for good
+        times, temps, _, _ = simulate(make(), setpoint, duration, disturbance_time=DISTURBANCE_TIME)
+        after = [(t - DISTURBANCE_TIME, temp) for t, temp in zip(times, temps) if t >= DISTURBANCE_TIME]
+        metrics["recovery_time"] = step_response_metrics(*zip(*after), setpoint, SETTLE_BAND)["settling_time"]
+        results[name] = metrics
+    return results
+
+def fmt(value, spec):
+    # None (never reached) is shown as "-" in the same width
+    if value is None:
+        return "-".rjust(int(spec.split(".")[0]))
+    return format(value, spec)
+
+if __name__ == '__main__':
+    print(f"Setpoint {SETPOINT}°C, {DURATION / 3600:.1f} h simulated; recovery from "
+          f"{DISTURBANCE:+.0f}°C at {DISTURBANCE_TIME / 3600:.0f} h in a second run")
+    print(f"{'controller':<12} {'rise':>8} {'settle':>8} {'overshoot':>10} {'ripple':>7} "
+          f"{'relay/h':>8} {'recover':>8} {'energy':>8}")
+    for name, m in benchmark().items():
+        print(f"{name:<12} {fmt(m['rise_time'], '7.0f')}s {fmt(m['settling_time'], '7.0f')}s "
+              f"{m['overshoot']:>9.2f}C {m['ripple']:>6.2f}C {m['relay_per_hour']:>8.1f} "
+              f"{fmt(m['recovery_time'], '7.0f')}s {m['energy_wh']:>6.1f}Wh")
@@ -0,0 +1,16 @@
+# project_path.py - Puts "Project 1" (the shared control code) on sys.path
+#
+# Call add() before importing any module from "Project 1":
+#
+#   import project_path
+#   project_path.add()
+#   from controller import PIDRelayController
+import os
+import sys
+
+PROJECT_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                            "..", "..", "..", "Project 1"))
+
+def add():
+    if PROJECT_DIR not in sys.path:
+        sys.path.append(PROJECT_DIR)
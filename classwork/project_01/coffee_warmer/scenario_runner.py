@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# scenario_runner.py - Runs scripted virtual heater scenarios headless
+#
+# Each scenario is a JSON file (see scenarios/) with a timeline of events
+# applied to the virtual hardware on a simulated clock:
+#
+#   {"time": 0,    "pot": 60}            set the potentiometer (% -> C setpoint)
+#   {"time": 0,    "button": "click"}    click / double_click / long_press
+#   {"time": 3600, "disturbance": -8}    step the coffee temperature (C)
+#   {"time": 3600, "set_temp": 20}       set the whole plant to a temperature
+#   {"time": 7200, "ambient": 12}        change the room temperature
+#
+# and pass/fail thresholds on the control metrics ("<metric>_max" or
+# "<metric>_min").  Every change the controller has to answer (setpoint,
+# disturbance, temperature, room, heater enabled) starts a segment, and
+# rise_time, settling_time and overshoot are scored and checked for each
+# segment with the heater enabled, measured from the start of the segment.
+# heater_on_while_disabled is the time (s) the plant's heater input was on
+# while the heater was disabled, sampled every BUTTON_PERIOD.
+# Scenarios run in parallel on a process pool and the results are written
+# as a JSON report; the exit status is 1 if any failed.
+#
+#   python scenario_runner.py [files or directories] [--report FILE] [--workers N]
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import project_path
+project_path.add()  # Shared control code lives in "Project 1"
+from virtual_hardware import (HEATER_PIN, ThermalPlant, VirtualADC, VirtualGPIO,
+                              VirtualTempSensor)
+from clock import SimClock
+import controller
+from controller import BangBangController, PIDRelayController
+from gesture import GestureDecoder, CLICK, DOUBLE_CLICK, LONG_PRESS
+from scheduler import Scheduler
+
+# Configuration
+POT_PIN = "P1_19"
+SCENARIO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios")
+BUTTON_PERIOD = 0.05   # seconds
+CONTROL_PERIOD = 1.0   # seconds
+SETTLE_BAND = 0.5      # C
+SEGMENT_METRICS = ("rise_time", "settling_time", "overshoot")
+
+# How long the button is held for each scripted gesture: (pressed, seconds)...
+BUTTON_SCRIPTS = {
+    CLICK: [(True, 0.1), (False, 0.0)],
+    DOUBLE_CLICK: [(True, 0.1), (False, 0.1), (True, 0.1), (False, 0.0)],
+    LONG_PRESS: [(True, 1.5), (False, 0.0)],
+}
+
+def make_controller(spec):
+    spec = dict(spec or {"type": "pid"})
+    kind = spec.pop("type", "pid")
+    if kind == "bangbang":
+        return BangBangController(**spec)
+    if kind == "pid":
+        # Anything not given is what coffee_heater.py ships with
+        spec.setdefault("kp", controller.PID_KP)
+        spec.setdefault("ki", controller.PID_KI)
+        spec.setdefault("kd", controller.PID_KD)
+        spec.setdefault("window", controller.RELAY_WINDOW)
+        spec.setdefault("min_pulse", controller.RELAY_MIN_PULSE)
+        spec.setdefault("d_filter", controller.PID_D_FILTER)
+        return PIDRelayController(**spec)
+    raise ValueError(f"Unknown controller type: {kind}")
+
+def button_edges(events):
+    """Turn scripted gestures into a sorted list of (time, pressed)"""
+    edges = []
+    for event in events:
+        if "button" not in event:
+            continue
+        if event["button"] not in BUTTON_SCRIPTS:
+            raise ValueError(f"Unknown button gesture: {event['button']}")
+        t = float(event["time"])
+        for pressed, hold in BUTTON_SCRIPTS[event["button"]]:
+            edges.append((t, pressed))
+            t += hold
+    return sorted(edges)
+
+def run_scenario(scenario):
+    """Run one scenario on fresh virtual hardware; return its metrics dict"""
+    clock = SimClock()
+    plant = ThermalPlant(time_function=clock.monotonic, **scenario.get("plant", {}))
+    plant.set_temperature(scenario.get("initial_temp", plant.ambient))
+    gpio = VirtualGPIO()
+    adc = VirtualADC()
+    temp_sensor = VirtualTempSensor(plant)
+    gpio.setup(HEATER_PIN, "output")
+    gpio.watch(HEATER_PIN, plant.set_heater)
+
+    heater_controller = make_controller(scenario.get("controller"))
+    gestures = GestureDecoder()
+    events = sorted((e for e in scenario.get("events", []) if "button" not in e),
+                    key=lambda e: e["time"])
+    edges = button_edges(scenario.get("events", []))
+    duration = float(scenario["duration"])
+
+    state = {
+        "enabled": bool(scenario.get("enabled", True)),
+        "heater": False,
+        "pressed": False,
+        "actuations": 0,
+        "toggle": False,
+        "on_while_disabled": 0.0,
+        "task_reports": [],
+        "setpoint": adc.read(POT_PIN) * 100,
+    }
+    segments = []
+
+    def begin_segment(now, cause):
+        # Changes in the same instant (e.g. the pot at t=0) share a segment
+        if segments and segments[-1]["start"] == now:
+            segments[-1]["causes"].append(cause)
+            return
+        segments.append({"start": now, "causes": [cause], "setpoint": state["setpoint"],
+                         "enabled": state["enabled"], "rise_time": None,
+                         "settling_time": None, "overshoot": 0.0, "_settled_at": None})
+
+    begin_segment(0.0, "start")
+
+    def script_task():
+        now = clock.monotonic()
+        while events and events[0]["time"] <= now:
+            event = events.pop(0)
+            plant.update()
+            if "pot" in event:
+                # Scored from when control_task sees the new setpoint
+                adc.set_pot_value(event["pot"])
+            for cause in ("disturbance", "set_temp", "ambient"):
+                if cause in event:
+                    begin_segment(now, cause)
+            if "disturbance" in event:
+                plant.coffee_temp += event["disturbance"]
+            if "set_temp" in event:
+                plant.set_temperature(event["set_temp"])
+            if "ambient" in event:
+                plant.ambient = event["ambient"]
+        while edges and edges[0][0] <= now:
+            state["pressed"] = edges.pop(0)[1]
+        # Whatever the controller decided, check what the plant is getting
+        plant.update()
+        if not state["enabled"] and plant.duty > 0:
+            state["on_while_disabled"] += BUTTON_PERIOD
+
+    def button_task():
+        # Same gestures as coffee_heater.py: a click is applied by the
+        # control task, a long press takes the task statistics
+        event = gestures.update(state["pressed"], clock.monotonic())
+        if event == CLICK:
+            state["toggle"] = True
+        elif event == LONG_PRESS:
+            state["task_reports"].append(scheduler.report())
+
+    def control_task():
+        now = clock.monotonic()
+        setpoint = adc.read(POT_PIN) * 100
+        if setpoint != state["setpoint"]:
+            state["setpoint"] = setpoint
+            begin_segment(now, "setpoint")
+        if state["toggle"]:
+            state["toggle"] = False
+            state["enabled"] = not state["enabled"]
+            begin_segment(now, "enable" if state["enabled"] else "disable")
+        temp = temp_sensor.read_temp()
+        if state["enabled"]:
+            on = heater_controller.update(setpoint, temp, now)
+        else:
+            heater_controller.reset()
+            on = False
+        if on != state["heater"]:
+            state["actuations"] += 1
+            state["heater"] = on
+        gpio.output(HEATER_PIN, 1 if on else 0)
+
+        # Metrics on the true coffee temperature; overshoot only counts once
+        # the setpoint has been reached (not while cooling to a lower one)
+        segment = segments[-1]
+        segment["setpoint"] = setpoint
+        segment["enabled"] = state["enabled"]
+        if not state["enabled"]:
+            return
+        coffee = plant.coffee_temp
+        in_band = abs(coffee - setpoint) <= SETTLE_BAND
+        if in_band and segment["rise_time"] is None:
+            segment["rise_time"] = now - segment["start"]
+        if segment["rise_time"] is not None:
+            segment["overshoot"] = max(segment["overshoot"], coffee - setpoint)
+        if not in_band:
+            segment["_settled_at"] = None
+        elif segment["_settled_at"] is None:
+            segment["_settled_at"] = now
+
+    scheduler = Scheduler(clock.monotonic, clock.sleep)
+    scheduler.add_task("script", BUTTON_PERIOD, script_task)
+    if edges:
+        scheduler.add_task("button", BUTTON_PERIOD, button_task)
+    scheduler.add_task("control", CONTROL_PERIOD, control_task)
+    scheduler.run(duration)
+
+    # A segment is settled if it stayed within the band until the next one
+    scored = []
+    for segment in segments:
+        settled = segment.pop("_settled_at")
+        if settled is not None:
+            segment["settling_time"] = settled - segment["start"]
+        if segment["enabled"]:
+            scored.append(segment)
+
+    def worst(name):
+        values = [segment[name] for segment in scored]
+        return None if (not values or None in values) else max(values)
+
+    hours = duration / 3600.0
+    metrics = {
+        "rise_time": worst("rise_time"),
+        "overshoot": worst("overshoot"),
+        "settling_time": worst("settling_time"),
+        "final_error": abs(state["setpoint"] - plant.coffee_temp),
+        "relay_cycles_per_hour": state["actuations"] / 2.0 / hours,
+        "energy_wh": plant.energy / 3600.0,
+        "heater_on_while_disabled": state["on_while_disabled"],
+        "enabled": state["enabled"],
+        "task_reports": len(state["task_reports"]),
+        "task_report": state["task_reports"][-1] if state["task_reports"] else None,
+        "segments": segments,
+    }
+    return metrics
+
+def check_value(name, value, bound, limit, where=""):
+    """Return a failure message, or None"""
+    if value is None:
+        return f"{name} never reached (limit {limit}){where}"
+    if bound == "max" and value > limit:
+        return f"{name} {value:.3f} > {limit}{where}"
+    if bound == "min" and value < limit:
+        return f"{name} {value:.3f} < {limit}{where}"
+    return None
+
+def check_thresholds(metrics, thresholds):
+    """Return a list of failure messages; segment metrics are checked per segment"""
+    failures = []
+    for key, limit in thresholds.items():
+        name, _, bound = key.rpartition("_")
+        if bound not in ("max", "min") or name not in metrics:
+            failures.append(f"unknown threshold {key}")
+            continue
+        if name in SEGMENT_METRICS:
+            scored = [segment for segment in metrics["segments"] if segment["enabled"]]
+            if not scored:
+                failures.append(f"{name}: no segment with the heater enabled")
+            for segment in scored:
+                where = f" after {'+'.join(segment['causes'])} at {segment['start']:.0f}s"
+                failures.append(check_value(name, segment[name], bound, limit, where))
+        else:
+            failures.append(check_value(name, metrics[name], bound, limit))
+    return [failure for failure in failures if failure is not None]
+
+def run_file(path):
+    """Worker entry point: load, run and score one scenario file"""
+    result = {"file": path, "name": os.path.splitext(os.path.basename(path))[0]}
+    start = time.perf_counter()
+    try:
+        with open(path) as f:
+            scenario = json.load(f)
+        result["name"] = scenario.get("name", result["name"])
+        result["metrics"] = run_scenario(scenario)
+        result["failures"] = check_thresholds(result["metrics"], scenario.get("thresholds", {}))
+    except Exception as e:
+        result["metrics"] = None
+        result["failures"] = [f"error: {e!r}"]
+    result["passed"] = not result["failures"]
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+def find_scenarios(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.json"))))
+        else:
+            files.append(path)
+    return files
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run virtual coffee heater scenarios")
+    parser.add_argument("paths", nargs="*", default=[SCENARIO_DIR],
+                        help="scenario files or directories (default: scenarios/)")
+    parser.add_argument("--report", default="scenario_report.json", help="JSON report file")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes")
+    args = parser.parse_args(argv)
+
+    files = find_scenarios(args.paths)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(run_file, files))
+    elapsed = time.perf_counter() - start
+
+    passed = sum(1 for r in results if r["passed"])
+    report = {
+        "summary": {"total": len(results), "passed": passed,
+                    "failed": len(results) - passed, "elapsed": elapsed},
+        "scenarios": results,
+    }
+    with open(args.report, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for r in results:
+        print(f"{'PASS' if r['passed'] else 'FAIL'}  {r['name']:<28} {r['elapsed']:6.2f}s  "
+              + "; ".join(r["failures"]))
+    print(f"{passed}/{len(results)} passed in {elapsed:.1f}s, report: {args.report}")
+    return 0 if passed == len(results) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,13 @@
 # test_coffee_heater.py - Lets you simulate hardware changes
-from virtual_hardware import adc, temp_sensor
-from coffee_heater import control_loop
+from coffee_heater_virtua1l import setup, control_loop, commands, state
 import threading
 
 def interactive_control():
     """Let user adjust virtual hardware"""
     while True:
+        s = state.get()  # One consistent snapshot from the control thread
+        print(f"\nSet {s.desired}°C, now {s.current}°C, {s.status.strip()}, "
+              f"heater {'ON' if s.heater_on else 'OFF'}")
         print("\n1. Set Potentiometer (0-100%)")
         print("2. Set Current Temperature")
         print("3. Exit")
@@ -13,15 +15,17 @@ def interactive_control():
         
         if choice == "1":
             value = int(input("Enter pot % (0-100): "))
-            adc.set_pot_value(value)
+            commands.send("pot", value)
         elif choice == "2":
             temp = float(input("Enter temperature (°C): "))
-            temp_sensor.set_temp(temp)
+            commands.send("set_temp", temp)
         elif choice == "3":
+            commands.send("stop")
             break
 
 if __name__ == '__main__':
     # Start coffee heater in background
+    setup()
     heater_thread = threading.Thread(target=control_loop)
     heater_thread.daemon = True
     heater_thread.start()
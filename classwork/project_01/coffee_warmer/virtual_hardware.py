@@ -1,9 +1,17 @@
 # virtual_hardware.py - Simulates hardware for testing
 import random
+from collections import deque
+
+import project_path
+project_path.add()  # Shared control code lives in "Project 1"
+from clock import WallClock
+
+HEATER_PIN = "P2_24"
 
 class VirtualGPIO:
     def __init__(self):
         self.pins = {}
+        self.watchers = {}
         
     def setup(self, pin, mode):
         self.pins[pin] = {"mode": mode, "value": 0}
@@ -11,9 +19,15 @@ class VirtualGPIO:
     def output(self, pin, value):
         if pin in self.pins:
             self.pins[pin]["value"] = value
+            if pin in self.watchers:
+                self.watchers[pin](value)
         else:
             print(f"Virtual pin {pin} not set up!")
             
+    def watch(self, pin, function):
+        # Call function(value) whenever the pin is written
+        self.watchers[pin] = function
+
     def cleanup(self):
         self.pins.clear()
 
@@ -29,19 +43,161 @@ class VirtualADC:
         # For testing: set virtual pot position (0-100)
         self.pot_value = max(0, min(100, value))
 
+class ThermalPlant:
+    """Two-mass thermal model of the warmer plate and the coffee pot.
+
+    The heater puts power into the plate; heat flows from the plate into
+    the coffee, and both lose heat to the room:
+
+        C_plate  dT_plate/dt  = P*duty - k_pc (T_plate - T_coffee) - k_pa (T_plate - T_amb)
+        C_coffee dT_coffee/dt = k_pc (T_plate - T_coffee) - k_ca (T_coffee - T_amb)
+
+    The DS18B20 on the pot sees the coffee temperature through a first-order
+    lag (sensor_tau) after a transport delay (dead_time), quantized to the
+    12-bit 0.0625 C step.
+
+    Time is either stepped explicitly with step(dt), or, when a
+    time_function is given (e.g. clock.monotonic), advanced automatically to
+    time_function() on every set_heater() / read_sensor() call.
+    """
+    MAX_STEP = 0.5  # seconds per integration step
+
+    def __init__(self, ambient=20.0, heater_power=40.0, plate_capacity=150.0,
+                 coffee_capacity=1000.0, k_plate_coffee=1.5, k_plate_ambient=0.15,
+                 k_coffee_ambient=0.35, sensor_tau=10.0, dead_time=2.0,
+                 quantization=0.0625, noise=0.0, time_function=None):
+        self.ambient = ambient
+        self.heater_power = heater_power
+        self.plate_capacity = plate_capacity
+        self.coffee_capacity = coffee_capacity
+        self.k_plate_coffee = k_plate_coffee
+        self.k_plate_ambient = k_plate_ambient
+        self.k_coffee_ambient = k_coffee_ambient
+        self.sensor_tau = sensor_tau
+        self.dead_time = dead_time
+        self.quantization = quantization
+        self.noise = noise
+        self.time_function = time_function
+
+        self.time = 0.0
+        self.duty = 0.0
+        self.energy = 0.0  # Joules delivered by the heater
+        self._last_update = None
+        self.set_temperature(ambient)
+
+    def set_time_function(self, time_function):
+        """Follow another clock from now on"""
+        self.time_function = time_function
+        self._last_update = None
+
+    def set_temperature(self, temp):
+        """Put the whole plant (and the sensor) at one temperature"""
+        self._advance()
+        self.plate_temp = temp
+        self.coffee_temp = temp
+        self.sensor_temp = temp
+        self._delay = deque([(self.time, temp)])
+
+    def set_heater(self, duty):
+        """Heater power as 0-1 (True / 1 = fully on)"""
+        self._advance()
+        self.duty = max(0.0, min(1.0, float(duty)))
+
+    def step(self, dt):
+        """Advance the model by dt seconds"""
+        while dt > 0:
+            h = min(dt, self.MAX_STEP)
+            power = self.heater_power * self.duty
+            to_coffee = self.k_plate_coffee * (self.plate_temp - self.coffee_temp)
+            plate_loss = self.k_plate_ambient * (self.plate_temp - self.ambient)
+            coffee_loss = self.k_coffee_ambient * (self.coffee_temp - self.ambient)
+
+            self.plate_temp += h * (power - to_coffee - plate_loss) / self.plate_capacity
+            self.coffee_temp += h * (to_coffee - coffee_loss) / self.coffee_capacity
+            self.energy += h * power
+            self.time += h
+
+            # The sensor follows the coffee temperature from dead_time ago
+            self._delay.append((self.time, self.coffee_temp))
+            while len(self._delay) > 1 and self._delay[1][0] <= self.time - self.dead_time:
+                self._delay.popleft()
+            delayed = self._delay[0][1]
+            self.sensor_temp += (delayed - self.sensor_temp) * h / (self.sensor_tau + h)
+            dt -= h
+
+    def update(self):
+        """Bring the model up to time_function() (before changing its state)"""
+        self._advance()
+
+    def read_sensor(self):
+        """Return what the DS18B20 would read now"""
+        self._advance()
+        temp = self.sensor_temp
+        if self.noise:
+            temp += random.gauss(0.0, self.noise)
+        if self.quantization:
+            temp = round(temp / self.quantization) * self.quantization
+        return temp
+
+    def _advance(self):
+        if self.time_function is None:
+            return
+        now = self.time_function()
+        if self._last_update is not None and now > self._last_update:
+            self.step(now - self._last_update)
+        self._last_update = now
+
 class VirtualTempSensor:
-    def __init__(self):
-        self.current_temp = 20.0  # Start at 20°C
-        
+    def __init__(self, plant=None, clock=None):
+        # Reads the plant model; the heater pin drives the plant
+        if plant is None:
+            plant = ThermalPlant(time_function=(clock or WallClock()).monotonic)
+        self.plant = plant
+
+    @property
+    def current_temp(self):
+        return self.plant.read_sensor()
+
     def read_temp(self):
-        # Simulate small temp fluctuations
-        self.current_temp += random.uniform(-0.5, 0.5)
-        return round(self.current_temp, 1)
-        
+        return self.plant.read_sensor()
+
     def set_temp(self, temp):
-        self.current_temp = temp
+        self.plant.set_temperature(temp)
+
+def step_response_metrics(times, temps, setpoint, band=0.5):
+    """Score a warm-up: times/temps sampled from the start of the run.
+
+    Returns a dict with
+        rise_time      - first time within band of the setpoint (None if never)
+        overshoot      - highest temperature above the setpoint, C
+        settling_time  - time after which it stays within band (None if never)
+        final_error    - setpoint - last temperature
+    """
+    rise_time = None
+    settling_time = None
+    for t, temp in zip(times, temps):
+        if rise_time is None and temp >= setpoint - band:
+            rise_time = t
+        if abs(temp - setpoint) > band:
+            settling_time = None
+        elif settling_time is None:
+            settling_time = t
+    return {
+        "rise_time": rise_time,
+        "overshoot": max(0.0, max(temps) - setpoint) if temps else 0.0,
+        "settling_time": settling_time,
+        "final_error": setpoint - temps[-1] if temps else None,
+    }
 
 # Global simulated hardware
+clock = WallClock()
 gpio = VirtualGPIO()
 adc = VirtualADC()
-temp_sensor = VirtualTempSensor()
\ No newline at end of file
+temp_sensor = VirtualTempSensor(clock=clock)
+gpio.watch(HEATER_PIN, temp_sensor.plant.set_heater)
+
+def set_clock(new_clock):
+    """Run the global virtual hardware on another clock (e.g. SimClock)"""
+    global clock
+    clock = new_clock
+    temp_sensor.plant.set_time_function(new_clock.monotonic)